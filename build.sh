@@ -10,5 +10,8 @@ cd ..
 echo "📦 Installing Python dependencies..."
 pip install -r requirements.txt
 
+echo "🗃️  Building the columnar data store..."
+python -m src.columnar
+
 echo "🚀 Starting application..."
 uvicorn src.app:app --host 0.0.0.0 --port ${PORT:-8000}
\ No newline at end of file
@@ -1,17 +1,67 @@
-from fastapi import FastAPI
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import joblib
-import json
-import pandas as pd
+from fastapi.responses import JSONResponse, PlainTextResponse
+import os
 import numpy as np
 from pathlib import Path
-from src.features import build_features
-from src.schemas import ForecastRequest, CountryForecastRequest
-from src.utils_time import add_month
+from typing import Optional
+from src.artifacts import ArtifactStore
+from src.cache import ForecastCache
+from src.compression import CompressionMiddleware
+from src.explain import explanation_records, group_contributions
+from src.executor import ForecastExecutor, Overloaded
+from src.forecasting import FEATURE_COLS, recursive_forecast, recursive_forecast_batch, forecast_columns, forecast_records
+from src.intervals import forecast_bands, interval_columns, interval_records
+from src.metrics import MetricsMiddleware, Registry, stage
+from src.reconcile import reconcile, reconciled_columns, reconciled_records
+from src.scenarios import (
+    count_series, delta_columns, delta_records, scenario_columns, scenario_records, scenario_shocks
+)
+from src.streaming import STREAM_CHUNK, StreamFormat, stream_format, stream_response
+from src.static import StaticSite
+from src.schemas import (
+    ForecastRequest, CountryForecastRequest, BatchForecastRequest, ReconciledForecastRequest, ExplainRequest,
+    ScenarioRequest, Layout, MAX_HORIZON, MAX_SCENARIO_SERIES
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# background: bind the port first, load artifacts on a thread (default)
+# lazy: load on the first request that needs them
+# eager: load at import, before uvicorn binds (old behaviour)
+# shared: like background, but one worker publishes the artifacts to shared
+#         memory and all workers map them read-only (see shared_state.py)
+ARTIFACT_LOAD_MODE = os.environ.get("ARTIFACT_LOAD_MODE", "background")
+ARTIFACT_WAIT_TIMEOUT = float(os.environ.get("ARTIFACT_WAIT_TIMEOUT", "30"))
+ARTIFACT_RELOAD_INTERVAL = float(os.environ.get("ARTIFACT_RELOAD_INTERVAL", "30"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ARTIFACT_LOAD_MODE in ("background", "shared"):
+        artifacts.load_in_background()
+    if ARTIFACT_RELOAD_INTERVAL > 0:
+        artifacts.watch(ARTIFACT_RELOAD_INTERVAL)
+    yield
+
+
+class TimedJSONResponse(JSONResponse):
+    # JSON encoding of the body is its own stage in /api/metrics. orjson,
+    # when installed, encodes the large forecast payloads several times faster
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            if orjson is not None:
+                return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+            return super().render(content)
+
 
-app = FastAPI(title="Sri Lanka Tourism Forecast API")
+app = FastAPI(title="Sri Lanka Tourism Forecast API", lifespan=lifespan, default_response_class=TimedJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,25 +71,108 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve frontend static files if they exist
+# Request latency per endpoint and per stage of the forecast path,
+# scraped as Prometheus text from /api/metrics
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram(
+    "api_request_duration_seconds", "Request latency by endpoint (route template).",
+    ("method", "endpoint", "status")
+)
+STAGE_SECONDS = metrics.histogram(
+    "api_stage_duration_seconds", "Time per stage of a request: history, forecast, bands, explain, records, "
+    "serialize, compress; framework is the rest (routing, validation).",
+    ("endpoint", "stage")
+)
+HORIZON_MONTHS = metrics.histogram(
+    "forecast_horizon_months", "Requested forecast horizons.", ("endpoint",), buckets=(1, 3, 6, 12, 24, 36, 48, 60)
+)
+COUNTRY_REQUESTS = metrics.counter(
+    "forecast_country_requests_total", "Forecasts requested per country (single and listed batch requests).",
+    ("country",)
+)
+# gzip/brotli by Accept-Encoding; inside the metrics middleware so the
+# compression time is a stage of the request
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware, requests=REQUEST_SECONDS, stages=STAGE_SECONDS)
+
+# Frontend build, read into memory once with ETags and compressed variants
 FRONTEND_BUILD_PATH = Path("frontend/dist")
-if FRONTEND_BUILD_PATH.exists():
-    app.mount("/static", StaticFiles(directory=str(FRONTEND_BUILD_PATH / "assets")), name="static")
+frontend = StaticSite(FRONTEND_BUILD_PATH) if FRONTEND_BUILD_PATH.exists() else None
+
+# Models + history, swapped atomically when new artifacts land on disk
+if ARTIFACT_LOAD_MODE == "shared":
+    from src.shared_state import SharedArtifactStore
+    artifacts = SharedArtifactStore(os.environ.get("ARTIFACT_SHARED_DIR"))
+else:
+    artifacts = ArtifactStore()
+if ARTIFACT_LOAD_MODE == "eager":
+    artifacts.reload()
+
+# Forecast paths keyed on artifact version + request; misses compute the
+# full MAX_HORIZON path so any shorter horizon is served from its prefix
+forecast_cache = ForecastCache(
+    max_entries=int(os.environ.get("FORECAST_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("FORECAST_CACHE_TTL", "3600"))
+)
+
+# Bounded pool that runs forecast computations (cache misses), coalescing
+# identical in-flight ones; a full queue answers 503 instead of piling up
+forecast_executor = ForecastExecutor(
+    workers=int(os.environ.get("FORECAST_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.environ.get("FORECAST_QUEUE", "64"))
+)
+FORECAST_TIMEOUT = float(os.environ.get("FORECAST_TIMEOUT", "30"))
+
 
-MODEL_PATH = Path("outputs/model.pkl")
-META_PATH = Path("outputs/model_meta.json")
-DATA_PATH = Path("data/total_features.csv")
+@app.exception_handler(Overloaded)
+def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": f"Server busy: {exc}"}, headers={"Retry-After": "1"})
 
-# Load model
-model = joblib.load(MODEL_PATH)
 
-# Load meta info
-meta = json.loads(META_PATH.read_text())
-feature_cols = meta["feature_cols"]
+@app.exception_handler(FutureTimeoutError)
+def timed_out(request: Request, exc: FutureTimeoutError):
+    return JSONResponse(status_code=504, content={"detail": "Forecast computation timed out"})
 
-# Load latest dataset (to compute lag values)
-df = pd.read_csv(DATA_PATH)
-df = df.sort_values("date")
+
+def cached_forecast(key, horizon: int, compute):
+    """
+    Forecast path from the cache. A miss runs compute(MAX_HORIZON) on the
+    forecast pool; identical requests arriving meanwhile share that one run.
+    """
+    return forecast_cache.get_or_compute(
+        key, horizon,
+        lambda n: forecast_executor.run((key, n), lambda: compute(n), FORECAST_TIMEOUT),
+        MAX_HORIZON
+    )
+
+
+def interval_info(req) -> dict:
+    return {"method": "residual_bootstrap", "quantiles": req.quantiles, "n_paths": req.n_paths, "seed": req.seed}
+
+
+def interval_key(req) -> tuple:
+    return ("bands", tuple(req.quantiles), req.n_paths, req.seed)
+
+
+def stream_meta(req) -> dict:
+    meta = {"start_year": req.start_year, "start_month": req.start_month, "horizon": req.horizon}
+    if req.intervals:
+        meta["intervals"] = interval_info(req)
+    return meta
+
+
+def observe_request(endpoint: str, req, countries=()):
+    HORIZON_MONTHS.observe(req.horizon, endpoint)
+    for country in countries:
+        COUNTRY_REQUESTS.inc(country)
+
+
+def current_artifacts():
+    """Loaded artifacts, waiting briefly for a cold start; 503 if not ready in time."""
+    state = artifacts.wait(ARTIFACT_WAIT_TIMEOUT)
+    if state is None:
+        raise HTTPException(status_code=503, detail="Model artifacts are still loading")
+    return state
 
 
 @app.get("/api")
@@ -49,183 +182,591 @@ def root():
 
 @app.get("/api/health")
 def health_check():
+    # Liveness: answers as soon as the port is bound, loaded or not
     return {
         "status": "healthy",
+        "ready": artifacts.ready,
         "message": "Tourism Forecast API is running",
         "version": "1.0.0",
         "endpoints": {
             "predict": "/api/predict",
             "forecast": "/api/forecast", 
             "countries": "/api/countries",
-            "forecast_country": "/api/forecast_country"
-        }
+            "forecast_country": "/api/forecast_country",
+            "forecast_batch": "/api/forecast_batch",
+            "forecast_reconciled": "/api/forecast_reconciled",
+            "explain": "/api/explain",
+            "scenarios": "/api/scenarios",
+            "stream": ["/api/forecast/stream", "/api/forecast_country/stream", "/api/forecast_batch/stream"],
+            "ready": "/api/health/ready",
+            "cache": "/api/cache",
+            "executor": "/api/executor",
+            "metrics": "/api/metrics",
+            "reload": "/api/admin/reload"
+        },
+        "artifacts": artifacts.status()
     }
 
 
-@app.post("/api/predict")
-def predict(year: int, month: int):
-
-    # Get last available values
-    lag_1 = df["arrivals"].iloc[-1]
-    lag_12 = df["arrivals"].iloc[-12] if len(df) >= 12 else lag_1
-    rolling_mean_3 = df["arrivals"].iloc[-3:].mean()
+@app.get("/api/health/ready")
+def readiness_check():
+    # Readiness: 503 until models and history are loaded
+    if not artifacts.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "loading", "ready": False, "artifacts": artifacts.status()}
+        )
+    return {"status": "ready", "ready": True, "artifacts": artifacts.status()}
 
-    last_values = {
-        "lag_1": lag_1,
-        "lag_12": lag_12,
-        "rolling_mean_3": rolling_mean_3
-    }
 
-    X_input = build_features(year, month, last_values)
+@app.post("/api/predict")
+def predict(year: int, month: int):
+    state = current_artifacts()
 
-    prediction = model.predict(X_input[feature_cols])[0]
+    # One step from the last available values (lag_1, lag_12, rolling_mean_3)
+    _, _, preds = forecast_executor.run(
+        (state.model_version, "predict", year, month), lambda: state.forecast_total(year, month, 1), FORECAST_TIMEOUT
+    )
 
     return {
         "year": year,
         "month": month,
-        "predicted_arrivals": round(float(prediction), 2)
+        "predicted_arrivals": round(float(preds[0]), 2),
+        "model_version": state.model_version
     }
 
 
-@app.post("/api/forecast")
-def forecast(req: ForecastRequest):
+def total_path(state, req, horizon: int):
+    """
+    Cached total forecast path (years, months, preds, features). The feature
+    rows are kept with the path so /api/explain reuses them.
+    """
     # Start from the latest known history in total_features.csv
-    history = df.copy().sort_values("date")["arrivals"].tolist()
-
-    y, m = req.start_year, req.start_month
-    results = []
-
-    for step in range(req.horizon):
-        # lag_1: last value in history
-        lag_1 = history[-1]
-
-        # lag_12: value 12 months back if available
-        lag_12 = history[-12] if len(history) >= 12 else lag_1
-
-        # rolling mean 3 of last 3
-        rolling_mean_3 = sum(history[-3:]) / min(3, len(history))
-
-        last_values = {
-            "lag_1": lag_1,
-            "lag_12": lag_12,
-            "rolling_mean_3": rolling_mean_3
-        }
-
-        X_input = build_features(y, m, last_values)
-        pred = float(model.predict(X_input[feature_cols])[0])
+    return cached_forecast(
+        (state.model_version, "total", req.start_year, req.start_month),
+        horizon,
+        lambda n: state.forecast_total(req.start_year, req.start_month, n, return_features=True)
+    )
+
+
+def country_path(state, req, country: str, horizon: int, history, coef, intercept):
+    """Cached forecast path of one country, same shape as total_path."""
+    return cached_forecast(
+        (state.country_model_version, "country", country, req.start_year, req.start_month),
+        horizon,
+        lambda n: recursive_forecast(
+            history, coef, intercept,
+            req.start_year, req.start_month, n, return_features=True
+        )
+    )
+
+
+def total_records(state, req, layout: Layout = "rows"):
+    """Forecast rows (or columns) of the total, with quantile keys if intervals were asked for."""
+    columns = layout == "columns"
+    with stage("forecast"):
+        years, months, preds, _ = total_path(state, req, req.horizon)
+    if not req.intervals:
+        with stage("records"):
+            return (forecast_columns if columns else forecast_records)(years, months, preds)
+
+    # Bootstrapped paths, cached like the point path (prefixes of MAX_HORIZON)
+    with stage("bands"):
+        (bands,) = cached_forecast(
+            (state.model_version, "total", req.start_year, req.start_month, *interval_key(req)),
+            req.horizon,
+            lambda n: (state.total_bands(req.start_year, req.start_month, n, req.quantiles, req.n_paths, req.seed),)
+        )
+    with stage("records"):
+        return (interval_columns if columns else interval_records)(years, months, preds, bands, req.quantiles)
+
+
+def country_records(state, req, country: str, layout: Layout = "rows"):
+    """(forecast rows or columns, per_country) for one known country."""
+    columns = layout == "columns"
+    with stage("history"):
+        history = state.country_index.get(country)
+
+        # Per-country model when one was trained for this country, else the global one
+        coef, intercept, per_country = state.country_model(country)
+
+    with stage("forecast"):
+        years, months, preds, _ = country_path(state, req, country, req.horizon, history, coef, intercept)
+    if not req.intervals:
+        with stage("records"):
+            return (forecast_columns if columns else forecast_records)(years, months, preds), per_country
+
+    with stage("bands"):
+        (bands,) = cached_forecast(
+            (state.country_model_version, "country", country, req.start_year, req.start_month, *interval_key(req)),
+            req.horizon,
+            lambda n: (forecast_bands(
+                [history], coef, intercept, [state.country_residuals(country)],
+                req.start_year, req.start_month, n, req.quantiles, req.n_paths, req.seed, keys=[country]
+            )[0],)
+        )
+    with stage("records"):
+        records = (interval_columns if columns else interval_records)(years, months, preds, bands, req.quantiles)
+        return records, per_country
+
+
+def batch_records(state, req, countries, cached: bool = True, layout: Layout = "rows"):
+    """
+    (forecast rows or columns per country, per_country flags) from one batched
+    recursion. Streaming calls this uncached, one chunk of countries at a time.
+    """
+    columns = layout == "columns"
+    with stage("history"):
+        histories = [state.country_index.get(c) for c in countries]
+
+        # One (n_countries x features) matrix product per horizon step,
+        # with one coefficient row per country when per-country models exist
+        coef, intercept, per_country = state.country_coefficients(countries)
+
+    def paths(n):
+        return recursive_forecast_batch(histories, coef, intercept, req.start_year, req.start_month, n)
+
+    def bands_of(n):
+        # All countries' paths simulated together, (n_countries, n_quantiles, horizon)
+        return (forecast_bands(
+            histories, coef, intercept, [state.country_residuals(c) for c in countries],
+            req.start_year, req.start_month, n, req.quantiles, req.n_paths, req.seed, keys=countries
+        ),)
+
+    key = (state.country_model_version, "batch", tuple(countries), req.start_year, req.start_month)
+    with stage("forecast"):
+        if cached:
+            years, months, preds = cached_forecast(key, req.horizon, paths)
+        else:
+            years, months, preds = forecast_executor.run(
+                (key, req.horizon), lambda: paths(req.horizon), FORECAST_TIMEOUT
+            )
+
+    if not req.intervals:
+        build = forecast_columns if columns else forecast_records
+        with stage("records"):
+            return [build(years, months, p) for p in preds], per_country
+
+    with stage("bands"):
+        if cached:
+            (bands,) = cached_forecast(key + interval_key(req), req.horizon, bands_of)
+        else:
+            (bands,) = forecast_executor.run(
+                (key + interval_key(req), req.horizon), lambda: bands_of(req.horizon), FORECAST_TIMEOUT
+            )
+    build = interval_columns if columns else interval_records
+    with stage("records"):
+        return [build(years, months, p, b, req.quantiles) for p, b in zip(preds, bands)], per_country
+
+
+def select_countries(state, req):
+    """(known countries, unknown countries) of a batch request, upper-cased and de-duplicated."""
+    country_index = state.country_index
+    if req.countries == "all":
+        return country_index.countries, []
+
+    requested = list(dict.fromkeys(c.upper() for c in req.countries))
+    countries = [c for c in requested if c in country_index]
+    not_found = [c for c in requested if c not in country_index]
+    return countries, not_found
+
+
+# Forecast endpoints return their response object directly, skipping
+# FastAPI's jsonable_encoder pass: the content is plain lists and dicts
+# already. layout=columns gives one array per field instead of one object
+# per month.
 
-        results.append({
-            "year": y,
-            "month": m,
-            "predicted_arrivals": round(pred, 2)
-        })
-
-        # Append prediction into history so next step uses it
-        history.append(pred)
-
-        # Move to next month
-        y, m = add_month(y, m)
+@app.post("/api/forecast")
+def forecast(req: ForecastRequest, layout: Layout = "rows"):
+    state = current_artifacts()
+    observe_request("/api/forecast", req)
 
-    return {
+    response = {
         "start_year": req.start_year,
         "start_month": req.start_month,
         "horizon": req.horizon,
-        "forecast": results
+        "forecast": total_records(state, req, layout),
+        "model_version": state.model_version
     }
+    if req.intervals:
+        response["intervals"] = interval_info(req)
+    return TimedJSONResponse(response)
 
-# country level forecast setup
-
-MODEL_COUNTRY_PATH = Path("outputs/model_country.pkl")
-COUNTRY_DATA_PATH = Path("data/country_features.csv")
-
-model_country = joblib.load(MODEL_COUNTRY_PATH)
-df_country = pd.read_csv(COUNTRY_DATA_PATH)
-df_country = df_country.sort_values(["country", "date"])
 
+# country level forecast
 
 @app.get("/api/countries")
 def get_countries():
-    return {"countries": sorted(df_country["country"].unique().tolist())}
+    return {"countries": current_artifacts().country_index.countries}
 
 
 @app.post("/api/forecast_country")
-def forecast_country(req: CountryForecastRequest):
-
-    country_df = df_country[df_country["country"] == req.country.upper()].copy()
+def forecast_country(req: CountryForecastRequest, layout: Layout = "rows"):
+    state = current_artifacts()
+    country = req.country.upper()
 
-    if country_df.empty:
+    if country not in state.country_index:
         return {"error": "Country not found"}
 
-    history = country_df["arrivals"].tolist()
+    observe_request("/api/forecast_country", req, [country])
+    results, per_country = country_records(state, req, country, layout)
 
-    y, m = req.start_year, req.start_month
-    results = []
+    response = {
+        "country": country,
+        "start_year": req.start_year,
+        "start_month": req.start_month,
+        "horizon": req.horizon,
+        "forecast": results,
+        "model": "per_country" if per_country else "global",
+        "model_version": state.country_model_version
+    }
+    if req.intervals:
+        response["intervals"] = interval_info(req)
+    return TimedJSONResponse(response)
 
-    for _ in range(req.horizon):
 
-        lag_1 = history[-1]
-        lag_12 = history[-12] if len(history) >= 12 else lag_1
-        rolling_mean_3 = sum(history[-3:]) / min(3, len(history))
+@app.post("/api/forecast_batch")
+def forecast_batch(req: BatchForecastRequest, layout: Layout = "rows"):
+    state = current_artifacts()
+    countries, not_found = select_countries(state, req)
 
-        month_sin = np.sin(2 * np.pi * m / 12)
-        month_cos = np.cos(2 * np.pi * m / 12)
+    if not countries:
+        return {"error": "Country not found", "not_found": not_found}
 
-        X_input = pd.DataFrame([{
-            "year": y,
-            "month": m,
-            "month_sin": month_sin,
-            "month_cos": month_cos,
-            "lag_1": lag_1,
-            "lag_12": lag_12,
-            "rolling_mean_3": rolling_mean_3
-        }])
+    observe_request("/api/forecast_batch", req, countries if req.countries != "all" else ())
+    results, per_country = batch_records(state, req, countries, layout=layout)
 
-        pred = float(model_country.predict(X_input)[0])
+    response = {
+        "start_year": req.start_year,
+        "start_month": req.start_month,
+        "horizon": req.horizon,
+        "forecasts": [
+            {
+                "country": c,
+                "forecast": results[i],
+                "model": "per_country" if per_country[i] else "global"
+            }
+            for i, c in enumerate(countries)
+        ],
+        "not_found": not_found,
+        "model_version": state.country_model_version
+    }
+    if req.intervals:
+        response["intervals"] = interval_info(req)
+    return TimedJSONResponse(response)
+
+
+# Streaming variants: one NDJSON line (or SSE event) per month / per country,
+# framed by a "meta" message first and an "end" message last. Only the batch
+# stream is progressive; a single path comes whole from the forecast cache
+
+@app.post("/api/forecast/stream")
+def forecast_stream(req: ForecastRequest, format: Optional[StreamFormat] = None, accept: Optional[str] = Header(None)):
+    state = current_artifacts()
+    observe_request("/api/forecast/stream", req)
+
+    def messages():
+        yield {"type": "meta", **stream_meta(req), "model_version": state.model_version}
+        results = total_records(state, req)
+        for row in results:
+            yield {"type": "month", **row}
+        yield {"type": "end", "months": len(results)}
+
+    return stream_response(messages(), stream_format(format, accept))
+
+
+@app.post("/api/forecast_country/stream")
+def forecast_country_stream(req: CountryForecastRequest, format: Optional[StreamFormat] = None,
+                            accept: Optional[str] = Header(None)):
+    state = current_artifacts()
+    country = req.country.upper()
+    if country in state.country_index:
+        observe_request("/api/forecast_country/stream", req, [country])
+
+    def messages():
+        if country not in state.country_index:
+            yield {"type": "error", "error": "Country not found"}
+            return
+        results, per_country = country_records(state, req, country)
+        yield {
+            "type": "meta", "country": country, **stream_meta(req),
+            "model": "per_country" if per_country else "global",
+            "model_version": state.country_model_version
+        }
+        for row in results:
+            yield {"type": "month", **row}
+        yield {"type": "end", "months": len(results)}
 
-        results.append({
-            "year": y,
-            "month": m,
-            "predicted_arrivals": round(pred, 2)
-        })
+    return stream_response(messages(), stream_format(format, accept))
 
-        history.append(pred)
 
-        # Move to next month using utility function
-        y, m = add_month(y, m)
+@app.post("/api/forecast_batch/stream")
+def forecast_batch_stream(req: BatchForecastRequest, format: Optional[StreamFormat] = None,
+                          accept: Optional[str] = Header(None)):
+    state = current_artifacts()
+    countries, not_found = select_countries(state, req)
+    observe_request("/api/forecast_batch/stream", req, countries if req.countries != "all" else ())
 
-    return {
-        "country": req.country.upper(),
+    def messages():
+        yield {
+            "type": "meta", **stream_meta(req), "countries": len(countries), "not_found": not_found,
+            "model_version": state.country_model_version
+        }
+        # Chunks of countries are forecast and sent one after another, so
+        # only one chunk is ever held in memory
+        for start in range(0, len(countries), STREAM_CHUNK):
+            part = countries[start:start + STREAM_CHUNK]
+            results, per_country = batch_records(state, req, part, cached=False)
+            for c, rows, own in zip(part, results, per_country):
+                yield {"type": "forecast", "country": c, "forecast": rows, "model": "per_country" if own else "global"}
+        yield {"type": "end", "countries": len(countries)}
+
+    return stream_response(messages(), stream_format(format, accept))
+
+
+@app.post("/api/forecast_reconciled")
+def forecast_reconciled(req: ReconciledForecastRequest, layout: Layout = "rows"):
+    state = current_artifacts()
+    countries = state.country_index.countries
+    observe_request("/api/forecast_reconciled", req)
+
+    def compute(n):
+        # Total + every country in one batched recursion, then one projection
+        years, months, base = state.hierarchy_forecast(req.start_year, req.start_month, n)
+        variances = state.hierarchy_variances() if req.method == "mint" else None
+        return years, months, base, reconcile(base, req.method, variances)
+
+    with stage("forecast"):
+        years, months, base, reconciled = cached_forecast(
+            (state.model_version, state.country_model_version, "reconciled", req.method, req.start_year, req.start_month),
+            req.horizon,
+            compute
+        )
+
+    build = reconciled_columns if layout == "columns" else reconciled_records
+    with stage("records"):
+        total = build(years, months, reconciled[0], base[0])
+        forecasts = [
+            {"country": c, "forecast": build(years, months, reconciled[i + 1], base[i + 1])}
+            for i, c in enumerate(countries)
+        ]
+
+    return TimedJSONResponse({
         "start_year": req.start_year,
         "start_month": req.start_month,
         "horizon": req.horizon,
-        "forecast": results
+        "method": req.method,
+        "total": total,
+        "forecasts": forecasts,
+        "model_version": state.model_version,
+        "country_model_version": state.country_model_version
+    })
+
+
+@app.post("/api/scenarios")
+def scenarios(req: ScenarioRequest, layout: Layout = "rows"):
+    state = current_artifacts()
+    observe_request("/api/scenarios", req)
+
+    # One request is one task on the forecast pool, so its size is capped
+    # here: "all" in every scenario would be scenarios x countries series
+    series = count_series(req.scenarios, state.country_index.countries)
+    if series > MAX_SCENARIO_SERIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Request expands to {series} (scenario, country) series; the limit is {MAX_SCENARIO_SERIES}."
+        )
+
+    with stage("history"):
+        pairs, not_found = scenario_shocks(
+            req.scenarios, state.country_index.countries, req.start_year, req.start_month, req.horizon
+        )
+
+    # Every scenario and its baselines in batched recursions, on the forecast
+    # pool; identical requests in flight share one run
+    with stage("forecast"):
+        years, months, countries, baseline, paths = forecast_executor.run(
+            (state.country_model_version, "scenarios", req.model_dump_json()),
+            lambda: state.scenario_forecast(pairs, req.start_year, req.start_month, req.horizon),
+            FORECAST_TIMEOUT
+        )
+
+    with stage("records"):
+        position = {c: i for i, c in enumerate(countries)}
+        scenario_index = np.array([i for i, _ in pairs], dtype=np.intp)
+        baselines = baseline[[position[c] for _, c in pairs]]
+        total_delta = np.zeros((len(req.scenarios), req.horizon))
+        np.add.at(total_delta, scenario_index, paths - baselines)
+
+        build = scenario_columns if layout == "columns" else scenario_records
+        results = [
+            {
+                "name": s.name or f"scenario_{i + 1}",
+                "countries": [],
+                "total_delta": (delta_columns if layout == "columns" else delta_records)(years, months, total_delta[i])
+            }
+            for i, s in enumerate(req.scenarios)
+        ]
+        for (i, country), path, base in zip(pairs, paths, baselines):
+            results[i]["countries"].append({"country": country, "forecast": build(years, months, path, base)})
+
+    return TimedJSONResponse({
+        "start_year": req.start_year,
+        "start_month": req.start_month,
+        "horizon": req.horizon,
+        "scenarios": results,
+        "not_found": not_found,
+        "model_version": state.country_model_version
+    })
+
+
+@app.post("/api/explain")
+def explain(req: ExplainRequest):
+    state = current_artifacts()
+    country = req.country.upper() if req.country is not None else None
+
+    if country is None:
+        observe_request("/api/explain", req)
+        key = (state.model_version, "total", req.start_year, req.start_month)
+        feature_cols, version = state.feature_cols, state.model_version
+        method = "linear" if state.coef is not None else "tree_shap"
+        with stage("forecast"):
+            years, months, preds, features = total_path(state, req, MAX_HORIZON)
+        attribute = state.explain_total
+    else:
+        if country not in state.country_index:
+            return {"error": "Country not found"}
+        observe_request("/api/explain", req, [country])
+        key = (state.country_model_version, "country", country, req.start_year, req.start_month)
+        feature_cols, version, method = FEATURE_COLS, state.country_model_version, "linear"
+        with stage("history"):
+            history = state.country_index.get(country)
+            coef, intercept, _ = state.country_model(country)
+        with stage("forecast"):
+            years, months, preds, features = country_path(state, req, country, MAX_HORIZON, history, coef, intercept)
+        attribute = lambda f: state.explain_country(country, f)
+
+    # Attributions of the whole cached path, from the feature rows the
+    # forecast was fed; shorter horizons are prefixes like the path itself
+    with stage("explain"):
+        try:
+            contributions, base = cached_forecast(
+                key + ("explain",), MAX_HORIZON, lambda n: attribute(features[..., :n])
+            )
+        except ImportError as e:
+            # A non-linear total model without shap installed
+            raise HTTPException(status_code=501, detail=str(e))
+
+    h = req.horizon
+    with stage("records"):
+        groups = group_contributions(contributions[..., :h], feature_cols)
+        records = explanation_records(years[:h], months[:h], preds[:h], groups)
+
+    response = {
+        "start_year": req.start_year,
+        "start_month": req.start_month,
+        "horizon": req.horizon,
+        "method": method,
+        "base_value": round(float(base[0]), 2),
+        "features": list(groups),
+        "explanations": records,
+        "model_version": version
     }
+    if country is not None:
+        response = {"country": country, **response}
+    return response
+
+
+@app.get("/api/cache")
+def cache_stats():
+    return forecast_cache.stats()
+
+
+@metrics.collector
+def runtime_metrics():
+    # Read at scrape time from the objects that already keep these numbers
+    state = artifacts.current
+    cache = forecast_cache.stats()
+    executor = forecast_executor.stats()
+    load_seconds = state.load_seconds if state else {}
+    return [
+        ("artifact_ready", "gauge", "1 once models and history are loaded.", [({}, int(artifacts.ready))]),
+        ("artifact_generation", "gauge", "Artifact generations loaded since start.", [({}, artifacts.generation)]),
+        ("artifact_loaded_timestamp_seconds", "gauge", "When the current generation was loaded.",
+         [({}, state.loaded_at if state else None)]),
+        ("artifact_load_seconds", "gauge", "Load time of each step of the current generation.",
+         [({"step": k}, v) for k, v in load_seconds.items()]),
+        ("forecast_cache_entries", "gauge", "Cached forecast paths.", [({}, cache["entries"])]),
+        ("forecast_cache_lookups_total", "counter", "Forecast cache lookups by result.",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("forecast_cache_prefix_hits_total", "counter", "Hits served from a longer cached path.",
+         [({}, cache["prefix_hits"])]),
+        ("forecast_cache_evictions_total", "counter", "LRU evictions.", [({}, cache["evictions"])]),
+        ("forecast_executor_queued", "gauge", "Forecast computations waiting for a worker.",
+         [({}, executor["queued"])]),
+        ("forecast_executor_running", "gauge", "Forecast computations running.", [({}, executor["running"])]),
+        ("forecast_executor_tasks_total", "counter", "Forecast computations by outcome.",
+         [({"outcome": k}, executor[k]) for k in ("submitted", "coalesced", "rejected", "completed", "failed")])
+    ]
+
+
+@app.get("/api/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/executor")
+def executor_stats():
+    # Queue depth, coalescing and wait/run time percentiles, for sizing FORECAST_WORKERS
+    return forecast_executor.stats()
+
+
+@app.post("/api/admin/reload")
+def reload_artifacts(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Pick up retrained artifacts now instead of waiting for the watcher."""
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        reloaded = artifacts.reload(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving previous artifacts: {e}")
+
+    return {"reloaded": reloaded, **artifacts.status()}
 
 
 # Serve frontend for all non-API routes
+@app.get("/static/{path:path}")
+async def serve_static(path: str, request: Request):
+    """Files of frontend/dist/assets (older builds link them under /static)"""
+    file = frontend.get(f"assets/{path}") if frontend is not None else None
+    if file is None:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return frontend.response(file, request.headers)
+
+
 @app.get("/{full_path:path}")
-async def serve_frontend(full_path: str):
+async def serve_frontend(full_path: str, request: Request):
     """Serve the React frontend for all non-API routes"""
     if full_path.startswith("api/") or full_path in ["docs", "redoc", "openapi.json"]:
         return {"error": "API endpoint not found"}
     
-    # Serve React app
-    if FRONTEND_BUILD_PATH.exists():
-        index_file = FRONTEND_BUILD_PATH / "index.html"
-        if index_file.exists():
-            return FileResponse(str(index_file))
+    # A file of the build (/assets/*, favicon), else the app's index.html
+    # so client-side routes load the React app
+    if frontend is not None:
+        file = frontend.get(full_path) or frontend.index
+        if file is not None:
+            return frontend.response(file, request.headers)
     
     return {"message": "Frontend not built. Run 'npm run build' in the frontend directory."}
 
 
 # Serve root path
 @app.get("/")
-async def serve_root():
+async def serve_root(request: Request):
     """Serve the React frontend at root path"""
-    if FRONTEND_BUILD_PATH.exists():
-        index_file = FRONTEND_BUILD_PATH / "index.html"
-        if index_file.exists():
-            return FileResponse(str(index_file))
+    if frontend is not None and frontend.index is not None:
+        return frontend.response(frontend.index, request.headers)
     
     return {
         "message": "Tourism Forecast API Running",
@@ -0,0 +1,407 @@
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from src.columnar import CATEGORICAL_COLS, TABLES, categories, has_table, read_columns, schema_path, table_dir
+from src.forecasting import (
+    FEATURE_COLS, HistoryIndex, linear_coefficients, month_features, recursive_forecast, recursive_forecast_batch,
+    recursive_forecast_model
+)
+from src.explain import linear_contributions, tree_contributions
+from src.intervals import forecast_bands
+from src.model_format import LinearRegistry, load_model
+from src.scenarios import SCENARIO_CHUNK
+
+
+MODEL_PATH = Path("outputs/model.pkl")
+MODEL_COMPACT_PATH = Path("outputs/model.json")
+META_PATH = Path("outputs/model_meta.json")
+DATA_PATH = Path("data/total_features.csv")
+MODEL_COUNTRY_PATH = Path("outputs/model_country.pkl")
+MODEL_COUNTRY_COMPACT_PATH = Path("outputs/model_country.json")
+MODEL_COUNTRY_REGISTRY_PATH = Path("outputs/model_country_registry.json")
+COUNTRY_DATA_PATH = Path("data/country_features.csv")
+
+ARTIFACT_PATHS = (
+    MODEL_PATH, MODEL_COMPACT_PATH, META_PATH, DATA_PATH, schema_path("total_features"),
+    MODEL_COUNTRY_PATH, MODEL_COUNTRY_COMPACT_PATH, COUNTRY_DATA_PATH, schema_path("country_features"),
+    MODEL_COUNTRY_REGISTRY_PATH, LinearRegistry.data_path(MODEL_COUNTRY_REGISTRY_PATH)
+)
+
+
+def artifact_version(*paths) -> str:
+    """Short content hash of the artifacts a forecast depends on."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def artifact_fingerprint(paths=ARTIFACT_PATHS):
+    """Cheap change detector: (path, mtime_ns, size) for every artifact, None if missing."""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            fingerprint.append((str(path), None, None))
+            continue
+        fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def read_history(name: str, columns):
+    """
+    Columns of a feature table: zero-copy from the columnar store when it has
+    been built, otherwise parsed from the CSV export (needs pandas).
+
+    Returns (arrays, categorical levels, source files).
+    """
+    if has_table(name):
+        arrays, schema = read_columns(name, columns)
+        levels = {c: categories(schema, c) for c in columns if c in CATEGORICAL_COLS}
+        sources = [table_dir(name) / f"{c}.npy" for c in columns] + [schema_path(name)]
+        return arrays, levels, sources
+
+    import pandas as pd
+
+    csv_path, sort_keys = TABLES[name]
+    df = pd.read_csv(csv_path).sort_values(sort_keys)
+    return {c: df[c].to_numpy() for c in columns}, {}, [csv_path]
+
+
+class ArtifactState:
+    """
+    One fully built generation of models and history.
+
+    Never mutated after construction: handlers grab a reference once and
+    keep using it even if a newer generation is swapped in mid-request.
+
+    Models come from the compact JSON format and history from the columnar
+    store when they are present, so neither scikit-learn nor pandas is
+    imported on the serving path. Per-step load times are kept in
+    load_seconds for the startup report.
+    """
+
+    def __init__(self):
+        self.load_seconds = {}
+        timer = self._timer
+
+        # Total model
+        with timer("model"):
+            self.model, model_source = load_model(MODEL_COMPACT_PATH, MODEL_PATH)
+        self.meta = json.loads(META_PATH.read_text())
+        self.feature_cols = self.meta["feature_cols"]
+        # Linear models run the NumPy recursion; anything else (a pickled
+        # CatBoost model, where its packages are installed) is called through predict()
+        self.coef, self.intercept = (
+            linear_coefficients(self.model, self.feature_cols) if hasattr(self.model, "coef_") else (None, None)
+        )
+
+        # Latest history, sorted by date (to compute lag values)
+        with timer("total_features"):
+            total, _, total_sources = read_history("total_features", ["date", "arrivals", *self.feature_cols])
+            self.dates_total = total["date"]
+            self.history_total = total["arrivals"]
+
+        # In-sample residuals of the training fit, bootstrapped for intervals
+        with timer("residuals"):
+            X = np.column_stack([total[c] for c in self.feature_cols]).astype(np.float64)
+            # Training rows, also the background of /api/explain
+            self.features_total = X
+            fitted = X @ self.coef + self.intercept if self.coef is not None else np.ravel(self.model.predict(X))
+            self.residuals_total = np.asarray(self.history_total, dtype=np.float64) - fitted
+
+        # Country model
+        with timer("model_country"):
+            self.model_country, model_country_source = load_model(MODEL_COUNTRY_COMPACT_PATH, MODEL_COUNTRY_PATH)
+        self.coef_country, self.intercept_country = linear_coefficients(self.model_country, FEATURE_COLS)
+
+        # Per-country models, if trained (train_country.py --per-country).
+        # Countries without a row of their own use the global country model.
+        registry_sources = []
+        self.country_registry = None
+        if MODEL_COUNTRY_REGISTRY_PATH.exists():
+            with timer("model_country_registry"):
+                registry = LinearRegistry.load(MODEL_COUNTRY_REGISTRY_PATH)
+                position = [registry.feature_cols.index(c) for c in FEATURE_COLS]
+                self.country_registry = registry
+                self.coef_registry = np.ascontiguousarray(registry.coef[:, position])
+                self.intercept_registry = np.asarray(registry.intercept, dtype=np.float64)
+            registry_sources = [MODEL_COUNTRY_REGISTRY_PATH, LinearRegistry.data_path(MODEL_COUNTRY_REGISTRY_PATH)]
+
+        with timer("country_features"):
+            country, levels, country_sources = read_history("country_features", ["country", "arrivals", *FEATURE_COLS])
+            self.country_index = HistoryIndex(country["country"], country["arrivals"], levels.get("country"))
+
+        # Aligned with the country history rows; each country's residuals come
+        # from the model that forecasts it
+        with timer("country residuals"):
+            X = np.column_stack([country[c] for c in FEATURE_COLS]).astype(np.float64)
+            self.features_country = X
+            fitted = np.empty(len(X))
+            for name in self.country_index.countries:
+                rows = self.country_index.span(name)
+                coef, intercept, _ = self.country_model(name)
+                fitted[rows] = X[rows] @ coef + intercept
+            self.residuals_country = np.asarray(country["arrivals"], dtype=np.float64) - fitted
+
+        with timer("artifact hashes"):
+            self.model_version = artifact_version(model_source, META_PATH, *total_sources)
+            self.country_model_version = artifact_version(model_country_source, *registry_sources, *country_sources)
+        self.model_sources = {
+            "model": str(model_source),
+            "model_country": str(model_country_source),
+            "model_country_registry": str(registry_sources[0]) if registry_sources else None,
+            "total_features": str(total_sources[-1]),
+            "country_features": str(country_sources[-1])
+        }
+        self.loaded_at = time.time()
+
+    def forecast_total(self, start_year: int, start_month: int, horizon: int, return_features: bool = False):
+        """Recursive total forecast from the latest history: (years, months, predictions[, features])."""
+        if self.coef is not None:
+            return recursive_forecast(
+                self.history_total, self.coef, self.intercept,
+                start_year, start_month, horizon, self.feature_cols, return_features
+            )
+        return recursive_forecast_model(
+            self.history_total, self.model, start_year, start_month, horizon, self.feature_cols, return_features
+        )
+
+    def total_bands(self, start_year: int, start_month: int, horizon: int, quantiles, n_paths: int, seed: int):
+        """Bootstrapped quantile bands of the total forecast, (n_quantiles, horizon)."""
+        predict = None if self.coef is not None else self.model.predict
+        return forecast_bands(
+            [self.history_total], self.coef, self.intercept, [self.residuals_total],
+            start_year, start_month, horizon, quantiles, n_paths, seed,
+            keys=["TOTAL"], feature_cols=self.feature_cols, predict=predict
+        )[0]
+
+    def explain_total(self, features):
+        """
+        Feature attributions of a total forecast path from its feature rows
+        (n_features, horizon): (contributions like features, base value per month).
+        """
+        if self.coef is not None:
+            contributions, base = linear_contributions(features, self.coef, self.intercept, self.features_total)
+        else:
+            contributions, base = tree_contributions(self.model, features, self.features_total, self.model_version)
+        return contributions, np.full(features.shape[-1], base)
+
+    def explain_country(self, country, features):
+        """Same for one country, against the rows its model was trained on."""
+        coef, intercept, per_country = self.country_model(country)
+        background = self.features_country[self.country_index.span(country)] if per_country else self.features_country
+        contributions, base = linear_contributions(features, coef, intercept, background)
+        return contributions, np.full(features.shape[-1], base)
+
+    def country_residuals(self, country):
+        """Training residuals of one country's rows."""
+        return self.residuals_country[self.country_index.span(country)]
+
+    def hierarchy_forecast(self, start_year: int, start_month: int, horizon: int):
+        """
+        Base forecasts of the total and every country, (1 + n_countries, horizon),
+        total first. With a linear total model on the standard features the
+        total is one more row of the country batch, so all series advance in
+        one matrix product per month.
+        """
+        countries = self.country_index.countries
+        coef, intercept, _ = self.country_coefficients(countries)
+        histories = [self.country_index.get(c) for c in countries]
+
+        if self.coef is not None and list(self.feature_cols) == FEATURE_COLS:
+            coef = np.vstack([self.coef, np.broadcast_to(coef, (len(countries), len(FEATURE_COLS)))])
+            intercept = np.concatenate([[self.intercept], np.broadcast_to(intercept, (len(countries),))])
+            return recursive_forecast_batch(
+                [self.history_total, *histories], coef, intercept, start_year, start_month, horizon
+            )
+
+        years, months, total = self.forecast_total(start_year, start_month, horizon)
+        _, _, preds = recursive_forecast_batch(histories, coef, intercept, start_year, start_month, horizon)
+        return years, months, np.vstack([total, preds])
+
+    def scenario_forecast(self, pairs: dict, start_year: int, start_month: int, horizon: int):
+        """
+        Baseline and shocked paths for the pairs of scenarios.scenario_shocks,
+        all in batched recursions: (years, months, countries, baseline
+        (n_countries, horizon), paths (n_pairs, horizon) in pair order).
+        """
+        countries = sorted({c for _, c in pairs})
+        if not countries:
+            years, months, _, _ = month_features(start_year, start_month, horizon)
+            return years, months, countries, np.empty((0, horizon)), np.empty((0, horizon))
+
+        coef, intercept, _ = self.country_coefficients(countries)
+        histories = [self.country_index.get(c) for c in countries]
+        position = {c: i for i, c in enumerate(countries)}
+
+        # One unshocked row per country, then one row per pair
+        series = np.concatenate([np.arange(len(countries)), [position[c] for _, c in pairs]]).astype(np.intp)
+        multiplier = np.vstack([np.ones((len(countries), horizon)), *(m for m, _ in pairs.values())])
+        offset = np.vstack([np.zeros((len(countries), horizon)), *(a for _, a in pairs.values())])
+
+        preds = np.empty((len(series), horizon))
+        for start in range(0, len(series), SCENARIO_CHUNK):
+            part = slice(start, start + SCENARIO_CHUNK)
+            rows = series[part]
+            years, months, preds[part] = recursive_forecast_batch(
+                [histories[r] for r in rows],
+                coef[rows] if np.ndim(coef) == 2 else coef,
+                intercept[rows] if np.ndim(intercept) else intercept,
+                start_year, start_month, horizon, shocks=(multiplier[part], offset[part])
+            )
+        return years, months, countries, preds[:len(countries)], preds[len(countries):]
+
+    def hierarchy_variances(self) -> np.ndarray:
+        """Mean squared training residual of the total and each country, in hierarchy order."""
+        return np.array(
+            [np.mean(self.residuals_total ** 2)]
+            + [np.mean(self.country_residuals(c) ** 2) for c in self.country_index.countries]
+        )
+
+    def country_coefficients(self, countries):
+        """
+        (coef, intercept, per_country) for forecasting `countries`: the global
+        country model when none of them has its own row, otherwise one
+        coefficient row per country as recursive_forecast_batch takes them.
+        """
+        registry = self.country_registry
+        rows = [registry.row(c) for c in countries] if registry is not None else []
+        if not any(r is not None for r in rows):
+            return self.coef_country, self.intercept_country, [False] * len(countries)
+
+        per_country = [r is not None for r in rows]
+        coef = np.array([
+            self.coef_registry[r] if r is not None else self.coef_country for r in rows
+        ])
+        intercept = np.array([
+            self.intercept_registry[r] if r is not None else self.intercept_country for r in rows
+        ])
+        return coef, intercept, per_country
+
+    def country_model(self, country):
+        """(coef, intercept, per_country) of the model used for one country."""
+        registry = self.country_registry
+        row = registry.row(country) if registry is not None else None
+        if row is None:
+            return self.coef_country, self.intercept_country, False
+        return self.coef_registry[row], float(self.intercept_registry[row]), True
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        yield
+        self.load_seconds[name] = round(time.perf_counter() - start, 4)
+
+
+class ArtifactStore:
+    """
+    Holds the current ArtifactState and swaps in new generations.
+
+    A reload builds the new state off to the side and then replaces the
+    reference in one assignment, so requests never see a half-loaded state.
+    """
+
+    def __init__(self, loader=ArtifactState):
+        self._loader = loader
+        self._lock = threading.Lock()
+        # Separate from _lock, which a running load holds: starting (or
+        # skipping) the loader thread must not wait for that load to finish
+        self._start_lock = threading.Lock()
+        self._fingerprint = None
+        self._ready = threading.Event()
+        self._loader_thread = None
+        self.current = None
+        self.generation = 0
+        self.last_error = None
+
+    def reload(self, force: bool = False) -> bool:
+        """Load new artifacts if they changed on disk (or if forced). Returns True on swap."""
+        with self._lock:
+            fingerprint = artifact_fingerprint()
+            if not force and self.current is not None and fingerprint == self._fingerprint:
+                return False
+
+            try:
+                state = self._loader()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            self._fingerprint = fingerprint
+            self.last_error = None
+
+            current = self.current
+            if (not force and current is not None
+                    and state.model_version == current.model_version
+                    and state.country_model_version == current.country_model_version):
+                # Touched but unchanged content: keep the warm state
+                return False
+
+            self.current = state
+            self.generation += 1
+            self._ready.set()
+            return True
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def load_in_background(self):
+        """Start the first load on a daemon thread; no-op if loaded or already loading."""
+        with self._start_lock:
+            if self.current is not None:
+                return
+            if self._loader_thread is not None and self._loader_thread.is_alive():
+                return
+
+            def load():
+                try:
+                    self.reload()
+                except Exception:
+                    # Not ready; error is in last_error and the watcher retries
+                    pass
+
+            self._loader_thread = threading.Thread(target=load, name="artifact-loader", daemon=True)
+            self._loader_thread.start()
+
+    def wait(self, timeout: float = None):
+        """Current state, starting a lazy load and waiting up to `timeout` if there is none yet."""
+        if self.current is None:
+            self.load_in_background()
+            self._ready.wait(timeout)
+        return self.current
+
+    def watch(self, interval: float):
+        """Poll artifact mtimes every `interval` seconds on a daemon thread."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception:
+                    # Keep serving the previous generation; error is in last_error
+                    pass
+
+        thread = threading.Thread(target=loop, name="artifact-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> dict:
+        state = self.current
+        return {
+            "model_version": state.model_version if state else None,
+            "country_model_version": state.country_model_version if state else None,
+            "loaded_at": state.loaded_at if state else None,
+            "load_seconds": state.load_seconds if state else None,
+            "model_sources": state.model_sources if state else None,
+            "generation": self.generation,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,367 @@
+"""
+Rolling-origin backtest of the total and country models.
+
+For every origin month the model is fitted on all feature rows before it
+(expanding window), forecasts `horizon` months recursively from the
+history before it, exactly like the API, and is scored against what
+actually happened. Errors are reported per horizon, and per country for
+the country model.
+
+The models are the ones being served: the total model uses the feature
+columns and model type of outputs/model_meta.json (as promoted by
+select_model.py), and countries with a row in the per-country registry are
+fitted on their own rows (or their region's), the rest on all rows.
+
+Histories are read positionally from the month grid: a series is scored
+from an origin only if its last 12 months before it are all observed, so
+lag_12 never reaches across a gap.
+
+Origins are split into contiguous chunks that run in parallel. Within a
+chunk a least-squares fit is not redone from scratch: the normal
+equations are updated with the rows added since the previous origin.
+Other model types (ridge, lasso, catboost) are refitted at every origin.
+
+    python -m src.backtest
+    python -m src.backtest --horizon 12 --min-train 24 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import read_frame
+from src.forecasting import FEATURE_COLS, recursive_forecast_batch, recursive_forecast_model
+from src.select_model import as_linear, make_model
+
+
+OUT_DIR = Path("outputs/backtest")
+TOTAL_PATH = OUT_DIR / "total.csv"
+COUNTRY_PATH = OUT_DIR / "country.csv"
+SUMMARY_PATH = OUT_DIR / "summary.json"
+META_PATH = Path("outputs/model_meta.json")
+REGISTRY_PATH = Path("outputs/model_country_registry.json")
+
+HORIZON = 12
+MIN_TRAIN_MONTHS = 24
+# The lag window: months a series must have observed, without a gap, before an origin
+LAG_WINDOW = 12
+# Registry groups with fewer rows use the global model (train_country.MIN_ROWS)
+MIN_GROUP_ROWS = 24
+
+
+class IncrementalLinear:
+    """
+    Ordinary least squares with an intercept, kept as normal equations so
+    new rows can be added without refitting. Features are centred and
+    scaled by fixed constants first, which only conditions the system;
+    the returned coefficients are in the original units.
+    """
+
+    def __init__(self, shift, scale):
+        self.shift = np.asarray(shift, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        k = len(self.shift) + 1
+        self.gram = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.n = 0
+
+    def add(self, X, y):
+        if len(X) == 0:
+            return
+        A = np.column_stack([np.ones(len(X)), (X - self.shift) / self.scale])
+        self.gram += A.T @ A
+        self.xty += A.T @ y
+        self.n += len(X)
+
+    def coefficients(self):
+        beta = np.linalg.lstsq(self.gram, self.xty, rcond=None)[0]
+        coef = beta[1:] / self.scale
+        intercept = float(beta[0] - coef @ self.shift)
+        return coef, intercept
+
+
+def month_id(dates) -> np.ndarray:
+    dates = pd.DatetimeIndex(dates)
+    return np.asarray(dates.year * 12 + dates.month - 1, dtype=np.int64)
+
+
+def served_total_model(meta_path: Path = META_PATH):
+    """(feature_cols, model spec) of the promoted total model; spec None for plain least squares."""
+    if not meta_path.exists():
+        return FEATURE_COLS, None
+    meta = json.loads(meta_path.read_text())
+    kind = meta.get("model_type", "linear")
+    spec = None if kind == "linear" else {"name": kind, "type": kind, "params": meta.get("model_params", {})}
+    return meta["feature_cols"], spec
+
+
+def registry_groups(registry_path: Path = REGISTRY_PATH):
+    """country -> registry row of the per-country (or per-region) models, or None if not trained."""
+    if not registry_path.exists():
+        return None
+    spec = json.loads(registry_path.read_text())
+    return spec["index"]
+
+
+def prepare(df: pd.DataFrame, by=None, feature_cols=FEATURE_COLS, model=None, groups=None) -> dict:
+    """
+    Arrays one backtest needs: training rows sorted by month, and each series
+    on a dense month grid. `groups` maps series to a registry row; series
+    sharing a row are fitted together on their own rows.
+    """
+    df = df.copy()
+    df["month_id"] = month_id(df["date"])
+    names = df[by].astype(str) if by else pd.Series("TOTAL", index=df.index)
+    df["series"] = names
+
+    train = df.sort_values("month_id", kind="stable")
+    X = train[feature_cols].to_numpy(dtype=np.float64)
+
+    series = sorted(df["series"].unique())
+    code = {name: i for i, name in enumerate(series)}
+    first, last = int(df["month_id"].min()), int(df["month_id"].max())
+
+    # series x month grid of actuals (NaN where a country has no row)
+    actual = np.full((len(series), last - first + 1), np.nan)
+    actual[df["series"].map(code).to_numpy(), df["month_id"].to_numpy() - first] = df["arrivals"].to_numpy()
+
+    # Registry row per series and per training row, -1 for the global model
+    groups = groups or {}
+    series_group = np.array([groups.get(name, -1) for name in series], dtype=np.int64)
+    train_group = series_group[train["series"].map(code).to_numpy()]
+
+    scale = X.std(axis=0)
+    return {
+        "series": series,
+        "feature_cols": list(feature_cols),
+        "model": model,
+        "first_month": first,
+        "last_month": last,
+        "actual": actual,
+        "train_month": train["month_id"].to_numpy(),
+        "X": X,
+        "y": train["arrivals"].to_numpy(dtype=np.float64),
+        "series_group": series_group,
+        "train_group": train_group,
+        "n_groups": int(series_group.max()) + 1 if len(series_group) else 0,
+        "shift": X.mean(axis=0),
+        "scale": np.where(scale > 0, scale, 1.0)
+    }
+
+
+def live_histories(actual: np.ndarray, col: int):
+    """
+    Series with all LAG_WINDOW months before column `col` observed, and
+    their histories: the contiguous observed run ending at the origin, so
+    positions (and lag_12) match the calendar.
+    """
+    if col < LAG_WINDOW:
+        return np.array([], dtype=np.int64), []
+    live = np.flatnonzero(~np.isnan(actual[:, col - LAG_WINDOW:col]).any(axis=1))
+
+    histories = []
+    for i in live:
+        gaps = np.flatnonzero(np.isnan(actual[i, :col]))
+        start = gaps[-1] + 1 if len(gaps) else 0
+        histories.append(actual[i, start:col])
+    return live, histories
+
+
+def run_origins(task):
+    """
+    Score a contiguous run of origins (worker process).
+
+    Returns per (series, horizon step) sums of |error|, error^2 and counts.
+    """
+    data, origins, horizon = task["data"], task["origins"], task["horizon"]
+    actual, first = data["actual"], data["first_month"]
+    feature_cols, spec = data["feature_cols"], data["model"]
+    n_series = len(data["series"])
+
+    abs_sum = np.zeros((n_series, horizon))
+    sq_sum = np.zeros((n_series, horizon))
+    count = np.zeros((n_series, horizon), dtype=np.int64)
+
+    model = IncrementalLinear(data["shift"], data["scale"])
+    group_models = [IncrementalLinear(data["shift"], data["scale"]) for _ in range(data["n_groups"])]
+    train_month, train_group, series_group = data["train_month"], data["train_group"], data["series_group"]
+    added = 0
+    fit_seconds = 0.0
+
+    for origin in origins:
+        # Expanding window: add the rows that are now in the past
+        start = time.perf_counter()
+        upto = int(np.searchsorted(train_month, origin, side="left"))
+        fitted = None
+        if spec is None:
+            model.add(data["X"][added:upto], data["y"][added:upto])
+            coef, intercept = model.coefficients()
+        else:
+            # Not expressible as normal equations: refit on every row before the origin
+            fitted = make_model(spec)
+            fitted.fit(data["X"][:upto], data["y"][:upto])
+            linear = as_linear(fitted)
+            coef, intercept = linear if linear is not None else (None, None)
+
+        rows = slice(added, upto)
+        for g in np.unique(train_group[rows]):
+            if g >= 0:
+                mask = train_group[rows] == g
+                group_models[g].add(data["X"][rows][mask], data["y"][rows][mask])
+        added = upto
+        fit_seconds += time.perf_counter() - start
+
+        col = origin - first
+        live, histories = live_histories(actual, col)
+        if len(live) == 0:
+            continue
+
+        year, month = divmod(origin, 12)
+        if coef is None:
+            preds = np.array([
+                recursive_forecast_model(h, fitted, year, month + 1, horizon, feature_cols)[2] for h in histories
+            ])
+        else:
+            # Each live series with enough rows in its registry group gets the group's fit
+            coef_rows = np.tile(coef, (len(live), 1))
+            intercept_rows = np.full(len(live), intercept)
+            group_fits = {}
+            for j, g in enumerate(series_group[live]):
+                if g >= 0 and group_models[g].n >= MIN_GROUP_ROWS:
+                    if g not in group_fits:
+                        group_fits[g] = group_models[g].coefficients()
+                    coef_rows[j], intercept_rows[j] = group_fits[g]
+            _, _, preds = recursive_forecast_batch(
+                histories, coef_rows if data["n_groups"] else coef,
+                intercept_rows if data["n_groups"] else intercept,
+                year, month + 1, horizon, feature_cols
+            )
+
+        steps = min(horizon, actual.shape[1] - col)
+        truth = actual[live, col:col + steps]
+        err = preds[:, :steps] - truth
+        seen = ~np.isnan(err)
+
+        abs_sum[live, :steps] += np.where(seen, np.abs(err), 0.0)
+        sq_sum[live, :steps] += np.where(seen, err ** 2, 0.0)
+        count[live, :steps] += seen
+
+    return abs_sum, sq_sum, count, fit_seconds
+
+
+def backtest(data: dict, horizon: int = HORIZON, min_train: int = MIN_TRAIN_MONTHS, step: int = 1,
+             workers: int = None):
+    """
+    Run every origin from `min_train` months after the first feature row to
+    the last month, in contiguous chunks across a process pool.
+    Returns summed errors and the origins used.
+    """
+    origins = np.arange(data["first_month"] + min_train, data["last_month"] + 1, step)
+    if len(origins) == 0:
+        raise ValueError("Not enough history for any origin; lower --min-train.")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(origins)))
+    chunks = [c.tolist() for c in np.array_split(origins, workers)]
+    tasks = [{"data": data, "origins": c, "horizon": horizon} for c in chunks]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(run_origins, tasks))
+    else:
+        parts = [run_origins(t) for t in tasks]
+
+    abs_sum = sum(p[0] for p in parts)
+    sq_sum = sum(p[1] for p in parts)
+    count = sum(p[2] for p in parts)
+    fit_seconds = sum(p[3] for p in parts)
+    return abs_sum, sq_sum, count, origins, fit_seconds
+
+
+def error_table(abs_sum, sq_sum, count, keys=None) -> pd.DataFrame:
+    """Long table (key, horizon, n, MAE, RMSE); rows without any scored forecast are left out."""
+    n_series, horizon = count.shape
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = abs_sum / count
+        rmse = np.sqrt(sq_sum / count)
+
+    table = pd.DataFrame({
+        "horizon": np.tile(np.arange(1, horizon + 1), n_series),
+        "n": count.ravel(),
+        "MAE": mae.ravel().round(2),
+        "RMSE": rmse.ravel().round(2)
+    })
+    if keys is not None:
+        table.insert(0, "country", np.repeat(keys, horizon))
+    return table[table["n"] > 0].reset_index(drop=True)
+
+
+def horizon_summary(table: pd.DataFrame) -> dict:
+    return {
+        str(h): {"n": int(r.n), "MAE": float(r.MAE), "RMSE": float(r.RMSE)}
+        for h, r in zip(table["horizon"], table.itertuples())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the total and country models")
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN_MONTHS,
+                        help="months of feature rows before the first origin")
+    parser.add_argument("--step", type=int, default=1, help="months between origins")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    summary = {"horizon": args.horizon, "min_train_months": args.min_train, "step": args.step}
+
+    # ---- Total model (feature columns and type of the promoted model) ----
+    feature_cols, spec = served_total_model()
+    total = prepare(read_frame("total_features"), feature_cols=feature_cols, model=spec)
+    abs_sum, sq_sum, count, origins, fit_seconds = backtest(total, args.horizon, args.min_train, args.step, args.workers)
+    total_table = error_table(abs_sum, sq_sum, count)
+    total_table.to_csv(TOTAL_PATH, index=False)
+    summary["total"] = {
+        "origins": len(origins),
+        "model_type": spec["type"] if spec else "linear",
+        "feature_cols": feature_cols,
+        "fit_seconds": round(fit_seconds, 4),
+        "per_horizon": horizon_summary(total_table)
+    }
+
+    # ---- Country models (registry rows where trained, else the global model), scored per country ----
+    groups = registry_groups()
+    country = prepare(read_frame("country_features"), by="country", groups=groups)
+    abs_sum, sq_sum, count, origins, fit_seconds = backtest(country, args.horizon, args.min_train, args.step, args.workers)
+    country_table = error_table(abs_sum, sq_sum, count, country["series"])
+    country_table.to_csv(COUNTRY_PATH, index=False)
+
+    pooled = error_table(abs_sum.sum(axis=0, keepdims=True), sq_sum.sum(axis=0, keepdims=True),
+                         count.sum(axis=0, keepdims=True))
+    summary["country"] = {
+        "origins": len(origins),
+        "countries": int(country_table["country"].nunique()),
+        "registry_countries": len(groups) if groups else 0,
+        "fit_seconds": round(fit_seconds, 4),
+        "per_horizon": horizon_summary(pooled)
+    }
+
+    summary["seconds"] = round(time.perf_counter() - start, 4)
+    SUMMARY_PATH.write_text(json.dumps(summary, indent=2))
+
+    print("Backtest saved:", OUT_DIR.resolve())
+    for name in ("total", "country"):
+        s = summary[name]
+        h1, hn = s["per_horizon"]["1"], s["per_horizon"][str(max(map(int, s["per_horizon"])))]
+        print(f"  {name}: {s['origins']} origins, MAE h=1 {h1['MAE']:.1f}, "
+              f"h={max(map(int, s['per_horizon']))} {hn['MAE']:.1f}")
+    print(f"Done in {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Benchmark suite: ingestion, feature building, training and forecast serving.
+
+Each scale runs in its own scratch directory holding a synthetic dataset:
+the real processed.csv with more countries (perturbed copies) and more
+years (earlier copies of the real years). Scale 10 is 5x countries x 2x
+years, scale 100 is 20x countries x 5x years. Ingestion is timed on
+raw.xlsx repeated `scale` times (see bench_ingest.py).
+
+Every case reports the best wall time of `--repeat` runs and the peak
+Python/NumPy allocation (tracemalloc, from one extra run). Results are
+written as JSON; --compare flags cases that got slower or bigger than a
+stored baseline and exits non-zero.
+
+    python -m src.bench
+    python -m src.bench --scales 1,10,100 --output outputs/benchmarks/latest.json
+    python -m src.bench --save-baseline
+    python -m src.bench --compare outputs/benchmarks/baseline.json
+    python -m src.bench --cases ingest,features     # no scikit-learn needed
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import bench_ingest, features
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+OUT_DIR = ROOT / "outputs" / "benchmarks"
+LATEST_PATH = OUT_DIR / "latest.json"
+BASELINE_PATH = OUT_DIR / "baseline.json"
+
+# scale -> (country copies, year copies)
+SCALES = {1: (1, 1), 10: (5, 2), 100: (20, 5)}
+CASES = ("ingest", "features", "train", "train_country", "endpoints")
+
+# A case is a regression when slower (or bigger) than baseline by this
+# fraction and by more than the absolute floor, so tiny timings don't flap
+TOLERANCE = 0.25
+MIN_SECONDS = 0.005
+MIN_MB = 1.0
+
+
+def synthetic_processed(processed: pd.DataFrame, countries: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """processed.csv with `years` x the years (earlier copies, slightly lower) and `countries` x the countries."""
+    rng = np.random.default_rng(seed)
+    span = int(processed["year"].max() - processed["year"].min() + 1)
+
+    blocks = []
+    for j in range(years):
+        block = processed.copy()
+        block["year"] = block["year"] - span * j
+        block["arrivals"] = block["arrivals"] * 0.97 ** (span * j)
+        blocks.append(block)
+    history = pd.concat(blocks, ignore_index=True)
+
+    copies = [history]
+    for k in range(1, countries):
+        block = history.copy()
+        block["country"] = block["country"] + f" #{k}"
+        block["arrivals"] = (block["arrivals"] * rng.lognormal(0.0, 0.3, len(block))).round()
+        copies.append(block)
+
+    df = pd.concat(copies, ignore_index=True)
+    df["date"] = pd.to_datetime(pd.DataFrame({"year": df["year"], "month": df["month"], "day": 1}))
+    return df.sort_values(["country", "date"], kind="stable")[["date", "year", "month", "country", "arrivals"]]
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(fn, repeat: int, memory: bool = True) -> dict:
+    """Best and all wall times of fn() over `repeat` runs, plus the tracemalloc peak of one more run."""
+    runs = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        runs.append(time.perf_counter() - start)
+
+    result = {"seconds": round(min(runs), 5), "runs": [round(r, 5) for r in runs]}
+    if memory:
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    return result, value
+
+
+def call_main(module, argv=()):
+    """Run a training script's main() as if from the command line."""
+    saved = sys.argv
+    sys.argv = [module.__file__, *argv]
+    try:
+        module.main()
+    finally:
+        sys.argv = saved
+
+
+def bench_endpoints(requests: int) -> dict:
+    """
+    Latency of the forecast endpoints through TestClient, cold (cache cleared)
+    and warm. The app's store is swapped for a plain in-process one loaded
+    from the scratch directory, whatever ARTIFACT_LOAD_MODE the app was
+    imported with (a shared store would publish to /dev/shm).
+    """
+    from fastapi.testclient import TestClient
+    from src import app as api
+    from src.artifacts import ArtifactStore
+
+    store = ArtifactStore()
+    start = time.perf_counter()
+    store.reload()
+    load_seconds = time.perf_counter() - start
+
+    saved, api.artifacts = api.artifacts, store
+    try:
+        return _time_endpoints(api, TestClient(api.app), requests, load_seconds)
+    finally:
+        api.artifacts = saved
+
+
+def _time_endpoints(api, client, requests: int, load_seconds: float) -> dict:
+    api.forecast_cache.clear()
+    countries = client.get("/api/countries").json()["countries"]
+    body = {"start_year": 2026, "start_month": 1, "horizon": 12}
+    cases = {
+        "forecast": ("/api/forecast", body),
+        "forecast_60": ("/api/forecast", {**body, "horizon": 60}),
+        "forecast_country": ("/api/forecast_country", {**body, "country": countries[len(countries) // 2]}),
+        "forecast_country_intervals": ("/api/forecast_country",
+                                       {**body, "country": countries[len(countries) // 2], "intervals": True}),
+        "forecast_batch_all": ("/api/forecast_batch", {**body, "countries": "all"}),
+        "forecast_batch_all_columns": ("/api/forecast_batch?layout=columns", {**body, "countries": "all"}),
+        "forecast_reconciled": ("/api/forecast_reconciled", body),
+        # 100 scenarios, one shocked country each
+        "scenarios_100": ("/api/scenarios?layout=columns", {**body, "scenarios": [
+            {"shocks": [{"countries": [countries[i % len(countries)]], "start_year": 2026, "start_month": 1 + i % 12,
+                         "months": 6, "multiplier": 0.7, "recovery_months": 6}]}
+            for i in range(100)
+        ]})
+    }
+
+    results = {"artifact_load_seconds": round(load_seconds, 5), "countries": len(countries)}
+    for name, (path, payload) in cases.items():
+        for mode in ("cold", "warm"):
+            timings = []
+            for _ in range(requests):
+                if mode == "cold":
+                    api.forecast_cache.clear()
+                start = time.perf_counter()
+                response = client.post(path, json=payload)
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+            p50, p95 = np.percentile(timings, [50, 95])
+            results[f"{name}_{mode}"] = {
+                "seconds": round(float(p50), 5),
+                "p95_seconds": round(float(p95), 5),
+                "response_kb": round(len(response.content) / 1024, 1)
+            }
+    return results
+
+
+def run_scale(scale: int, cases, repeat: int, requests: int, raw_path: Path, processed: pd.DataFrame) -> dict:
+    countries, years = SCALES.get(scale, (scale, 1))
+    results = {"countries_factor": countries, "years_factor": years}
+
+    if "ingest" in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "raw.xlsx")
+            sheet_rows = bench_ingest.enlarge_workbook(str(raw_path), path, scale)
+            from src.load_data import clean_country_monthly_data
+            result, df = measure(lambda: clean_country_monthly_data(path), repeat)
+            results["ingest"] = {**result, "sheet_rows": sheet_rows, "records": len(df)}
+
+    work = Path(tempfile.mkdtemp(prefix=f"bench_x{scale}_"))
+    try:
+        (work / "data").mkdir()
+        (work / "outputs").mkdir()
+        data = synthetic_processed(processed, countries, years)
+        data.to_csv(work / "data" / "processed.csv", index=False)
+        results["processed_rows"] = len(data)
+        results["series"] = int(data["country"].nunique())
+
+        with working_dir(work):
+            # Later stages read what the earlier ones wrote, so features and
+            # training run whenever a later case needs them (timed only when selected)
+            result, stats = measure(lambda: features.build(features.PROCESSED_PATH), repeat, "features" in cases)
+            if "features" in cases:
+                results["features"] = {**result, "country_rows": stats["country_features"]["rows"]}
+
+            if not {"train", "train_country", "endpoints"} & set(cases):
+                return results
+            # Training needs scikit-learn; the other cases don't
+            from src import train, train_country
+
+            result, _ = measure(train.main, repeat, "train" in cases)
+            if "train" in cases:
+                results["train"] = result
+
+            result, _ = measure(lambda: call_main(train_country, ["--per-country"]), repeat, "train_country" in cases)
+            if "train_country" in cases:
+                results["train_country"] = result
+
+            if "endpoints" in cases:
+                results["endpoints"] = bench_endpoints(requests)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    return results
+
+
+def environment() -> dict:
+    try:
+        import sklearn
+        sklearn_version = sklearn.__version__
+    except ImportError:
+        # The serving image (requirements-serve.txt) has no scikit-learn
+        sklearn_version = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=ROOT).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """{"10/features": {...}, "10/endpoints/forecast_cold": {...}} for every entry with "seconds"."""
+    flat = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        name = f"{prefix}/{key}" if prefix else key
+        if "seconds" in value:
+            flat[name] = value
+        else:
+            flat.update(flatten(value, name))
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float = TOLERANCE) -> list:
+    """Rows (case, metric, baseline, current, ratio, regression) for cases present in both runs."""
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    rows = []
+    for case in sorted(set(now) & set(before)):
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_MB)):
+            old, new = before[case].get(metric), now[case].get(metric)
+            if old is None or new is None:
+                continue
+            ratio = new / old if old else float("inf")
+            regression = new > old * (1 + tolerance) and new - old > floor
+            rows.append((case, metric, old, new, ratio, regression))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, features, training and forecast serving")
+    parser.add_argument("--scales", default="1,10", help="comma-separated data scales (1, 10, 100)")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of " + ",".join(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint case")
+    parser.add_argument("--output", type=Path, default=LATEST_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="also store the results as " + str(BASELINE_PATH))
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    cases = [c for c in args.cases.split(",") if c]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {sorted(unknown)}")
+
+    raw_path = ROOT / "data" / "raw.xlsx"
+    processed = pd.read_csv(ROOT / "data" / "processed.csv")
+
+    report = {"environment": environment(), "repeat": args.repeat, "requests": args.requests, "results": {}}
+    for scale in (int(s) for s in args.scales.split(",")):
+        start = time.perf_counter()
+        report["results"][str(scale)] = run_scale(scale, cases, args.repeat, args.requests, raw_path, processed)
+        print(f"scale x{scale} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(report, indent=2))
+
+    for case, value in flatten(report["results"]).items():
+        memory = f"  peak {value['peak_mb']:.1f} MB" if "peak_mb" in value else ""
+        print(f"{case:48s} {value['seconds'] * 1000:10.2f} ms{memory}")
+    print("Results saved:", args.output)
+
+    if args.compare:
+        rows = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        regressions = [r for r in rows if r[5]]
+        print(f"\nCompared with {args.compare} (tolerance {args.tolerance:.0%}):")
+        for case, metric, old, new, ratio, regression in rows:
+            flag = "REGRESSION" if regression else ""
+            print(f"  {case:48s} {metric:8s} {old:10.4f} -> {new:10.4f}  x{ratio:5.2f} {flag}")
+        print(f"{len(regressions)} regression(s)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
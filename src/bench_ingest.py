@@ -0,0 +1,81 @@
+"""
+Ingestion throughput on a synthetically enlarged raw.xlsx.
+
+The sheet is repeated `scale` times with the year titles shifted for each
+copy, so every copy is parsed as its own set of year blocks.
+
+    python -m src.bench_ingest
+    python -m src.bench_ingest --scale 20 --repeat 3
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+
+from src.load_data import clean_country_monthly_data, read_sheet
+
+
+YEAR_SHIFT = 7  # years covered by raw.xlsx; each copy moves past the previous one
+
+
+def _shift_years(value, offset: int):
+    if not isinstance(value, str) or offset == 0:
+        return value
+    return re.sub(r"\b20(\d{2})\b", lambda m: str(2000 + (int(m.group(1)) + offset) % 100), value)
+
+
+def enlarge_workbook(src_path: str, dst_path: str, scale: int) -> int:
+    """Write `scale` copies of the first sheet of src_path to dst_path. Returns sheet rows."""
+    from openpyxl import Workbook
+
+    rows = read_sheet(src_path).astype(object).where(lambda d: d.notna(), None).values.tolist()
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for copy in range(scale):
+        offset = copy * YEAR_SHIFT
+        for row in rows:
+            ws.append([_shift_years(row[0], offset)] + row[1:])
+    wb.save(dst_path)
+    return len(rows) * scale
+
+
+def run(src_path: str = "data/raw.xlsx", scale: int = 10, repeat: int = 3) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"raw_x{scale}.xlsx")
+        sheet_rows = enlarge_workbook(src_path, path, scale)
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = clean_country_monthly_data(path)
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "scale": scale,
+        "sheet_rows": sheet_rows,
+        "records": len(df),
+        "best_seconds": round(best, 4),
+        "sheet_rows_per_second": round(sheet_rows / best),
+        "records_per_second": round(len(df) / best)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--src", default=os.path.join("data", "raw.xlsx"))
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args.src, args.scale, args.repeat)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"raw.xlsx x{result['scale']}: {result['sheet_rows']} sheet rows -> {result['records']} records")
+        print(f"  best of {args.repeat}: {result['best_seconds']:.3f}s "
+              f"({result['sheet_rows_per_second']} rows/s, {result['records_per_second']} records/s)")
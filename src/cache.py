@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ForecastCache:
+    """
+    Bounded in-process cache of forecast paths with LRU and TTL eviction.
+
+    Values are tuples of arrays whose last axis is the horizon. Forecasts are
+    recursive, so a cached path answers any shorter horizon with the same
+    start by slicing; only a longer horizon is a miss.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, horizon: int):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, cached_horizon, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if cached_horizon < horizon:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if cached_horizon > horizon:
+                self.prefix_hits += 1
+
+        return tuple(v[..., :horizon] for v in value)
+
+    def put(self, key, horizon: int, value):
+        if self.max_entries <= 0:
+            return
+
+        for v in value:
+            v.flags.writeable = False
+
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[1] > horizon:
+                return
+
+            self._entries[key] = (time.monotonic() + self.ttl, horizon, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, horizon: int, compute, compute_horizon: int = None):
+        """
+        Return the cached path for key, or compute(n) and cache it.
+
+        compute_horizon lets a miss compute a longer path than asked for, so
+        later requests for any horizon up to it are prefix hits.
+        """
+        value = self.get(key, horizon)
+        if value is not None:
+            return value
+
+        n = max(horizon, compute_horizon or 0)
+        value = compute(n)
+        self.put(key, n, value)
+        return tuple(v[..., :horizon] for v in value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "prefix_hits": self.prefix_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,206 @@
+"""
+Columnar binary store for the data tables.
+
+Each table is a directory under data/store/ with one .npy file per column
+and a schema.json (column order, dtypes, categorical levels, and the size
+and SHA-256 of the CSV export it was written with). Columns are
+memory-mapped on read, so loading is zero-copy and the pages are shared by
+every process that maps them. Country is stored as a categorical code,
+date as datetime64[D], integer columns as int64, and float columns as
+float32 when that is lossless.
+
+Convert the CSVs (which stay the human-readable export):
+
+    python -m src.columnar
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+STORE_DIR = Path("data/store")
+FORMAT_VERSION = 1
+
+# table name -> (csv export, sort keys)
+TABLES = {
+    "processed": (Path("data/processed.csv"), ["country", "date"]),
+    "cleaned": (Path("data/cleaned.csv"), ["country", "date"]),
+    "total_features": (Path("data/total_features.csv"), ["date"]),
+    "country_features": (Path("data/country_features.csv"), ["country", "date"]),
+}
+
+CATEGORICAL_COLS = ("country",)
+DATE_COLS = ("date",)
+
+
+def table_dir(name: str) -> Path:
+    return STORE_DIR / name
+
+
+def schema_path(name: str) -> Path:
+    return table_dir(name) / "schema.json"
+
+
+def table_for_export(path):
+    """Name of the table whose CSV export is `path`, or None for any other file."""
+    path = Path(path).resolve()
+    for name, (csv_path, _) in TABLES.items():
+        if csv_path.resolve() == path:
+            return name
+    return None
+
+
+# (path, mtime_ns, size) -> sha256, so an unchanged CSV is hashed once per process
+_digests = {}
+
+
+def _csv_source(name: str):
+    """{"size", "sha256"} of the table's CSV export, or None if it has none."""
+    csv_path = TABLES[name][0] if name in TABLES else None
+    if csv_path is None or not csv_path.exists():
+        return None
+    stat = csv_path.stat()
+    key = (str(csv_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        _digests[key] = hashlib.sha256(csv_path.read_bytes()).hexdigest()
+    return {"size": stat.st_size, "sha256": _digests[key]}
+
+
+def has_table(name: str) -> bool:
+    """
+    True if the table is in the store and was written from the current CSV
+    export. Compared by content, not mtime: a checkout or copy can leave
+    either file newer than the other.
+    """
+    schema = schema_path(name)
+    if not schema.exists():
+        return False
+
+    source = _csv_source(name)
+    if source is None:
+        return True
+    return read_schema(name).get("source") == source
+
+
+def _lossless_float32(values: np.ndarray) -> np.ndarray:
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+        return narrow
+    return values
+
+
+def write_table(df, name: str):
+    """
+    Write a DataFrame as a column directory. Rows are written in the order
+    given; sort before calling. The directory is built next to the old one
+    and swapped in, and schema.json is written last.
+    """
+    import pandas as pd
+
+    final = table_dir(name)
+    tmp = final.with_name(final.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    # The CSV export is written first; has_table checks the store against it
+    schema = {"format_version": FORMAT_VERSION, "rows": len(df), "source": _csv_source(name), "columns": []}
+
+    for col in df.columns:
+        entry = {"name": col}
+
+        if col in CATEGORICAL_COLS:
+            cat = pd.Categorical(df[col])
+            values = cat.codes.astype(np.int16 if len(cat.categories) < 2 ** 15 else np.int32)
+            entry["kind"] = "categorical"
+            entry["categories"] = [str(c) for c in cat.categories]
+        elif col in DATE_COLS:
+            values = pd.to_datetime(df[col]).to_numpy().astype("datetime64[D]")
+            entry["kind"] = "date"
+        else:
+            values = df[col].to_numpy()
+            if values.dtype.kind == "f":
+                values = _lossless_float32(values)
+            elif values.dtype.kind in "iu":
+                # Fixed width, so the files (and artifact hashes) don't depend
+                # on the platform or on pandas' dtype inference
+                values = values.astype(np.int64)
+            entry["kind"] = "numeric"
+
+        entry["dtype"] = str(values.dtype)
+        np.save(tmp / f"{col}.npy", np.ascontiguousarray(values))
+        schema["columns"].append(entry)
+
+    (tmp / "schema.json").write_text(json.dumps(schema, indent=2))
+
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+
+
+def read_schema(name: str) -> dict:
+    return json.loads(schema_path(name).read_text())
+
+
+def read_columns(name: str, columns=None, mmap: bool = True):
+    """
+    Raw column arrays (memory-mapped, read-only) plus the schema.
+    Categorical columns come back as integer codes; levels are in the schema.
+    """
+    schema = read_schema(name)
+    wanted = columns or [c["name"] for c in schema["columns"]]
+
+    arrays = {}
+    for col in wanted:
+        arrays[col] = np.load(table_dir(name) / f"{col}.npy", mmap_mode="r" if mmap else None)
+    return arrays, schema
+
+
+def categories(schema: dict, col: str):
+    for entry in schema["columns"]:
+        if entry["name"] == col:
+            return entry["categories"]
+    raise KeyError(col)
+
+
+def read_frame(name: str):
+    """
+    Table as a DataFrame (categoricals decoded with Categorical.from_codes).
+    Falls back to the CSV export when the table has not been converted.
+    """
+    import pandas as pd
+
+    if not has_table(name):
+        # Same dtypes as the store: dates parsed
+        csv_path = TABLES[name][0]
+        columns = pd.read_csv(csv_path, nrows=0).columns
+        return pd.read_csv(csv_path, parse_dates=[c for c in DATE_COLS if c in columns])
+
+    arrays, schema = read_columns(name)
+    data = {}
+    for entry in schema["columns"]:
+        values = arrays[entry["name"]]
+        if entry["kind"] == "categorical":
+            data[entry["name"]] = pd.Categorical.from_codes(np.asarray(values), entry["categories"])
+        else:
+            data[entry["name"]] = values
+    return pd.DataFrame(data)
+
+
+def convert_csv(name: str):
+    import pandas as pd
+
+    csv_path, sort_keys = TABLES[name]
+    df = pd.read_csv(csv_path).sort_values(sort_keys, kind="stable").reset_index(drop=True)
+    write_table(df, name)
+    return len(df)
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(TABLES)
+    for name in names:
+        rows = convert_csv(name)
+        print(f"{name}: {rows} rows -> {table_dir(name)}")
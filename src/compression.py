@@ -0,0 +1,124 @@
+"""
+Response compression negotiated from Accept-Encoding: brotli when the
+brotli package is installed and the client takes it, else gzip.
+
+Only whole (non-streamed) bodies of compressible types above a size floor
+are compressed; NDJSON/SSE streams pass through so each line still reaches
+the client as soon as it is sent. Bodies that already carry a
+Content-Encoding (precompressed files) are left alone. Large bodies are
+compressed on a worker thread so the event loop keeps serving.
+"""
+import gzip
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.metrics import stage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MINIMUM_SIZE = 1024
+THREAD_MINIMUM_SIZE = 128 * 1024
+# Fast levels: forecast JSON is very repetitive, higher levels gain little.
+# Files compressed once (static assets) use the best levels.
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "image/svg+xml", "text/")
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, encodings=None):
+    """Best of `encodings` (default: all available) the client accepts (q > 0), or None for identity."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings if encodings is not None else available_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+def compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing whole response bodies with the negotiated encoding."""
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        held = []
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Headers go out with the first body chunk, once we know
+                # whether it gets compressed
+                held.append(message)
+                return
+            if message["type"] != "http.response.body" or not held:
+                await send(message)
+                return
+
+            start = held.pop()
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not compressible(headers.get("content-type", ""))
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            with stage("compress"):
+                if len(body) >= THREAD_MINIMUM_SIZE:
+                    body = await anyio.to_thread.run_sync(compress, body, encoding)
+                else:
+                    body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
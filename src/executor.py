@@ -0,0 +1,118 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when the forecast queue is full."""
+
+
+class ForecastExecutor:
+    """
+    Bounded pool for forecast computations, with single-flight coalescing.
+
+    Work runs on `workers` threads (NumPy releases the GIL in the heavy
+    parts). Callers of run() with the same key while a computation for it
+    is queued or running wait on that one computation instead of starting
+    another. At most `max_queue` computations wait for a worker; beyond
+    that run() raises Overloaded so the API can shed load with a 503.
+
+    fn runs in a copy of the submitting caller's context, so stage()
+    timings recorded inside it count towards that caller's request.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64, samples: int = 1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast")
+        # Re-entrant: a future that finishes before add_done_callback runs
+        # its callback right away, in run(), with the lock held
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._pending = 0
+        self._running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        # Recent queue waits and run times, for percentiles
+        self._waits = deque(maxlen=samples)
+        self._runs = deque(maxlen=samples)
+
+    def run(self, key, fn, timeout: float = None):
+        """fn() on the pool, shared with concurrent callers of the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                if self._pending - self._running >= self.max_queue:
+                    self.rejected += 1
+                    raise Overloaded(f"{self.max_queue} forecasts already queued")
+                self._pending += 1
+                self.submitted += 1
+                future = self._pool.submit(self._call, contextvars.copy_context(), fn, time.perf_counter())
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._done(key, f))
+
+        return future.result(timeout)
+
+    def _call(self, context, fn, submitted_at):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._waits.append(started - submitted_at)
+        try:
+            return context.run(fn)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._runs.append(time.perf_counter() - started)
+
+    def _done(self, key, future):
+        with self._lock:
+            self._pending -= 1
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    @staticmethod
+    def _summary(samples) -> dict:
+        if not samples:
+            return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+        values = np.fromiter(samples, dtype=np.float64)
+        p50, p95 = np.percentile(values, [50, 95])
+        return {
+            "count": len(values),
+            "mean": round(float(values.mean()), 6),
+            "p50": round(float(p50), 6),
+            "p95": round(float(p95), 6),
+            "max": round(float(values.max()), 6)
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits, runs = list(self._waits), list(self._runs)
+            counts = {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._pending - self._running,
+                "running": self._running,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed
+            }
+        return {**counts, "wait_seconds": self._summary(waits), "run_seconds": self._summary(runs)}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
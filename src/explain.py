@@ -0,0 +1,126 @@
+"""
+Per-month feature attributions of a forecast path.
+
+Attributions are taken against a background, the model's training rows:
+each month's prediction is base_value plus the sum of its contributions,
+where base_value is the model's mean prediction over the background.
+
+Linear models are explained exactly, for every month (and series) in one
+broadcast product: contribution = coef * (x - background mean), which is
+what SHAP gives for a linear model. Anything else (a CatBoost total from
+select_model.py) goes through shap.TreeExplainer on the whole feature
+matrix in one call; explainers and their background samples are cached
+per model version, since building them dominates the cost.
+
+The attributions use the feature rows the forecast itself was fed (see
+return_features in forecasting.py), so lag_1 / lag_12 / rolling_mean_3
+after the first month are the model's own earlier predictions.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Response groups; month, month_sin and month_cos only mean something together
+GROUPS = {
+    "year": ("year",),
+    "seasonality": ("month", "month_sin", "month_cos"),
+    "lag_1": ("lag_1",),
+    "lag_12": ("lag_12",),
+    "rolling_mean_3": ("rolling_mean_3",)
+}
+
+BACKGROUND_ROWS = 100
+EXPLAINER_CACHE_SIZE = 8
+
+_explainers = OrderedDict()
+_lock = threading.Lock()
+
+
+def linear_contributions(features, coef, intercept, background):
+    """
+    Exact attributions of a linear model.
+
+    features is (..., n_features, horizon) as returned by the recursion and
+    coef is (n_features,) or one row per series (..., n_features); the
+    background is the training rows, (n_rows, n_features).
+
+    Returns (contributions shaped like features, base value per series).
+    """
+    coef = np.asarray(coef, dtype=np.float64)
+    mean = np.asarray(background, dtype=np.float64).mean(axis=0)
+    contributions = coef[..., :, None] * (features - mean[:, None])
+    return contributions, coef @ mean + intercept
+
+
+def tree_contributions(model, features, background, key):
+    """
+    SHAP attributions of a non-linear model for one path, every month in
+    one batched call. features is (n_features, horizon); key identifies the
+    model generation the cached explainer belongs to.
+    """
+    explainer = _explainer(model, background, key)
+    values = np.asarray(explainer.shap_values(np.ascontiguousarray(features.T)), dtype=np.float64)
+    return values.reshape(features.shape[::-1]).T, float(np.ravel(explainer.expected_value)[0])
+
+
+def _explainer(model, background, key):
+    with _lock:
+        explainer = _explainers.get(key)
+        if explainer is not None:
+            _explainers.move_to_end(key)
+            return explainer
+
+    try:
+        import shap
+    except ImportError:
+        raise ImportError("Explaining a non-linear model needs the shap package (pip install shap).") from None
+
+    # A fixed subsample keeps interventional SHAP cheap and repeatable
+    background = np.asarray(background, dtype=np.float64)
+    if len(background) > BACKGROUND_ROWS:
+        rows = np.random.default_rng(0).choice(len(background), BACKGROUND_ROWS, replace=False)
+        background = background[np.sort(rows)]
+
+    try:
+        explainer = shap.TreeExplainer(model, data=background, feature_perturbation="interventional")
+    except Exception:
+        # Not a tree model shap knows: model-agnostic, much slower
+        explainer = shap.KernelExplainer(lambda X: np.ravel(model.predict(X)), background)
+
+    with _lock:
+        _explainers[key] = explainer
+        while len(_explainers) > EXPLAINER_CACHE_SIZE:
+            _explainers.popitem(last=False)
+    return explainer
+
+
+def group_contributions(contributions, feature_cols) -> dict:
+    """{group: (..., horizon)} summed over each group's columns; columns outside GROUPS keep their name."""
+    col = {name: i for i, name in enumerate(feature_cols)}
+    groups = {}
+    for group, names in GROUPS.items():
+        present = [col[n] for n in names if n in col]
+        if present:
+            groups[group] = contributions[..., present, :].sum(axis=-2)
+
+    grouped = {n for names in GROUPS.values() for n in names}
+    for name, i in col.items():
+        if name not in grouped:
+            groups[name] = contributions[..., i, :]
+    return groups
+
+
+def explanation_records(years, months, preds, groups: dict):
+    """Forecast rows with each month's contributions per feature group."""
+    values = {g: v.tolist() for g, v in groups.items()}
+    return [
+        {
+            "year": y,
+            "month": m,
+            "predicted_arrivals": round(p, 2),
+            "contributions": {g: round(v[i], 2) for g, v in values.items()}
+        }
+        for i, (y, m, p) in enumerate(zip(years.tolist(), months.tolist(), preds.tolist()))
+    ]
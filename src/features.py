@@ -1,6 +1,37 @@
+"""
+Feature tables for the forecasters:
+
+    processed.csv -> cleaned.csv -> total_features.csv, country_features.csv
+
+Lags and the rolling mean are grouped shifts over all countries at once.
+Incremental mode only builds rows for months after the last feature row
+(with a year of earlier rows as context for lag_12).
+
+    python -m src.features
+    python -m src.features --incremental
+"""
+import argparse
+import os
+import time
+
 import numpy as np
 import pandas as pd
 
+from src.columnar import has_table, read_frame, write_table
+
+
+PROCESSED_PATH = os.path.join("data", "processed.csv")
+CLEANED_PATH = os.path.join("data", "cleaned.csv")
+TOTAL_FEATURES_PATH = os.path.join("data", "total_features.csv")
+COUNTRY_FEATURES_PATH = os.path.join("data", "country_features.csv")
+
+CLEANED_COLUMNS = ["date", "year", "month", "country", "arrivals"]
+TOTAL_COLUMNS = ["date", "arrivals", "year", "month", "month_sin", "month_cos", "lag_1", "lag_12", "rolling_mean_3"]
+COUNTRY_COLUMNS = ["date", "year", "month", "country", "arrivals", "month_sin", "month_cos", "lag_1", "lag_12", "rolling_mean_3"]
+
+# lag_12 needs a year of history; the first 12 rows of a series have no features
+CONTEXT_MONTHS = 12
+
 
 def build_features(year: int, month: int, last_values: dict):
     """
@@ -25,4 +56,166 @@ def build_features(year: int, month: int, last_values: dict):
         "rolling_mean_3": last_values["rolling_mean_3"]
     }
 
-    return pd.DataFrame([features])
\ No newline at end of file
+    return pd.DataFrame([features])
+
+
+def clean_processed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only complete country-years: those with every month the data has
+    for that year (12 for past years, the months ingested so far for the
+    current one). A gap would make the shifted lags point at the wrong month.
+    """
+    months = df.groupby(["country", "year"])["month"].transform("nunique")
+    year_months = df.groupby("year")["month"].transform("nunique")
+    return df[months == year_months][CLEANED_COLUMNS]
+
+
+def add_features(df: pd.DataFrame, by=None) -> pd.DataFrame:
+    """
+    month_sin/cos, lag_1, lag_12 and rolling_mean_3 for rows sorted by
+    (by, date). With `by` the shifts never cross from one series to the next.
+    Rows without a full year of history are dropped.
+    """
+    df = df.copy()
+    df["month_sin"] = np.sin(2 * np.pi * df["month"] / 12)
+    df["month_cos"] = np.cos(2 * np.pi * df["month"] / 12)
+
+    arrivals = df.groupby(by, sort=False)["arrivals"] if by else df["arrivals"]
+    lag_2 = arrivals.shift(2)
+    df["lag_1"] = arrivals.shift(1)
+    df["lag_12"] = arrivals.shift(CONTEXT_MONTHS)
+    # Same as rolling(3).mean(): oldest value first
+    df["rolling_mean_3"] = (lag_2 + df["lag_1"] + df["arrivals"]) / 3
+
+    return df.dropna()
+
+
+def total_history(cleaned: pd.DataFrame) -> pd.DataFrame:
+    total = cleaned.groupby("date", as_index=False)["arrivals"].sum().sort_values("date")
+    total["year"] = total["date"].dt.year
+    total["month"] = total["date"].dt.month
+    return total
+
+
+def total_features(cleaned: pd.DataFrame) -> pd.DataFrame:
+    return add_features(total_history(cleaned))[TOTAL_COLUMNS]
+
+
+def country_features(cleaned: pd.DataFrame) -> pd.DataFrame:
+    history = cleaned.sort_values(["country", "date"])
+    return add_features(history, by="country")[COUNTRY_COLUMNS]
+
+
+def extend_features(existing: pd.DataFrame, history: pd.DataFrame, by=None):
+    """
+    Feature rows for history after the last date of `existing`, or None if
+    `existing` no longer matches history (revised or back-filled months),
+    in which case the table has to be rebuilt.
+
+    Per series, only the new rows and the CONTEXT_MONTHS rows before them
+    are computed. Series not in `existing` yet are computed from their start.
+    """
+    keys = [by, "date"] if by else ["date"]
+
+    last = existing.groupby(by)["date"].max() if by else pd.Series({None: existing["date"].max()})
+    cutoff = history[by].map(last) if by else pd.Series(last.iloc[0], index=history.index)
+    is_known = (history["date"] <= cutoff).to_numpy()
+
+    # Existing rows must be exactly the known history minus the warm-up rows,
+    # with the same arrivals and lag_12 (which pins the warm-up rows too)
+    known = history[is_known][keys + ["arrivals"]]
+    shifted = known.groupby(by, sort=False)["arrivals"] if by else known["arrivals"]
+    known = known.assign(lag_12=shifted.shift(CONTEXT_MONTHS)).dropna()
+
+    if len(known) != len(existing):
+        return None
+    merged = existing[keys + ["arrivals", "lag_12"]].merge(known, on=keys, how="left", suffixes=("", "_now"))
+    for col in ("arrivals", "lag_12"):
+        if not np.array_equal(merged[col].to_numpy(), merged[col + "_now"].to_numpy()):
+            return None
+
+    # Context: the last CONTEXT_MONTHS known rows of each series
+    from_end = pd.Series(is_known, index=history.index)[::-1]
+    from_end = (from_end.groupby(history[by][::-1], sort=False).cumsum() if by else from_end.cumsum())[::-1]
+    window = history[~is_known | (from_end <= CONTEXT_MONTHS).to_numpy()]
+    fresh = add_features(window, by=by)
+
+    fresh_cutoff = fresh[by].map(last) if by else pd.Series(last.iloc[0], index=fresh.index)
+    return fresh[fresh_cutoff.isna() | (fresh["date"] > fresh_cutoff)]
+
+
+def _read_table(name: str, path: str, columns) -> pd.DataFrame:
+    # Columnar copy when it is in sync with the CSV (see src/columnar.py)
+    df = read_frame(name) if has_table(name) else pd.read_csv(path)
+    df = df[columns].copy()
+    df["date"] = pd.to_datetime(df["date"])
+    for col in columns:
+        if col == "country":
+            df[col] = df[col].astype(str)
+        elif col in ("year", "month"):
+            df[col] = df[col].astype("int64")
+        elif col != "date":
+            df[col] = df[col].astype("float64")
+    return df
+
+
+def save_table(df: pd.DataFrame, name: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    write_table(df.reset_index(drop=True), name)
+
+
+def build(processed_path: str = PROCESSED_PATH, incremental: bool = False):
+    """
+    Rebuild cleaned.csv and both feature tables from processed.csv.
+    Returns stats: mode per feature table and rows written.
+    """
+    start = time.perf_counter()
+
+    processed = pd.read_csv(processed_path)
+    processed["date"] = pd.to_datetime(processed["date"])
+    cleaned = clean_processed(processed)
+
+    tables = {
+        "total_features": (TOTAL_FEATURES_PATH, TOTAL_COLUMNS, total_history(cleaned), None, ["date"]),
+        "country_features": (COUNTRY_FEATURES_PATH, COUNTRY_COLUMNS, cleaned.sort_values(["country", "date"]),
+                             "country", ["country", "date"])
+    }
+
+    stats = {"cleaned_rows": len(cleaned)}
+    save_table(cleaned, "cleaned", CLEANED_PATH)
+
+    for name, (path, columns, history, by, sort_keys) in tables.items():
+        new_rows = None
+        if incremental and os.path.exists(path):
+            existing = _read_table(name, path, columns)
+            new_rows = extend_features(existing, history, by=by)
+
+        if new_rows is None:
+            table = add_features(history, by=by)[columns]
+            stats[name] = {"mode": "full", "new_rows": len(table), "rows": len(table)}
+        else:
+            table = pd.concat([existing, new_rows[columns]], ignore_index=True)
+            table = table.sort_values(sort_keys, kind="stable")
+            stats[name] = {"mode": "incremental", "new_rows": len(new_rows), "rows": len(table)}
+
+        if stats[name]["mode"] == "full" or len(new_rows):
+            save_table(table, name, path)
+
+    stats["seconds"] = round(time.perf_counter() - start, 4)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build cleaned.csv and the feature tables from processed.csv")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only compute rows for months after the last feature row")
+    args = parser.parse_args()
+
+    stats = build(incremental=args.incremental)
+
+    print(f"Cleaned rows: {stats['cleaned_rows']}")
+    for name in ("total_features", "country_features"):
+        s = stats[name]
+        print(f"{name}: {s['mode']}, {s['new_rows']} new rows, {s['rows']} rows")
+    print(f"Done in {stats['seconds']:.2f}s")
@@ -0,0 +1,247 @@
+import numpy as np
+
+
+FEATURE_COLS = [
+    "year", "month", "month_sin", "month_cos",
+    "lag_1", "lag_12", "rolling_mean_3"
+]
+
+
+class HistoryIndex:
+    """
+    country -> contiguous slice of one arrivals array.
+
+    Built once from rows sorted by (country, date); lookups return read-only
+    views into the shared array instead of filtering a DataFrame. countries
+    may be names, or integer codes into `categories` (columnar store), in
+    which case arrivals can stay a memory-mapped array.
+    """
+
+    def __init__(self, countries, arrivals, categories=None):
+        countries = np.asarray(countries)
+        self.arrivals = np.asarray(arrivals).view()
+        self.arrivals.flags.writeable = False
+
+        # Each run of equal country values is one slice
+        n = len(countries)
+        boundaries = np.flatnonzero(countries[1:] != countries[:-1]) + 1
+        starts = np.concatenate(([0], boundaries)) if n else boundaries
+        stops = np.concatenate((boundaries, [n])) if n else boundaries
+
+        names = countries[starts].tolist()
+        if categories is not None:
+            names = [categories[code] for code in names]
+
+        self._slices = {
+            name: slice(start, stop)
+            for name, start, stop in zip(names, starts.tolist(), stops.tolist())
+        }
+        if len(self._slices) != len(starts):
+            raise ValueError("Rows must be sorted by country so each country is contiguous.")
+
+        self.countries = tuple(sorted(self._slices))
+
+    def __contains__(self, country):
+        return country in self._slices
+
+    def __len__(self):
+        return len(self.countries)
+
+    def get(self, country):
+        """History for one country, or None if it is unknown."""
+        s = self._slices.get(country)
+        return None if s is None else self.arrivals[s]
+
+    def span(self, country):
+        """Row slice of one country, for arrays aligned with arrivals; None if unknown."""
+        return self._slices.get(country)
+
+
+def linear_coefficients(model, feature_cols=FEATURE_COLS):
+    """
+    Pull (coef, intercept) out of a fitted linear model,
+    with coef ordered like feature_cols.
+    """
+    coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        position = {name: i for i, name in enumerate(names)}
+        coef = coef[[position[c] for c in feature_cols]]
+
+    return coef, float(model.intercept_)
+
+
+def month_features(start_year: int, start_month: int, horizon: int):
+    """Calendar columns (year, month, month_sin, month_cos) for the whole horizon."""
+    offsets = np.arange(start_month - 1, start_month - 1 + horizon)
+    years = start_year + offsets // 12
+    months = offsets % 12 + 1
+
+    month_sin = np.sin(2 * np.pi * months / 12)
+    month_cos = np.cos(2 * np.pi * months / 12)
+
+    return years, months, month_sin, month_cos
+
+
+def recursive_forecast(history, coef, intercept, start_year: int, start_month: int,
+                       horizon: int, feature_cols=FEATURE_COLS, return_features: bool = False):
+    """
+    Recursive multi-step forecast of a linear model.
+
+    Every prediction is written back into a preallocated history buffer so the
+    next step's lag_1 / lag_12 / rolling_mean_3 can read it. The arithmetic
+    mirrors the old per-step DataFrame loop exactly, so results are identical.
+
+    Returns (years, months, predictions) as NumPy arrays, plus the feature
+    rows the model was fed as (n_features, horizon) if return_features.
+    """
+    # Same (1, n_features) @ coef product LinearRegression.predict runs
+    return _recursive(history, lambda row: (row @ coef + intercept)[0],
+                      start_year, start_month, horizon, feature_cols, return_features)
+
+
+def recursive_forecast_model(history, model, start_year: int, start_month: int,
+                             horizon: int, feature_cols=FEATURE_COLS, return_features: bool = False):
+    """
+    Same recursion for any fitted model with predict() (e.g. CatBoost):
+    one predict call per step on a (1, n_features) array.
+    """
+    return _recursive(history, lambda row: float(np.ravel(model.predict(row))[0]),
+                      start_year, start_month, horizon, feature_cols, return_features)
+
+
+def _recursive(history, predict_row, start_year: int, start_month: int, horizon: int, feature_cols,
+               return_features: bool = False):
+    history = np.asarray(history, dtype=np.float64)
+    n_hist = len(history)
+    if n_hist == 0:
+        raise ValueError("Cannot forecast from an empty history.")
+
+    buf = np.empty(n_hist + horizon)
+    buf[:n_hist] = history
+
+    years, months, month_sin, month_cos = month_features(start_year, start_month, horizon)
+    calendar = {"year": years, "month": months, "month_sin": month_sin, "month_cos": month_cos}
+
+    col = {name: i for i, name in enumerate(feature_cols)}
+    X = np.empty((horizon, len(feature_cols)))
+    for name, values in calendar.items():
+        if name in col:
+            X[:, col[name]] = values
+
+    # A model may use only some of the lag features
+    i_lag_1, i_lag_12, i_rolling = col.get("lag_1"), col.get("lag_12"), col.get("rolling_mean_3")
+
+    for step in range(horizon):
+        end = n_hist + step
+
+        lag_1 = buf[end - 1]
+        if i_lag_1 is not None:
+            X[step, i_lag_1] = lag_1
+        if i_lag_12 is not None:
+            X[step, i_lag_12] = buf[end - 12] if end >= 12 else lag_1
+
+        if i_rolling is not None:
+            if end >= 3:
+                X[step, i_rolling] = (buf[end - 3] + buf[end - 2] + buf[end - 1]) / 3
+            else:
+                X[step, i_rolling] = buf[:end].sum() / end
+
+        buf[end] = predict_row(X[step:step + 1])
+
+    if return_features:
+        return years, months, buf[n_hist:], X.T
+    return years, months, buf[n_hist:]
+
+
+def recursive_forecast_batch(histories, coef, intercept, start_year: int, start_month: int,
+                             horizon: int, feature_cols=FEATURE_COLS, return_features: bool = False,
+                             shocks=None):
+    """
+    Recursive forecast for many series at once.
+
+    The lag state of every series is advanced together as an
+    (n_series x n_features) matrix, so each horizon step is one matrix product
+    instead of one model call per series. Histories may have different
+    lengths; only the last 12 values of each are needed.
+
+    coef/intercept are either one model shared by all series, or one row per
+    series ((n_series, n_features) and (n_series,)) for per-country models.
+
+    shocks, if given, is (multiplier, offset), each (n_series, horizon): every
+    prediction becomes prediction * multiplier + offset before the next step
+    reads it, so a shock carries on through the lags (see scenarios.py).
+
+    Returns (years, months, predictions) where predictions is (n_series, horizon),
+    plus the feature rows as (n_series, n_features, horizon) if return_features.
+    """
+    n_series = len(histories)
+    lengths = np.array([len(h) for h in histories])
+    if n_series and lengths.min() == 0:
+        raise ValueError("Cannot forecast from an empty history.")
+
+    # Right-aligned lag window, zero-padded on the left for short histories
+    width = 12
+    buf = np.zeros((n_series, width + horizon))
+    for i, h in enumerate(histories):
+        tail = np.asarray(h[-width:], dtype=np.float64)
+        buf[i, width - len(tail):width] = tail
+
+    years, months, month_sin, month_cos = month_features(start_year, start_month, horizon)
+    calendar = {"year": years, "month": months, "month_sin": month_sin, "month_cos": month_cos}
+
+    col = {name: i for i, name in enumerate(feature_cols)}
+    X = np.empty((horizon, n_series, len(feature_cols)))
+    for name, values in calendar.items():
+        if name in col:
+            X[:, :, col[name]] = values[:, None]
+
+    # A model may use only some of the lag features
+    i_lag_1, i_lag_12, i_rolling = col.get("lag_1"), col.get("lag_12"), col.get("rolling_mean_3")
+
+    coef = np.asarray(coef, dtype=np.float64)
+    if coef.ndim == 2:
+        # (n_series, n_features, 1): each row gets its own (1, n_features) @ coef
+        coef = coef[:, :, None]
+
+    for step in range(horizon):
+        end = width + step
+        available = lengths + step
+
+        lag_1 = buf[:, end - 1]
+        if i_lag_1 is not None:
+            X[step, :, i_lag_1] = lag_1
+        if i_lag_12 is not None:
+            X[step, :, i_lag_12] = np.where(available >= 12, buf[:, end - 12], lag_1)
+
+        if i_rolling is not None:
+            # Left padding is zero, so short windows sum to the same value as sum(history[-3:])
+            X[step, :, i_rolling] = (buf[:, end - 3] + buf[:, end - 2] + buf[:, end - 1]) / np.minimum(available, 3)
+
+        # Row-by-row (1, n_features) @ coef products, batched in one call:
+        # bit-identical to LinearRegression.predict on each row on its own
+        buf[:, end] = np.matmul(X[step][:, None, :], coef).reshape(n_series) + intercept
+        if shocks is not None:
+            buf[:, end] = buf[:, end] * shocks[0][:, step] + shocks[1][:, step]
+
+    if return_features:
+        return years, months, buf[:, width:], X.transpose(1, 2, 0)
+    return years, months, buf[:, width:]
+
+
+def forecast_records(years, months, preds):
+    """Row-oriented response shape used by the API and the Streamlit app."""
+    return [
+        {"year": y, "month": m, "predicted_arrivals": round(p, 2)}
+        for y, m, p in zip(years.tolist(), months.tolist(), preds.tolist())
+    ]
+
+
+def forecast_columns(years, months, preds):
+    """Same values as forecast_records, as one array per field (layout=columns)."""
+    return {
+        "year": years.tolist(),
+        "month": months.tolist(),
+        "predicted_arrivals": [round(p, 2) for p in preds.tolist()]
+    }
@@ -0,0 +1,172 @@
+"""
+Monte Carlo prediction intervals for the recursive forecasts.
+
+Every simulated path re-runs the recursion with a bootstrapped training
+residual added to each step's prediction, so errors feed forward through
+lag_1 / lag_12 / rolling_mean_3 the way they do for real. All paths of all
+series advance together as one state array, one step at a time: a
+horizon-60 band for one country costs a few vector operations per month,
+not one forecast call per path.
+"""
+import zlib
+
+import numpy as np
+
+from src.forecasting import FEATURE_COLS, forecast_columns, month_features
+
+
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+DEFAULT_PATHS = 1000
+
+# Paths simulated at once; more series are processed in chunks to bound memory
+CHUNK_PATHS = 50_000
+WIDTH = 12
+
+
+def quantile_label(q: float) -> str:
+    """0.1 -> "p10", 0.025 -> "p2.5"."""
+    return f"p{q * 100:g}"
+
+
+def series_rng(seed: int, key) -> np.random.Generator:
+    """
+    Random stream of one series, from the request seed and the series name.
+    A country gets the same draws alone, in a batch or in a streamed chunk.
+    """
+    return np.random.default_rng([seed, zlib.crc32(str(key).encode())])
+
+
+def _residual_noise(residuals, n_paths: int, horizon: int, rngs):
+    """
+    (horizon, n_series * n_paths) residuals drawn with replacement from each
+    series' own pool. Draws are step-major, so the first h steps are the same
+    whatever the horizon: shorter horizons are prefixes of longer ones.
+    """
+    noise = np.zeros((horizon, len(rngs), n_paths))
+    for i, (pool, rng) in enumerate(zip(residuals, rngs)):
+        u = rng.random((horizon, n_paths))
+        if len(pool):
+            noise[:, i] = np.asarray(pool, dtype=np.float64)[(u * len(pool)).astype(np.int64)]
+    return noise.reshape(horizon, len(rngs) * n_paths)
+
+
+def simulate_paths(histories, coef, intercept, residuals, start_year: int, start_month: int, horizon: int,
+                   n_paths: int = DEFAULT_PATHS, rngs=None, feature_cols=FEATURE_COLS, predict=None):
+    """
+    Residual-bootstrapped recursive paths, (horizon, n_series, n_paths).
+
+    coef/intercept are one linear model or one row per series, as for
+    recursive_forecast_batch. For other models pass `predict`, called once
+    per step on the (n_series * n_paths, n_features) matrix.
+    residuals and rngs hold one array / generator per series.
+    """
+    n_series = len(histories)
+    rngs = rngs if rngs is not None else [series_rng(0, i) for i in range(n_series)]
+    n = n_series * n_paths
+    lengths = np.array([len(h) for h in histories])
+    if n_series and lengths.min() == 0:
+        raise ValueError("Cannot forecast from an empty history.")
+
+    # Step-major state: row t holds every path's value at time t
+    buf = np.zeros((WIDTH + horizon, n))
+    window = np.zeros((WIDTH, n_series))
+    for i, h in enumerate(histories):
+        tail = np.asarray(h[-WIDTH:], dtype=np.float64)
+        window[WIDTH - len(tail):, i] = tail
+    buf[:WIDTH] = np.repeat(window, n_paths, axis=1)
+    available = np.repeat(lengths, n_paths)
+
+    noise = _residual_noise(residuals, n_paths, horizon, rngs)
+
+    years, months, month_sin, month_cos = month_features(start_year, start_month, horizon)
+    calendar = {"year": years, "month": months, "month_sin": month_sin, "month_cos": month_cos}
+    col = {name: i for i, name in enumerate(feature_cols)}
+
+    if predict is None:
+        C = np.broadcast_to(np.asarray(coef, dtype=np.float64), (n_series, len(feature_cols)))
+        b = np.broadcast_to(np.asarray(intercept, dtype=np.float64), (n_series,))
+
+        # Calendar part of every prediction is the same for all paths of a series
+        base = np.repeat(b[:, None], horizon, axis=1)
+        for name, values in calendar.items():
+            if name in col:
+                base = base + C[:, col[name], None] * values[None, :]
+        base = np.repeat(base, n_paths, axis=0)
+
+        def lag_coef(name):
+            return np.repeat(C[:, col[name]], n_paths) if name in col else None
+
+        c_lag_1, c_lag_12, c_rolling = lag_coef("lag_1"), lag_coef("lag_12"), lag_coef("rolling_mean_3")
+    else:
+        X = np.empty((n, len(feature_cols)))
+
+    for step in range(horizon):
+        end = WIDTH + step
+        avail = available + step
+
+        lag_1 = buf[end - 1]
+        lag_12 = np.where(avail >= 12, buf[end - 12], lag_1)
+        rolling = (buf[end - 3] + buf[end - 2] + buf[end - 1]) / np.minimum(avail, 3)
+
+        if predict is None:
+            pred = base[:, step].copy()
+            for c, values in ((c_lag_1, lag_1), (c_lag_12, lag_12), (c_rolling, rolling)):
+                if c is not None:
+                    pred += c * values
+        else:
+            features = {"lag_1": lag_1, "lag_12": lag_12, "rolling_mean_3": rolling}
+            features.update({name: values[step] for name, values in calendar.items()})
+            for name, i in col.items():
+                X[:, i] = features[name]
+            pred = np.ravel(predict(X))
+
+        buf[end] = pred + noise[step]
+
+    return buf[WIDTH:].reshape(horizon, n_series, n_paths)
+
+
+def forecast_bands(histories, coef, intercept, residuals, start_year: int, start_month: int, horizon: int,
+                   quantiles=DEFAULT_QUANTILES, n_paths: int = DEFAULT_PATHS, seed: int = 0, keys=None,
+                   feature_cols=FEATURE_COLS, predict=None):
+    """
+    Quantiles of the simulated paths, (n_series, n_quantiles, horizon).
+
+    residuals holds one array per series; keys (default: positions) name
+    the series for their random streams. Series are simulated in chunks of
+    at most CHUNK_PATHS paths.
+    """
+    n_series = len(histories)
+    keys = list(keys) if keys is not None else list(range(n_series))
+    per_row = np.asarray(coef).ndim == 2
+
+    bands = np.empty((n_series, len(quantiles), horizon))
+    chunk = max(1, CHUNK_PATHS // n_paths)
+    for start in range(0, n_series, chunk):
+        part = slice(start, start + chunk)
+        paths = simulate_paths(
+            histories[part],
+            np.asarray(coef)[part] if per_row else coef,
+            np.asarray(intercept)[part] if per_row else intercept,
+            residuals[part], start_year, start_month, horizon, n_paths,
+            [series_rng(seed, key) for key in keys[part]], feature_cols, predict
+        )
+        # (n_quantiles, horizon, chunk) -> (chunk, n_quantiles, horizon)
+        bands[part] = np.quantile(paths, quantiles, axis=2).transpose(2, 0, 1)
+
+    return bands
+
+
+def interval_records(years, months, preds, bands, quantiles):
+    """forecast_records rows with one extra key per quantile."""
+    labels = [quantile_label(q) for q in quantiles]
+    rows = np.round(bands, 2).T.tolist()  # (horizon, n_quantiles)
+    return [
+        {"year": y, "month": m, "predicted_arrivals": round(p, 2), **dict(zip(labels, row))}
+        for y, m, p, row in zip(years.tolist(), months.tolist(), preds.tolist(), rows)
+    ]
+
+
+def interval_columns(years, months, preds, bands, quantiles):
+    """forecast_columns with one extra array per quantile."""
+    labels = [quantile_label(q) for q in quantiles]
+    return {**forecast_columns(years, months, preds), **dict(zip(labels, np.round(bands, 2).tolist()))}
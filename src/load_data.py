@@ -1,8 +1,15 @@
+import argparse
+import hashlib
+import json
 import os
 import re
+import time
 import unicodedata
+import numpy as np
 import pandas as pd
 
+from src.columnar import has_table, read_frame, table_for_export, write_table
+
 
 MONTH_MAP = {
     "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
@@ -56,130 +63,175 @@ def looks_like_number(x) -> bool:
         return False
 
 
-def clean_country_monthly_data(file_path: str) -> pd.DataFrame:
-    df = pd.read_excel(file_path, header=None)
+# Cells pandas.read_excel would have turned into NaN
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!"
+}
 
-    # ----- Find header rows (where the real table starts) -----
-    header_rows = []
-    for i in range(len(df)):
-        # Robust: df cells may be float/NaN/etc. Ensure strings before .upper()
-        raw_vals = df.iloc[i].tolist()
-        row = ["" if pd.isna(v) else str(v).strip() for v in raw_vals]
-        row_upper = [v.upper() for v in row]
+YEAR_LOOKBACK = 44
+
+MANIFEST_PATH = os.path.join("data", "processed_manifest.json")
+MANIFEST_VERSION = 1
+
+
+def read_sheet(file_path: str) -> pd.DataFrame:
+    """
+    Stream the first worksheet with openpyxl in read-only mode into an object
+    DataFrame (header=None), with the same NaN cells pandas.read_excel gives.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = list(ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
 
-        # Must contain "COUNTRY" and at least 6 month names to be considered a real header
-        month_hits = sum(1 for r in row_upper if r in MONTH_MAP)
-        if "COUNTRY" in row_upper and month_hits >= 6:
-            header_rows.append(i)
+    df = pd.DataFrame(rows, dtype=object)
+    return df.mask(df.isin(NA_STRINGS))
 
-    all_records = []
 
+def _unique_map(values: pd.Series, func) -> pd.Series:
+    """Apply a Python function once per distinct value instead of once per cell."""
+    uniques = values.dropna().unique()
+    return values.map(dict(zip(uniques, map(func, uniques))))
+
+
+def find_blocks(df: pd.DataFrame):
+    """
+    Header-delimited table blocks as (header_idx, end_idx, year), year None if
+    no title with a 20xx year sits within YEAR_LOOKBACK rows above the header.
+    """
+    # ----- Find header rows (where the real table starts) -----
+    # Must contain "COUNTRY" and at least 6 month names to be considered a real header
+    text = df.apply(lambda col: col.astype(str).str.strip().str.upper().where(col.notna(), ""))
+    month_hits = text.isin(MONTH_MAP.keys()).sum(axis=1)
+    is_header = text.eq("COUNTRY").any(axis=1) & (month_hits >= 6)
+    header_rows = np.flatnonzero(is_header.to_numpy())
+
+    # ----- Detect year: nearest title in column 0 above the header -----
+    years = df[0].astype(str).str.extract(r"\b(20\d{2})\b", expand=False)
+    has_year = years.notna().to_numpy()
+    last_year_row = pd.Series(np.where(has_year, np.arange(len(df)), np.nan)).ffill().to_numpy()
+
+    blocks = []
     for idx, header_idx in enumerate(header_rows):
-        # ----- Detect year by scanning upwards -----
-        year = None
-        for back in range(1, 45):
-            if header_idx - back < 0:
-                break
-            text = str(df.iloc[header_idx - back, 0])
-            m = re.search(r"\b(20\d{2})\b", text)
-            if m:
-                year = int(m.group(1))
-                break
-        if year is None:
-            continue
-
-        # ----- block end -----
         end_idx = header_rows[idx + 1] if idx < len(header_rows) - 1 else len(df)
 
-        block = df.iloc[header_idx:end_idx].copy()
-        if block.empty:
-            continue
-
-        # set columns using header row
-        block.columns = block.iloc[0].astype(str).str.strip()
-        block = block.iloc[1:].copy()
-
-        # Identify month columns (robust)
-        cols_upper = {c: str(c).strip().upper() for c in block.columns}
-        month_cols = [c for c, cu in cols_upper.items() if cu in MONTH_MAP]
-
-        if len(month_cols) < 6:
-            continue
-
-        # Everything else before/including "Country" area = country-text columns
-        # Some sheets have Rank/No + Country + extra column that continues country name
-        non_month_cols = [c for c in block.columns if c not in month_cols]
-
-        # Convert month columns to numeric
-        for mc in month_cols:
-            block[mc] = (
-                block[mc]
-                .astype(str)
-                .str.replace(",", "", regex=False)
-                .str.strip()
-            )
-            block[mc] = pd.to_numeric(block[mc], errors="coerce")
-
-        # ----- Handle split country names using a "pending prefix" -----
-        pending_prefix = ""
-
-        for _, r in block.iterrows():
-            # Build country name from ALL non-month columns (important fix)
-            parts = []
-            for c in non_month_cols:
-                val = r.get(c)
-                if pd.isna(val):
-                    continue
-                s = normalize_text(val)
-                if not s:
-                    continue
-
-                # ignore pure numbers (rank/no)
-                if looks_like_number(s):
-                    continue
-
-                parts.append(s)
-
-            country_raw = " ".join(parts).strip()
-
-            # Skip obvious totals/empty
-            if country_raw.upper().startswith("TOTAL") or country_raw.upper() in {"", "NAN"}:
-                pending_prefix = ""
-                continue
-
-            # If the row has NO month values => it's likely a continuation row like "REPUBLIC"
-            has_any_month = any(pd.notna(r.get(mc)) for mc in month_cols)
-
-            if not has_any_month:
-                # store continuation prefix
-                if country_raw:
-                    pending_prefix = (pending_prefix + " " + country_raw).strip() if pending_prefix else country_raw
-                continue
-
-            # If we have a pending prefix, combine it
-            if pending_prefix:
-                country_raw = (pending_prefix + " " + country_raw).strip()
-                pending_prefix = ""
-
-            country = normalize_country(country_raw)
-
-            # Some bad split artifacts produce single word like "REPUBLIC" => skip them safely
-            if country in {"REPUBLIC"}:
-                continue
-
-            for mc in month_cols:
-                arrivals = r.get(mc)
-                if pd.isna(arrivals):
-                    continue
-
-                all_records.append({
-                    "year": year,
-                    "month": MONTH_MAP[str(mc).strip().upper()],
-                    "country": country,
-                    "arrivals": float(arrivals)
-                })
-
-    final_df = pd.DataFrame(all_records)
+        year = None
+        if header_idx > 0:
+            row = last_year_row[header_idx - 1]
+            if not np.isnan(row) and header_idx - row <= YEAR_LOOKBACK:
+                year = int(years.iloc[int(row)])
+
+        blocks.append((int(header_idx), int(end_idx), year))
+
+    return blocks
+
+
+def extract_blocks(df: pd.DataFrame, blocks) -> pd.DataFrame:
+    """
+    Country-month records (year, month, country, arrivals) from the given
+    blocks, in sheet order: block by block, row by row, month column by
+    month column. Blocks without a year are skipped.
+    """
+    blocks = [b for b in blocks if b[2] is not None and b[1] - b[0] > 1]
+    columns = ["year", "month", "country", "arrivals"]
+    if not blocks:
+        return pd.DataFrame(columns=columns)
+
+    n_cols = df.shape[1]
+
+    # Per block: which columns are months (by that block's own header row)
+    header_text = df.iloc[[h for h, _, _ in blocks]].astype(str).apply(lambda col: col.str.strip().str.upper())
+    block_months = header_text.apply(lambda col: col.map(MONTH_MAP)).fillna(0).to_numpy(dtype=int)
+    keep = (block_months > 0).sum(axis=1) >= 6
+
+    # Row -> block, for every data row of every kept block
+    row_idx = np.concatenate([np.arange(h + 1, e) for (h, e, _), k in zip(blocks, keep) if k])
+    row_block = np.concatenate([np.full(e - h - 1, i) for i, ((h, e, _), k) in enumerate(zip(blocks, keep)) if k])
+    row_year = np.array([y for _, _, y in blocks])[row_block]
+
+    cells = df.iloc[row_idx]
+    month_of = block_months[row_block]
+    is_month_col = month_of > 0
+
+    # ----- Month values -> numbers (same coercion as before) -----
+    values = cells.to_numpy(dtype=object)
+    month_cells = pd.Series(values[is_month_col], dtype=object)
+    month_numbers = pd.to_numeric(
+        month_cells.astype(str).str.replace(",", "", regex=False).str.strip(),
+        errors="coerce"
+    ).to_numpy(dtype=float)
+    arrivals = np.full(values.shape, np.nan)
+    arrivals[is_month_col] = month_numbers
+    has_any_month = (~np.isnan(arrivals)).any(axis=1)
+
+    # ----- Country name from ALL non-month columns, left to right -----
+    country_raw = np.full(len(row_idx), "", dtype=object)
+    for c in range(n_cols):
+        col = cells.iloc[:, c]
+        part = _unique_map(col.astype(str).where(col.notna()), normalize_text).fillna("")
+        # ignore pure numbers (rank/no)
+        numeric = _unique_map(part, looks_like_number).astype(bool)
+        part = part.where(~numeric, "").to_numpy(dtype=object)
+        # Month columns never contribute to the name
+        part = np.where(is_month_col[:, c], "", part)
+
+        country_raw = np.where(
+            part == "", country_raw,
+            np.where(country_raw == "", part, country_raw + " " + part)
+        )
+
+    upper = pd.Series(country_raw, dtype=object).str.upper()
+    is_reset = (upper.str.startswith("TOTAL") | upper.isin({"", "NAN"})).to_numpy()
+    is_prefix = ~is_reset & ~has_any_month
+    is_data = ~is_reset & has_any_month
+
+    # ----- Split country names: continuation rows without month values -----
+    # A run of prefix rows belongs to the next data row in the same block,
+    # unless a total/empty row resets it first.
+    segment = np.cumsum(is_reset | is_data)
+    prefixes = (
+        pd.Series(country_raw[is_prefix])
+        .groupby([row_block[is_prefix], segment[is_prefix] + 1])
+        .agg(" ".join)
+        .to_dict()
+    )
+
+    data_rows = np.flatnonzero(is_data)
+    names = [
+        (prefixes[(b, g)] + " " + raw) if (b, g) in prefixes else raw
+        for b, g, raw in zip(row_block[data_rows], segment[data_rows], country_raw[data_rows])
+    ]
+    countries = _unique_map(pd.Series(names, dtype=object), normalize_country).to_numpy(dtype=object)
+
+    # Some bad split artifacts produce single word like "REPUBLIC" => skip them safely
+    ok = countries != "REPUBLIC"
+    data_rows, countries = data_rows[ok], countries[ok]
+
+    # ----- Melt months: row-major order keeps the original record order -----
+    r, c = np.nonzero(~np.isnan(arrivals[data_rows]))
+    rows = data_rows[r]
+    return pd.DataFrame({
+        "year": row_year[rows],
+        "month": month_of[rows, c],
+        "country": countries[r],
+        "arrivals": arrivals[rows, c]
+    }, columns=columns)
+
+
+def clean_country_monthly_data(file_path: str) -> pd.DataFrame:
+    df = read_sheet(file_path)
+    final_df = extract_blocks(df, find_blocks(df))
+    return finalize_records(final_df)
+
+
+def finalize_records(final_df: pd.DataFrame) -> pd.DataFrame:
     if final_df.empty:
         raise ValueError("No data extracted. Check Excel structure / header detection.")
 
@@ -196,13 +248,163 @@ def clean_country_monthly_data(file_path: str) -> pd.DataFrame:
     )
 
     final_df = final_df.sort_values(["country", "date"])[["date", "year", "month", "country", "arrivals"]]
+    check_no_duplicates(final_df)
+    return final_df
+
 
+def check_no_duplicates(df: pd.DataFrame):
     # ----- Hard guarantee: NO duplicates remain -----
-    dup_count = final_df.duplicated(["country", "year", "month"]).sum()
+    dup_count = df.duplicated(["country", "year", "month"]).sum()
     if dup_count != 0:
         raise ValueError(f"Still has {dup_count} duplicate (country,year,month) rows after grouping. Need more fixes.")
 
-    return final_df
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def block_fingerprints(df: pd.DataFrame, blocks):
+    """
+    Content hash per block: its year plus every cell from the header row to
+    the next header. Row positions are not part of it, so inserting rows
+    above a block does not mark it changed.
+    """
+    text = df.astype(str).where(df.notna(), "")
+    # Trailing empty columns depend on how the workbook was saved, not its content
+    used = np.flatnonzero((text != "").any(axis=0).to_numpy())
+    text = text.iloc[:, :used[-1] + 1 if len(used) else 0]
+    row_hashes = pd.util.hash_pandas_object(text, index=False).to_numpy()
+    fingerprints = []
+    for header_idx, end_idx, year in blocks:
+        digest = hashlib.sha256(str(year).encode())
+        digest.update(row_hashes[header_idx:end_idx].tobytes())
+        fingerprints.append(digest.hexdigest()[:16])
+    return fingerprints
+
+
+def load_manifest(manifest_path: str = MANIFEST_PATH):
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("manifest_version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _output_stamp(output_path: str):
+    stat = os.stat(output_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _year_fingerprints(blocks, fingerprints):
+    by_year = {}
+    for (_, _, year), fp in zip(blocks, fingerprints):
+        if year is not None:
+            by_year.setdefault(str(year), []).append(fp)
+    return by_year
+
+
+def _read_processed(output_path: str) -> pd.DataFrame:
+    # Columnar copy when it was written from this CSV (see columnar.has_table)
+    table = table_for_export(output_path)
+    if table is not None and has_table(table):
+        df = read_frame(table)
+    else:
+        df = pd.read_csv(output_path)
+    return df.astype({
+        "date": "datetime64[ns]", "year": "int64", "month": "int64",
+        "country": str, "arrivals": "float64"
+    })[["date", "year", "month", "country", "arrivals"]]
+
+
+def ingest(raw_path: str, output_path: str, incremental: bool = True,
+           manifest_path: str = MANIFEST_PATH):
+    """
+    Build processed data from the workbook and save it with a manifest of
+    the year blocks it came from.
+
+    Incremental mode re-extracts only the years whose blocks are new,
+    changed or gone since the manifest, and merges them into the existing
+    processed data; a changed workbook is still read and fingerprinted in
+    full. Every record of a year comes from that year's blocks, so
+    replacing a year's rows keeps the (country, year, month) guarantee.
+    Falls back to a full build when there is no usable manifest or the
+    output was modified outside this script.
+
+    Returns (DataFrame, stats).
+    """
+    start = time.perf_counter()
+    source_sha = file_sha256(raw_path)
+    manifest = load_manifest(manifest_path) if incremental else None
+
+    if manifest is not None and (
+        not os.path.exists(output_path)
+        or manifest.get("output_stamp") != _output_stamp(output_path)
+    ):
+        manifest = None
+
+    if manifest is not None and manifest["source_sha256"] == source_sha:
+        stats = {"mode": "unchanged", "blocks": len(manifest["blocks"]), "changed_years": [],
+                 "records": manifest["records"], "seconds": round(time.perf_counter() - start, 4)}
+        return None, stats
+
+    df = read_sheet(raw_path)
+    blocks = find_blocks(df)
+    fingerprints = block_fingerprints(df, blocks)
+    by_year = _year_fingerprints(blocks, fingerprints)
+
+    if manifest is None:
+        mode = "full"
+        changed_years = sorted(by_year)
+        final_df = finalize_records(extract_blocks(df, blocks))
+    else:
+        mode = "incremental"
+        old_by_year = manifest["years"]
+        changed_years = sorted(
+            year for year in set(by_year) | set(old_by_year)
+            if by_year.get(year) != old_by_year.get(year)
+        )
+
+        kept = _read_processed(output_path)
+        kept = kept[~kept["year"].astype(str).isin(changed_years)]
+
+        changed = [b for b in blocks if str(b[2]) in changed_years]
+        parts = [kept]
+        fresh = extract_blocks(df, changed)
+        if not fresh.empty:
+            parts.append(finalize_records(fresh))
+
+        final_df = pd.concat(parts, ignore_index=True)
+        final_df = final_df.sort_values(["country", "date"])
+        check_no_duplicates(final_df)
+
+    if mode == "full" or changed_years:
+        save_processed_data(final_df, output_path)
+
+    manifest = {
+        "manifest_version": MANIFEST_VERSION,
+        "source": raw_path.replace(os.sep, "/"),
+        "source_sha256": source_sha,
+        "output": output_path.replace(os.sep, "/"),
+        "output_stamp": _output_stamp(output_path),
+        "records": len(final_df),
+        "years": by_year,
+        "blocks": [
+            {"year": year, "header_row": int(header_idx), "rows": int(end_idx - header_idx), "fingerprint": fp}
+            for (header_idx, end_idx, year), fp in zip(blocks, fingerprints)
+        ]
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    stats = {"mode": mode, "blocks": len(blocks), "changed_years": changed_years,
+             "records": len(final_df), "seconds": round(time.perf_counter() - start, 4)}
+    return final_df, stats
 
 
 def save_processed_data(df: pd.DataFrame, output_path: str):
@@ -215,17 +417,31 @@ def save_processed_data(df: pd.DataFrame, output_path: str):
             f"Close Excel / close the CSV if it's open, then run again."
         )
 
+    # Columnar copy for fast, zero-copy reads (see src/columnar.py). Only the
+    # canonical export has one: a scratch output must not replace the store
+    # table that training and the backtest read.
+    table = table_for_export(output_path)
+    if table is not None:
+        write_table(df, table)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build data/processed.csv from data/raw.xlsx")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-extract year blocks that changed since the last run")
+    args = parser.parse_args()
+
     raw_path = os.path.join("data", "raw.xlsx")
     output_path = os.path.join("data", "processed.csv")
 
-    clean_df = clean_country_monthly_data(raw_path)
-    save_processed_data(clean_df, output_path)
+    clean_df, stats = ingest(raw_path, output_path, incremental=args.incremental)
 
     print("Processed dataset saved at:")
     print(os.path.abspath(output_path))
+    print(f"Mode: {stats['mode']}, blocks: {stats['blocks']}, "
+          f"re-extracted years: {stats['changed_years'] or 'none'}, {stats['seconds']:.2f}s")
 
-    # Quick sanity checks
-    print("Years:", sorted(clean_df["year"].unique()))
-    print("Duplicates:", clean_df.duplicated(["country", "year", "month"]).sum())
\ No newline at end of file
+    if clean_df is not None:
+        # Quick sanity checks
+        print("Years:", sorted(clean_df["year"].unique()))
+        print("Duplicates:", clean_df.duplicated(["country", "year", "month"]).sum())
@@ -0,0 +1,195 @@
+"""
+In-process metrics in the Prometheus text format, without extra dependencies.
+
+Counters and histograms are label-keyed dicts updated under one lock, so
+an observation costs a bisect and a few additions. Values that already
+live elsewhere (cache and executor stats, artifact load times) are read by
+collector callbacks at scrape time instead of being copied on every request.
+
+Per-stage timings of a request are recorded with `stage("name")`. The
+middleware puts a RequestTimer in a context variable, and the stages
+inside the handler (which may run on a worker thread) add to it.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket (not cumulative) counts, plus sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._series.items())
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (_number(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """
+        Register fn() -> [(name, type, help, [(labels dict, value), ...]), ...],
+        called at scrape time. Usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for fn in self._collectors:
+            for name, kind, help, samples in fn():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [
+                    f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+                    for labels, value in samples if value is not None
+                ]
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimer:
+    """Stage timings of one request."""
+
+    def __init__(self):
+        self.stages = []
+
+
+_current = ContextVar("request_timer", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage of the current request; a no-op outside an instrumented request."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.stages.append((name, time.perf_counter() - start))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: request count and latency per endpoint (route template,
+    so /api/forecast_country is one series whatever the body), and the
+    stage timings recorded during the request.
+
+    Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app, requests: Histogram, stages: Histogram):
+        self.app = app
+        self.requests = requests
+        self.stages = stages
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+
+            route = getattr(scope.get("route"), "path", None)
+            endpoint = route if route and route.startswith("/api") else "other"
+            self.requests.observe(elapsed, scope["method"], endpoint, str(status[0]))
+
+            accounted = 0.0
+            for name, seconds in timer.stages:
+                self.stages.observe(seconds, endpoint, name)
+                accounted += seconds
+            if timer.stages:
+                # Routing, validation and response encoding
+                self.stages.observe(max(elapsed - accounted, 0.0), endpoint, "framework")
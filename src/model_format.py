@@ -0,0 +1,221 @@
+"""
+Compact, sklearn-free model format for the linear forecasters.
+
+A fitted LinearRegression is exported as JSON holding its coefficients,
+intercept and feature order. LinearModel loads it with NumPy only and
+predicts with the same X @ coef + intercept product sklearn uses, so
+predictions are identical. JSON floats round-trip float64 exactly.
+
+Many models of the same shape (one per country) are packed into a single
+registry instead: one (n_models, n_features + 1) float64 .npy array, the
+intercept in the last column, plus a JSON index mapping each key to its row.
+
+A compact file exported next to a pickle records the pickle's SHA-256, so
+load_model can tell whether the two still hold the same model; file
+timestamps can't, since checkouts and copies reorder them.
+
+Convert an existing pickle (needs scikit-learn once):
+
+    python -m src.model_format outputs/model.pkl outputs/model.json
+"""
+import hashlib
+import json
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+
+FORMAT = "linear"
+FORMAT_VERSION = 1
+REGISTRY_FORMAT = "linear_registry"
+
+
+class LinearModel:
+    """Pure-NumPy linear predictor; exposes the sklearn attributes the app reads."""
+
+    def __init__(self, coef, intercept, feature_cols):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.feature_names_in_ = np.asarray(feature_cols, dtype=object)
+
+    @property
+    def feature_cols(self):
+        return list(self.feature_names_in_)
+
+    def predict(self, X):
+        if hasattr(X, "columns"):
+            X = X[self.feature_cols]
+        X = np.asarray(X, dtype=np.float64)
+        return X @ self.coef_ + self.intercept_
+
+    @classmethod
+    def load(cls, path):
+        spec = json.loads(Path(path).read_text())
+        if spec.get("format") != FORMAT or spec.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is format {spec.get('format')!r} v{spec.get('format_version')}, "
+                f"expected {FORMAT!r} v{FORMAT_VERSION}."
+            )
+        return cls(spec["coef"], spec["intercept"], spec["feature_cols"])
+
+
+def file_sha256(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def export_linear_model(model, feature_cols, path, target_col: str = "arrivals", source=None):
+    """
+    Write a fitted linear model as compact JSON, coefficients ordered like
+    feature_cols. `source` is the pickle the same model was saved to; its
+    hash is recorded so load_model can check the two are in sync.
+    """
+    coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        position = {name: i for i, name in enumerate(names)}
+        coef = coef[[position[c] for c in feature_cols]]
+
+    spec = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "feature_cols": list(feature_cols),
+        "target_col": target_col,
+        "coef": coef.tolist(),
+        "intercept": float(model.intercept_)
+    }
+    if source is not None:
+        spec["source_sha256"] = file_sha256(source)
+    Path(path).write_text(json.dumps(spec, indent=2))
+
+
+class LinearRegistry:
+    """
+    Packed linear models: row i is coef_[i] + intercept_[i]. Several keys
+    may share a row (e.g. all countries of one region).
+    """
+
+    def __init__(self, packed, index, feature_cols, row_names=None):
+        self.packed = packed
+        self.index = dict(index)
+        self.feature_cols = list(feature_cols)
+        self.row_names = list(row_names) if row_names is not None else None
+
+    @property
+    def coef(self):
+        return self.packed[:, :-1]
+
+    @property
+    def intercept(self):
+        return self.packed[:, -1]
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def row(self, key):
+        """Row of `key`, or None if it has no model of its own."""
+        return self.index.get(key)
+
+    @staticmethod
+    def data_path(path):
+        return Path(path).with_suffix(".npy")
+
+    @classmethod
+    def load(cls, path, mmap: bool = True):
+        spec = json.loads(Path(path).read_text())
+        if spec.get("format") != REGISTRY_FORMAT or spec.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} is format {spec.get('format')!r} v{spec.get('format_version')}, "
+                f"expected {REGISTRY_FORMAT!r} v{FORMAT_VERSION}."
+            )
+        packed = np.load(cls.data_path(path), mmap_mode="r" if mmap else None)
+        if packed.shape != (spec["rows"], len(spec["feature_cols"]) + 1):
+            raise ValueError(f"{cls.data_path(path)} has shape {packed.shape}, index expects {spec['rows']} rows.")
+        return cls(packed, spec["index"], spec["feature_cols"], spec.get("row_names"))
+
+
+def export_linear_registry(coef, intercept, index, feature_cols, path, row_names=None,
+                           target_col: str = "arrivals", info=None):
+    """
+    Write packed models: coef (n_models, n_features) ordered like feature_cols,
+    intercept (n_models,), index {key: row}. The .npy goes first and the JSON
+    index last, so a reader never sees an index without its array.
+    """
+    coef = np.asarray(coef, dtype=np.float64)
+    packed = np.column_stack([coef, np.asarray(intercept, dtype=np.float64)])
+
+    data_path = LinearRegistry.data_path(path)
+    tmp = data_path.with_name(data_path.stem + ".tmp.npy")
+    np.save(tmp, packed)
+    tmp.replace(data_path)
+
+    spec = {
+        "format": REGISTRY_FORMAT,
+        "format_version": FORMAT_VERSION,
+        "feature_cols": list(feature_cols),
+        "target_col": target_col,
+        "rows": len(packed),
+        "row_names": list(row_names) if row_names is not None else None,
+        "index": {str(k): int(v) for k, v in index.items()},
+        **(info or {})
+    }
+    Path(path).write_text(json.dumps(spec, indent=2))
+
+
+def load_model(compact_path, pickle_path):
+    """
+    Load the compact model when it was exported from the current pickle
+    (or there is no pickle), otherwise the joblib pickle, which needs
+    scikit-learn.
+
+    A compact file recording a different pickle hash is stale and is never
+    served: without joblib that raises instead. A compact file recording no
+    hash (exported by hand) can't be checked and is used, with a warning,
+    only when the pickle can't be read.
+
+    Returns (model, path_it_was_loaded_from).
+    """
+    compact_path, pickle_path = Path(compact_path), Path(pickle_path)
+
+    source_sha256 = None
+    if compact_path.exists():
+        if not pickle_path.exists():
+            return LinearModel.load(compact_path), compact_path
+        source_sha256 = json.loads(compact_path.read_text()).get("source_sha256")
+        if source_sha256 is not None and source_sha256 == file_sha256(pickle_path):
+            return LinearModel.load(compact_path), compact_path
+
+    try:
+        import joblib
+        return joblib.load(pickle_path), pickle_path
+    except ImportError:
+        export = f"python -m src.model_format {pickle_path} {compact_path}"
+        if not compact_path.exists():
+            raise ImportError(
+                f"{compact_path} not found and joblib/scikit-learn are not installed to read "
+                f"{pickle_path}. Export it with: {export}"
+            )
+        if source_sha256 is not None:
+            raise ImportError(
+                f"{compact_path} was exported from a different {pickle_path} and joblib/scikit-learn "
+                f"are not installed to read the pickle. Re-export it with: {export}"
+            )
+        warnings.warn(
+            f"{compact_path} records no source hash and can't be checked against {pickle_path}; "
+            f"serving it anyway. Re-export it with: {export}"
+        )
+        return LinearModel.load(compact_path), compact_path
+
+
+if __name__ == "__main__":
+    import joblib
+
+    src, dst = Path(sys.argv[1]), Path(sys.argv[2])
+    model = joblib.load(src)
+    export_linear_model(model, list(model.feature_names_in_), dst, source=src)
+    print("Compact model saved:", dst.resolve())
@@ -0,0 +1,96 @@
+"""
+Hierarchical reconciliation of the country forecasts with the total.
+
+The hierarchy has one level: total = sum of countries (the listed countries
+cover all but ~0.1% of total arrivals). Base forecasts are stacked as one
+(1 + n_countries, horizon) matrix, total first, and reconciled in one pass:
+
+    reconciled = S @ G @ base
+
+S sums countries into the total; G maps the base forecasts of every level
+to coherent country forecasts. All horizons are reconciled at once.
+
+    bottom_up  G = [0 | I]: the countries as forecast, summed
+    top_down   the total as forecast, split by forecast country shares
+    ols        G spreads the incoherence evenly over all series
+    mint       G spreads it in proportion to each series' residual variance
+               (MinT with a diagonal covariance): noisy forecasts move most
+"""
+import numpy as np
+
+
+METHODS = ("bottom_up", "top_down", "ols", "mint")
+
+
+def summing_matrix(n: int) -> np.ndarray:
+    """(1 + n, n): total row of ones over the identity."""
+    return np.vstack([np.ones((1, n)), np.eye(n)])
+
+
+def combination_matrix(variances) -> np.ndarray:
+    """
+    MinT G for one level, (n, 1 + n), from the variances of [total, countries].
+
+    For total = sum of countries with diagonal W the generalized least
+    squares solution has a closed form: each country takes a share
+    w_i / (w_total + sum w) of the incoherence total - sum(countries).
+    """
+    variances = np.asarray(variances, dtype=np.float64)
+    w_total, w = variances[0], variances[1:]
+    k = w / (w_total + w.sum())
+    return np.hstack([k[:, None], np.eye(len(w)) - k[:, None]])
+
+
+def top_down_shares(bottom) -> np.ndarray:
+    """Each country's share of the country forecasts, per horizon step (negatives count as 0)."""
+    bottom = np.maximum(bottom, 0.0)
+    total = bottom.sum(axis=0, keepdims=True)
+    equal = np.full_like(bottom, 1.0 / len(bottom))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, bottom / total, equal)
+
+
+def reconcile(base, method: str = "mint", variances=None) -> np.ndarray:
+    """
+    Coherent forecasts, (1 + n, horizon), from base forecasts (1 + n, horizon)
+    with the total in row 0. `variances` (1 + n,) are needed for "mint".
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown reconciliation method {method!r}; use one of {METHODS}")
+
+    base = np.asarray(base, dtype=np.float64)
+    n = len(base) - 1
+    S = summing_matrix(n)
+
+    if method == "top_down":
+        return S @ (top_down_shares(base[1:]) * base[0])
+
+    if method == "bottom_up":
+        G = np.hstack([np.zeros((n, 1)), np.eye(n)])
+    elif method == "ols":
+        G = combination_matrix(np.ones(n + 1))
+    else:
+        if variances is None:
+            raise ValueError("mint needs the residual variance of every series")
+        # Floor keeps perfectly fitted series from dividing by zero
+        G = combination_matrix(np.maximum(variances, 1e-12))
+
+    return S @ (G @ base)
+
+
+def reconciled_records(years, months, reconciled, base):
+    """forecast_records rows for one series with the base forecast alongside."""
+    return [
+        {"year": y, "month": m, "predicted_arrivals": round(r, 2), "base_arrivals": round(b, 2)}
+        for y, m, r, b in zip(years.tolist(), months.tolist(), reconciled.tolist(), base.tolist())
+    ]
+
+
+def reconciled_columns(years, months, reconciled, base):
+    """reconciled_records as one array per field."""
+    return {
+        "year": years.tolist(),
+        "month": months.tolist(),
+        "predicted_arrivals": [round(r, 2) for r in reconciled.tolist()],
+        "base_arrivals": [round(b, 2) for b in base.tolist()]
+    }
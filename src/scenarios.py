@@ -0,0 +1,108 @@
+"""
+What-if scenarios: demand shocks on chosen countries and months, and the
+recovery that follows.
+
+A shock scales and/or shifts a country's forecast for some months:
+arrivals * multiplier + add, optionally fading linearly back to no effect
+over recovery_months. Shocks are applied inside the recursion, so a
+shocked month also moves the lag_1 / lag_12 / rolling_mean_3 of the months
+after it, the way a real drop would.
+
+Country forecasts don't depend on each other, so a scenario only changes
+the countries it shocks. Every (scenario, shocked country) pair becomes one
+more row of the batched recursion, next to one baseline row per country
+involved: hundreds of scenarios advance together, one matrix product per
+month, and deltas are taken against the baseline of the same run.
+"""
+import numpy as np
+
+
+# Series (scenario x country pairs plus baselines) per batched recursion
+SCENARIO_CHUNK = 4096
+
+
+def shock_effect(shock, start_year: int, start_month: int, horizon: int):
+    """(multiplier, offset) of one shock over the forecast months, each (horizon,)."""
+    multiplier, offset = np.ones(horizon), np.zeros(horizon)
+
+    first = (shock.start_year - start_year) * 12 + (shock.start_month - start_month)
+    recovery = shock.recovery_months
+    # Full effect for `months`, then weights R/(R+1), ..., 1/(R+1) while recovering
+    weight = np.concatenate([np.ones(shock.months), 1 - np.arange(1, recovery + 1) / (recovery + 1)])
+    steps = first + np.arange(len(weight))
+
+    # Months before the forecast start or past the horizon have nothing to shock
+    inside = (steps >= 0) & (steps < horizon)
+    steps, weight = steps[inside], weight[inside]
+    multiplier[steps] = 1 + (shock.multiplier - 1) * weight
+    offset[steps] = shock.add * weight
+    return multiplier, offset
+
+
+def count_series(scenarios, countries) -> int:
+    """(scenario, country) series the scenarios expand to, without building their shocks."""
+    known = set(countries)
+    total = 0
+    for scenario in scenarios:
+        if any(shock.countries == "all" for shock in scenario.shocks):
+            total += len(known)
+        else:
+            total += len({c.upper() for shock in scenario.shocks for c in shock.countries} & known)
+    return total
+
+
+def scenario_shocks(scenarios, countries, start_year: int, start_month: int, horizon: int):
+    """
+    Shocks per (scenario, country) pair. Shocks hitting the same pair are
+    applied in order: multipliers multiply, offsets are scaled by the later
+    multipliers and add up.
+
+    countries are the forecastable ones; "all" in a shock expands to them.
+    Returns ({(scenario index, country): (multiplier, offset)}, unknown countries).
+    """
+    known = set(countries)
+    pairs, not_found = {}, []
+    for i, scenario in enumerate(scenarios):
+        for shock in scenario.shocks:
+            targets = countries if shock.countries == "all" else dict.fromkeys(c.upper() for c in shock.countries)
+            multiplier, offset = shock_effect(shock, start_year, start_month, horizon)
+            for country in targets:
+                if country not in known:
+                    if country not in not_found:
+                        not_found.append(country)
+                    continue
+                m, a = pairs.get((i, country), (1.0, 0.0))
+                pairs[i, country] = (m * multiplier, a * multiplier + offset)
+    return pairs, not_found
+
+
+def delta_records(years, months, delta):
+    """Month-by-month change of a scenario's total (sum over its countries)."""
+    return [
+        {"year": y, "month": m, "delta": round(d, 2)}
+        for y, m, d in zip(years.tolist(), months.tolist(), delta.tolist())
+    ]
+
+
+def delta_columns(years, months, delta):
+    return {"year": years.tolist(), "month": months.tolist(), "delta": [round(d, 2) for d in delta.tolist()]}
+
+
+def scenario_records(years, months, path, baseline):
+    """Forecast rows of one shocked country, with its baseline and the difference."""
+    return [
+        {"year": y, "month": m, "predicted_arrivals": round(p, 2), "baseline_arrivals": round(b, 2),
+         "delta": round(p - b, 2)}
+        for y, m, p, b in zip(years.tolist(), months.tolist(), path.tolist(), baseline.tolist())
+    ]
+
+
+def scenario_columns(years, months, path, baseline):
+    """scenario_records as one array per field."""
+    return {
+        "year": years.tolist(),
+        "month": months.tolist(),
+        "predicted_arrivals": [round(p, 2) for p in path.tolist()],
+        "baseline_arrivals": [round(b, 2) for b in baseline.tolist()],
+        "delta": [round(d, 2) for d in (path - baseline).tolist()]
+    }
@@ -1,12 +1,76 @@
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Union
+from pydantic import BaseModel, Field, field_validator
 
-class ForecastRequest(BaseModel):
+MAX_HORIZON = 60
+MAX_PATHS = 10000
+MAX_SCENARIOS = 1000
+# (scenario, country) series one scenario request may expand to
+MAX_SCENARIO_SERIES = 10000
+
+# Response shape: one object per month (default) or one array per field
+Layout = Literal["rows", "columns"]
+
+class IntervalOptions(BaseModel):
+    # Off by default: responses keep their point-forecast shape
+    intervals: bool = False
+    quantiles: List[float] = Field(default=[0.1, 0.5, 0.9], min_length=1, max_length=9)
+    n_paths: int = Field(default=1000, ge=100, le=MAX_PATHS)
+    seed: int = 0
+
+    @field_validator("quantiles")
+    @classmethod
+    def check_quantiles(cls, value):
+        if any(not 0 < q < 1 for q in value):
+            raise ValueError("quantiles must be strictly between 0 and 1")
+        return sorted(set(value))
+
+class ForecastRequest(IntervalOptions):
     start_year: int
     start_month: int = Field(ge=1, le=12)
-    horizon: int = Field(ge=1, le=60)
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
 
-class CountryForecastRequest(BaseModel):
+class CountryForecastRequest(IntervalOptions):
     country: str
     start_year: int
     start_month: int = Field(ge=1, le=12)
-    horizon: int = Field(ge=1, le=60)  
\ No newline at end of file
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
+
+class BatchForecastRequest(IntervalOptions):
+    countries: Union[Literal["all"], List[str]] = Field(default="all", min_length=1)
+    start_year: int
+    start_month: int = Field(ge=1, le=12)
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
+
+class ReconciledForecastRequest(BaseModel):
+    start_year: int
+    start_month: int = Field(ge=1, le=12)
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
+    method: Literal["bottom_up", "top_down", "ols", "mint"] = "mint"
+
+class ExplainRequest(BaseModel):
+    # No country: the total forecast
+    country: Optional[str] = None
+    start_year: int
+    start_month: int = Field(ge=1, le=12)
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
+
+class Shock(BaseModel):
+    # arrivals * multiplier + add from start_year/start_month for `months`
+    # months, then fading linearly to no effect over recovery_months
+    countries: Union[Literal["all"], List[str]] = Field(min_length=1)
+    start_year: int
+    start_month: int = Field(ge=1, le=12)
+    months: int = Field(default=1, ge=1, le=MAX_HORIZON)
+    multiplier: float = Field(default=1.0, ge=0)
+    add: float = 0.0
+    recovery_months: int = Field(default=0, ge=0, le=MAX_HORIZON)
+
+class Scenario(BaseModel):
+    name: Optional[str] = None
+    shocks: List[Shock] = Field(min_length=1, max_length=50)
+
+class ScenarioRequest(BaseModel):
+    start_year: int
+    start_month: int = Field(ge=1, le=12)
+    horizon: int = Field(ge=1, le=MAX_HORIZON)
+    scenarios: List[Scenario] = Field(min_length=1, max_length=MAX_SCENARIOS)
@@ -0,0 +1,375 @@
+"""
+Model selection for the total model.
+
+Every candidate (model x feature subset) is scored on the same rolling
+time-based folds with recursive multi-step forecasts, the way the API
+serves them. Feature matrices and fold splits are built once per data
+version and cached on disk (keyed by a hash of the data), and so is each
+candidate's score, so re-running a sweep only evaluates new candidates.
+
+Candidates run in a process pool with an explicit CPU budget: each worker
+limits BLAS/OpenMP threads to its share and CatBoost gets the same
+thread_count, so workers x threads never exceeds --jobs.
+
+The best candidate with a compact linear form (linear, ridge, lasso) is
+refit on all rows and written to outputs/model.pkl, outputs/model.json and
+outputs/model_meta.json with its timing and accuracy profile. The serving
+image has no scikit-learn or CatBoost, so a non-linear winner is reported
+in outputs/selection.json but not promoted.
+
+    python -m src.select_model
+    python -m src.select_model --grid grid.json --jobs 8 --workers 4
+    python -m src.select_model --no-promote
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.columnar import read_frame
+from src.forecasting import FEATURE_COLS, recursive_forecast_model
+from src.model_format import LinearModel, export_linear_model
+
+
+OUT_DIR = Path("outputs")
+MODEL_PATH = OUT_DIR / "model.pkl"
+COMPACT_MODEL_PATH = OUT_DIR / "model.json"
+META_PATH = OUT_DIR / "model_meta.json"
+SELECTION_PATH = OUT_DIR / "selection.json"
+CACHE_DIR = OUT_DIR / ".select_cache"
+
+TARGET_COL = "arrivals"
+
+# Model types promote() can export as a compact linear model for serving
+SERVABLE_TYPES = ("linear", "ridge", "lasso")
+
+DEFAULT_GRID = {
+    "models": [
+        {"name": "linear", "type": "linear"},
+        {"name": "ridge_1", "type": "ridge", "params": {"alpha": 1.0}},
+        {"name": "ridge_10", "type": "ridge", "params": {"alpha": 10.0}},
+        {"name": "lasso_1000", "type": "lasso", "params": {"alpha": 1000.0}},
+        {"name": "catboost", "type": "catboost",
+         "params": {"iterations": 300, "depth": 4, "learning_rate": 0.05}}
+    ],
+    "feature_sets": {
+        "all": FEATURE_COLS,
+        "no_year": [c for c in FEATURE_COLS if c != "year"],
+        "seasonal_lags": ["month_sin", "month_cos", "lag_1", "lag_12", "rolling_mean_3"]
+    },
+    "folds": {"n_folds": 4, "horizon": 12, "step": 6, "min_train": 24}
+}
+
+
+def make_model(spec: dict, threads: int = 1):
+    """Unfitted estimator for a grid entry."""
+    params = spec.get("params", {})
+    kind = spec["type"]
+
+    if kind == "linear":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**params)
+
+    if kind in ("ridge", "lasso"):
+        # Penalties only make sense on standardized features
+        from sklearn.linear_model import Lasso, Ridge
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        estimator = Ridge(**params) if kind == "ridge" else Lasso(max_iter=50000, **params)
+        return make_pipeline(StandardScaler(), estimator)
+
+    if kind == "catboost":
+        from catboost import CatBoostRegressor
+        return CatBoostRegressor(
+            thread_count=threads, verbose=False, allow_writing_files=False,
+            random_seed=0, **params
+        )
+
+    raise ValueError(f"Unknown model type {kind!r}")
+
+
+def as_linear(model):
+    """(coef, intercept) in original feature units for linear models and scaler+linear pipelines, else None."""
+    steps = getattr(model, "steps", None)
+    if steps is None:
+        if hasattr(model, "coef_"):
+            return np.asarray(model.coef_, dtype=np.float64).ravel(), float(model.intercept_)
+        return None
+
+    if len(steps) != 2 or not hasattr(steps[1][1], "coef_"):
+        return None
+    scaler, estimator = steps[0][1], steps[1][1]
+    coef = np.asarray(estimator.coef_, dtype=np.float64).ravel() / scaler.scale_
+    return coef, float(estimator.intercept_ - coef @ scaler.mean_)
+
+
+# ---------- cached features and folds ----------
+
+def data_hash(df) -> str:
+    digest = hashlib.sha256()
+    for col in ["date", TARGET_COL] + FEATURE_COLS:
+        digest.update(col.encode())
+        digest.update(np.ascontiguousarray(np.asarray(df[col])).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fold_cuts(n_rows: int, n_folds: int, horizon: int, step: int, min_train: int):
+    """Row positions where each fold's forecast starts: train on rows before, score the next `horizon`."""
+    cuts = [n_rows - horizon - step * i for i in reversed(range(n_folds))]
+    cuts = [c for c in cuts if c >= min_train]
+    if not cuts:
+        raise ValueError("Not enough rows for any fold; lower min_train or n_folds.")
+    return cuts
+
+
+def build_cache(grid: dict, cache_root: Path = CACHE_DIR) -> Path:
+    """
+    Feature matrix per feature set, target, calendar and fold cuts, written
+    once per (data, feature sets, folds). Returns the cache directory.
+    """
+    df = read_frame("total_features").sort_values("date", kind="stable").reset_index(drop=True)
+
+    key_source = json.dumps({"data": data_hash(df), "feature_sets": grid["feature_sets"],
+                             "folds": grid["folds"]}, sort_keys=True)
+    cache_dir = cache_root / hashlib.sha256(key_source.encode()).hexdigest()[:16]
+    if (cache_dir / "folds.json").exists():
+        return cache_dir
+
+    tmp = cache_dir.with_name(cache_dir.name + ".tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+    for name, cols in grid["feature_sets"].items():
+        np.save(tmp / f"X_{name}.npy", df[cols].to_numpy(dtype=np.float64))
+    np.save(tmp / "y.npy", df[TARGET_COL].to_numpy(dtype=np.float64))
+    np.save(tmp / "year.npy", df["year"].to_numpy(dtype=np.int64))
+    np.save(tmp / "month.npy", df["month"].to_numpy(dtype=np.int64))
+
+    folds = grid["folds"]
+    spec = {
+        "data_hash": data_hash(df),
+        "rows": len(df),
+        "cuts": fold_cuts(len(df), folds["n_folds"], folds["horizon"], folds["step"], folds["min_train"]),
+        "horizon": folds["horizon"],
+        "feature_sets": grid["feature_sets"]
+    }
+    (tmp / "results").mkdir(exist_ok=True)
+    (tmp / "folds.json").write_text(json.dumps(spec, indent=2))
+    tmp.rename(cache_dir)
+    return cache_dir
+
+
+# ---------- candidate evaluation (worker processes) ----------
+
+_thread_limit = None
+
+
+def limit_threads(threads: int):
+    """Pool initializer: cap BLAS/OpenMP threads in this worker."""
+    global _thread_limit
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    from threadpoolctl import threadpool_limits
+    _thread_limit = threadpool_limits(limits=threads)
+
+
+def evaluate(task):
+    """Score one candidate on every fold; result is also written to the cache."""
+    cache_dir, model_spec, feature_set, threads = task
+    cache_dir = Path(cache_dir)
+    folds = json.loads((cache_dir / "folds.json").read_text())
+    cols = folds["feature_sets"][feature_set]
+    horizon = folds["horizon"]
+
+    X = np.load(cache_dir / f"X_{feature_set}.npy", mmap_mode="r")
+    y = np.load(cache_dir / "y.npy", mmap_mode="r")
+    year = np.load(cache_dir / "year.npy")
+    month = np.load(cache_dir / "month.npy")
+
+    name = f"{model_spec['name']}__{feature_set}"
+    result = {"name": name, "model": model_spec, "feature_set": feature_set, "feature_cols": cols}
+
+    try:
+        fold_mae, fold_rmse, abs_err, fit_seconds, forecast_seconds = [], [], [], [], []
+        for cut in folds["cuts"]:
+            model = make_model(model_spec, threads)
+            start = time.perf_counter()
+            model.fit(np.asarray(X[:cut]), np.asarray(y[:cut]))
+            fit_seconds.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            _, _, preds = recursive_forecast_model(
+                y[:cut], model, int(year[cut]), int(month[cut]), horizon, cols
+            )
+            forecast_seconds.append(time.perf_counter() - start)
+
+            err = preds - y[cut:cut + horizon]
+            abs_err.append(np.abs(err))
+            fold_mae.append(float(np.mean(np.abs(err))))
+            fold_rmse.append(float(np.sqrt(np.mean(err ** 2))))
+    except ImportError as e:
+        result.update(status="skipped", reason=str(e))
+        return result
+
+    result.update(
+        status="ok",
+        MAE=round(float(np.mean(fold_mae)), 2),
+        RMSE=round(float(np.mean(fold_rmse)), 2),
+        fold_MAE=[round(v, 2) for v in fold_mae],
+        fold_RMSE=[round(v, 2) for v in fold_rmse],
+        horizon_MAE=[round(float(v), 2) for v in np.mean(abs_err, axis=0)],
+        fit_seconds=round(float(np.mean(fit_seconds)), 4),
+        forecast_ms=round(float(np.mean(forecast_seconds)) * 1e3, 3),
+        threads=threads
+    )
+    (cache_dir / "results" / f"{name}.json").write_text(json.dumps(result, indent=2))
+    return result
+
+
+def run_sweep(grid: dict, jobs: int = None, workers: int = None, refresh: bool = False):
+    cache_dir = build_cache(grid)
+
+    jobs = jobs or os.cpu_count() or 1
+    workers = max(1, min(workers or jobs, jobs))
+    threads = max(1, jobs // workers)
+
+    results, tasks = [], []
+    for model_spec in grid["models"]:
+        for feature_set in grid["feature_sets"]:
+            cached = cache_dir / "results" / f"{model_spec['name']}__{feature_set}.json"
+            if cached.exists() and not refresh:
+                result = json.loads(cached.read_text())
+                if result["model"] == model_spec:
+                    results.append(dict(result, cached=True))
+                    continue
+            tasks.append((str(cache_dir), model_spec, feature_set, threads))
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 initializer=limit_threads, initargs=(threads,)) as pool:
+            results.extend(dict(r, cached=False) for r in pool.map(evaluate, tasks))
+
+    return cache_dir, results, {"jobs": jobs, "workers": workers, "threads_per_worker": threads}
+
+
+# ---------- promotion ----------
+
+def promotable(scored):
+    """Best-scoring candidate (list sorted by the metric) the serving image can load, or None."""
+    return next((r for r in scored if r["model"]["type"] in SERVABLE_TYPES), None)
+
+
+def promote(winner: dict, cache_dir: Path, jobs: int):
+    """Refit the winner on all rows and write model.pkl, model.json and model_meta.json."""
+    import joblib
+    from threadpoolctl import threadpool_limits
+
+    folds = json.loads((cache_dir / "folds.json").read_text())
+    cols = winner["feature_cols"]
+    X = np.load(cache_dir / f"X_{winner['feature_set']}.npy")
+    y = np.load(cache_dir / "y.npy")
+
+    model = make_model(winner["model"], jobs)
+    start = time.perf_counter()
+    with threadpool_limits(limits=jobs):
+        model.fit(X, y)
+    final_fit_seconds = time.perf_counter() - start
+
+    linear = as_linear(model)
+    if linear is None:
+        raise ValueError(f"{winner['name']} has no compact linear form and can't be served.")
+
+    joblib.dump(model, MODEL_PATH)
+    export_linear_model(
+        LinearModel(linear[0], linear[1], cols), cols, COMPACT_MODEL_PATH, TARGET_COL, source=MODEL_PATH
+    )
+
+    meta = {
+        "feature_cols": cols,
+        "target_col": TARGET_COL,
+        "model_type": winner["model"]["type"],
+        "model_params": winner["model"].get("params", {}),
+        "selection": {
+            "candidate": winner["name"],
+            "data_hash": folds["data_hash"],
+            "fold_cuts": folds["cuts"],
+            "horizon": folds["horizon"],
+            "MAE": winner["MAE"],
+            "RMSE": winner["RMSE"],
+            "fold_MAE": winner["fold_MAE"],
+            "horizon_MAE": winner["horizon_MAE"],
+            "fit_seconds": winner["fit_seconds"],
+            "forecast_ms": winner["forecast_ms"],
+            "final_fit_seconds": round(final_fit_seconds, 4),
+            "selected_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+    }
+    META_PATH.write_text(json.dumps(meta, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model-selection sweep for the total model")
+    parser.add_argument("--grid", type=Path, help="JSON with models / feature_sets / folds (defaults fill gaps)")
+    parser.add_argument("--jobs", type=int, default=None, help="total CPU threads to use (default: all cores)")
+    parser.add_argument("--workers", type=int, default=None, help="candidates evaluated at once (default: --jobs)")
+    parser.add_argument("--metric", choices=["MAE", "RMSE"], default="MAE")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached candidate scores")
+    parser.add_argument("--no-promote", action="store_true", help="only report, keep the current model")
+    args = parser.parse_args()
+
+    grid = dict(DEFAULT_GRID)
+    if args.grid:
+        grid.update(json.loads(args.grid.read_text()))
+
+    start = time.perf_counter()
+    cache_dir, results, budget = run_sweep(grid, args.jobs, args.workers, args.refresh)
+    sweep_seconds = time.perf_counter() - start
+
+    scored = sorted((r for r in results if r["status"] == "ok"), key=lambda r: r[args.metric])
+    skipped = [r for r in results if r["status"] != "ok"]
+    if not scored:
+        raise RuntimeError("No candidate could be evaluated.")
+
+    best, winner = scored[0], promotable(scored)
+
+    SELECTION_PATH.write_text(json.dumps({
+        "metric": args.metric,
+        "best": best["name"],
+        "promotable": winner["name"] if winner else None,
+        "cache": str(cache_dir),
+        "budget": budget,
+        "sweep_seconds": round(sweep_seconds, 4),
+        "leaderboard": scored,
+        "skipped": skipped
+    }, indent=2))
+
+    print(f"{len(scored)} candidates in {sweep_seconds:.2f}s "
+          f"({budget['workers']} workers x {budget['threads_per_worker']} threads)")
+    for r in scored:
+        print(f"  {r['name']:<32} MAE {r['MAE']:>12.2f}  RMSE {r['RMSE']:>12.2f}  "
+              f"fit {r['fit_seconds'] * 1e3:8.1f}ms  forecast {r['forecast_ms']:7.2f}ms"
+              f"{'  (cached)' if r['cached'] else ''}")
+    for r in skipped:
+        print(f"  {r['name']:<32} skipped: {r['reason']}")
+
+    if winner is not best:
+        print(f"Best: {best['name']} (not promoted: the serving image can only load linear models)")
+    if winner is None:
+        print("No linear candidate to promote; keeping the current model.")
+        return
+    if args.no_promote:
+        print("Winner (not promoted):", winner["name"])
+        return
+
+    promote(winner, cache_dir, budget["jobs"])
+    print("Winner:", winner["name"])
+    print("Model saved:", MODEL_PATH.resolve())
+    print("Meta saved:", META_PATH.resolve())
+    print("Leaderboard saved:", SELECTION_PATH.resolve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Artifact state shared by every worker process (ARTIFACT_LOAD_MODE=shared).
+
+With `uvicorn --workers N` each worker normally builds its own
+ArtifactState. In shared mode one process, the publisher, builds it and
+writes every array (history, features, residuals, coefficients) as .npy
+files into a snapshot directory, by default on /dev/shm (tmpfs, i.e. shared
+memory). Every worker, the publisher included, memory-maps the snapshot
+read-only, so the pages exist once however many workers attach. Workers
+never import pandas or load model files for a linear snapshot.
+
+The publisher is whichever worker first takes an flock on publisher.lock;
+if it exits, the lock is released and the next worker to reload takes
+over. `python -m src.shared_state --watch 30` runs a standalone publisher
+instead, so all workers only attach.
+
+Swaps are coordinated through one pointer file, CURRENT, naming the
+snapshot directory. The publisher writes a new snapshot next to the old
+one and replaces CURRENT atomically. Each worker's watcher sees the new
+name and attaches to it. All workers move to the same generation within
+one reload interval, and none can mix files of two generations. Old
+snapshots are deleted once two newer ones exist. Deleting is safe on
+POSIX, because a mapping outlives its unlinked file.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.artifacts import (
+    MODEL_COMPACT_PATH, MODEL_PATH, ArtifactState, ArtifactStore, artifact_fingerprint
+)
+from src.forecasting import FEATURE_COLS, HistoryIndex
+from src.model_format import LinearModel, LinearRegistry, load_model
+
+
+POINTER = "CURRENT"
+LOCK = "publisher.lock"
+KEEP_SNAPSHOTS = 2
+SNAPSHOT_WAIT = 60.0
+
+# ArtifactState attributes stored as arrays / as JSON in the manifest
+ARRAYS = (
+    "dates_total", "history_total", "features_total", "residuals_total",
+    "coef_country", "features_country", "residuals_country"
+)
+ATTRIBUTES = (
+    "meta", "feature_cols", "intercept", "intercept_country",
+    "model_version", "country_model_version", "model_sources", "load_seconds", "loaded_at"
+)
+
+
+def default_shared_dir() -> Path:
+    shm = Path("/dev/shm")
+    return shm / "tourism-forecast" if shm.is_dir() else Path("outputs/shared")
+
+
+def current_snapshot(root: Path):
+    """Name of the snapshot CURRENT points at, or None before the first publish."""
+    try:
+        return (root / POINTER).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(state: ArtifactState, root: Path) -> str:
+    """
+    Write `state` as a snapshot under root and point CURRENT at it.
+    A snapshot of the same artifact versions is reused as is.
+    """
+    name = f"{state.model_version}-{state.country_model_version}"
+    final = root / name
+
+    if not (final / "manifest.json").exists():
+        tmp = root / f"{name}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        arrays = {a: getattr(state, a) for a in ARRAYS}
+        if state.coef is not None:
+            arrays["coef"] = state.coef
+
+        # Countries in row order with their row counts; HistoryIndex is rebuilt from them
+        index = state.country_index
+        countries = sorted(index.countries, key=lambda c: index.span(c).start)
+        arrays["country_arrivals"] = index.arrivals
+
+        registry = None
+        if state.country_registry is not None:
+            arrays["coef_registry"] = state.coef_registry
+            arrays["intercept_registry"] = state.intercept_registry
+            arrays["registry_packed"] = state.country_registry.packed
+            registry = {
+                "index": state.country_registry.index,
+                "feature_cols": state.country_registry.feature_cols,
+                "row_names": state.country_registry.row_names
+            }
+
+        for a, values in arrays.items():
+            values = np.asarray(values)
+            if values.dtype == object:
+                # e.g. dates parsed from the CSV export; object arrays can't be mapped
+                values = values.astype(str)
+            np.save(tmp / f"{a}.npy", np.ascontiguousarray(values))
+
+        manifest = {
+            "arrays": sorted(arrays),
+            "attributes": {a: getattr(state, a) for a in ATTRIBUTES},
+            "countries": countries,
+            "country_rows": [index.span(c).stop - index.span(c).start for c in countries],
+            "registry": registry
+        }
+        # Written last: a directory without it is incomplete
+        (tmp / "manifest.json").write_text(json.dumps(manifest))
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+
+    pointer = root / f"{POINTER}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / POINTER)
+
+    _remove_old_snapshots(root, name)
+    return name
+
+
+def _remove_old_snapshots(root: Path, current: str):
+    snapshots = sorted(
+        (p for p in root.iterdir() if p.is_dir() and p.name != current and not p.name.endswith(".tmp")),
+        key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for path in snapshots[KEEP_SNAPSHOTS - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def attach(path: Path) -> ArtifactState:
+    """ArtifactState whose arrays are read-only memory maps of a published snapshot."""
+    manifest = json.loads((path / "manifest.json").read_text())
+    arrays = {a: np.load(path / f"{a}.npy", mmap_mode="r") for a in manifest["arrays"]}
+
+    # Built from the snapshot, not from the artifact files
+    state = ArtifactState.__new__(ArtifactState)
+    for a, value in manifest["attributes"].items():
+        setattr(state, a, value)
+    for a in ARRAYS:
+        setattr(state, a, arrays[a])
+
+    state.coef = arrays.get("coef")
+    if state.coef is not None:
+        state.model = LinearModel(state.coef, state.intercept, state.feature_cols)
+    else:
+        # A non-linear total model (CatBoost) has no array form; each worker loads it
+        state.model, _ = load_model(MODEL_COMPACT_PATH, MODEL_PATH)
+    state.model_country = LinearModel(state.coef_country, state.intercept_country, FEATURE_COLS)
+
+    registry = manifest["registry"]
+    state.country_registry = None
+    if registry is not None:
+        state.country_registry = LinearRegistry(
+            arrays["registry_packed"], registry["index"], registry["feature_cols"], registry["row_names"]
+        )
+        state.coef_registry = arrays["coef_registry"]
+        state.intercept_registry = arrays["intercept_registry"]
+
+    countries = manifest["countries"]
+    codes = np.repeat(np.arange(len(countries)), manifest["country_rows"])
+    state.country_index = HistoryIndex(codes, arrays["country_arrivals"], countries)
+    return state
+
+
+class SharedArtifactStore(ArtifactStore):
+    """
+    ArtifactStore whose generations are published snapshots. reload() on the
+    publisher rebuilds and republishes when the artifact files change; on
+    every worker it then attaches to whatever CURRENT points at.
+    """
+
+    def __init__(self, root=None, loader=ArtifactState):
+        super().__init__(loader)
+        self.root = Path(root) if root is not None else default_shared_dir()
+        self.snapshot = None
+        self._lock_file = None
+
+    @property
+    def publisher(self) -> bool:
+        return self._lock_file is not None
+
+    def _lead(self) -> bool:
+        """Take the publisher lock if no other process holds it; kept for the life of the process."""
+        if self._lock_file is None:
+            import fcntl
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            lock_file = open(self.root / LOCK, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+        return True
+
+    def reload(self, force: bool = False) -> bool:
+        with self._lock:
+            try:
+                if self._lead():
+                    fingerprint = artifact_fingerprint()
+                    if force or fingerprint != self._fingerprint or current_snapshot(self.root) is None:
+                        publish(self._loader(), self.root)
+                        self._fingerprint = fingerprint
+
+                name = current_snapshot(self.root)
+                deadline = time.monotonic() + SNAPSHOT_WAIT
+                while name is None and time.monotonic() < deadline:
+                    # A worker started before the publisher's first snapshot
+                    time.sleep(0.1)
+                    name = current_snapshot(self.root)
+                if name is None:
+                    raise RuntimeError(f"No artifact snapshot published in {self.root}")
+
+                if name == self.snapshot and not force:
+                    return False
+                state = attach(self.root / name)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            self.last_error = None
+            self.current, self.snapshot = state, name
+            self.generation += 1
+            self._ready.set()
+            return True
+
+    def status(self) -> dict:
+        return {
+            **super().status(),
+            "shared": {
+                "dir": str(self.root),
+                "role": "publisher" if self.publisher else "follower",
+                "snapshot": self.snapshot
+            }
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish artifact snapshots for workers in shared mode")
+    parser.add_argument("--dir", type=Path, default=None, help=f"snapshot directory (default {default_shared_dir()})")
+    parser.add_argument("--watch", type=float, default=0, help="republish when artifacts change, polling every N seconds")
+    args = parser.parse_args()
+
+    store = SharedArtifactStore(args.dir or os.environ.get("ARTIFACT_SHARED_DIR"))
+    if not store._lead():
+        parser.exit(1, f"Another process is already publishing to {store.root}\n")
+
+    store.reload(force=True)
+    print("Published", store.snapshot, "to", store.root)
+    while args.watch > 0:
+        time.sleep(args.watch)
+        try:
+            if store.reload():
+                print("Published", store.snapshot)
+        except Exception as e:
+            print("Reload failed, keeping", store.snapshot, "-", e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Cold-start budget for the API: which imports and artifacts cost what.
+
+    python -m src.startup_report
+    python -m src.startup_report --json
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def import_times(module: str = "src.app", top: int = 15):
+    """
+    Import time (seconds) per top-level package when importing `module` in a
+    fresh interpreter, parsed from `python -X importtime`. Each package is
+    charged the self time of all of its submodules, so nothing is counted twice.
+    """
+    env = dict(os.environ, ARTIFACT_LOAD_MODE="lazy", ARTIFACT_RELOAD_INTERVAL="0")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0) + int(self_us) / 1e6
+
+    ranked = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "interpreter_wall_seconds": round(wall, 4),
+        "packages": {name: round(sec, 4) for name, sec in ranked}
+    }
+
+
+def artifact_times():
+    """Per-artifact load time of one full ArtifactState build."""
+    from src.artifacts import ArtifactState
+
+    start = time.perf_counter()
+    state = ArtifactState()
+    return {
+        "total_seconds": round(time.perf_counter() - start, 4),
+        "steps": state.load_seconds
+    }
+
+
+def main():
+    report = {"imports": import_times(), "artifacts": artifact_times()}
+
+    if "--json" in sys.argv:
+        print(json.dumps(report, indent=2))
+        return
+
+    imports = report["imports"]
+    print(f"import {imports['module']}: {imports['interpreter_wall_seconds']:.3f}s wall (fresh interpreter)")
+    for name, sec in imports["packages"].items():
+        print(f"  {name:<24} {sec:8.3f}s")
+
+    artifacts = report["artifacts"]
+    print(f"artifact load: {artifacts['total_seconds']:.3f}s")
+    for name, sec in artifacts["steps"].items():
+        print(f"  {name:<32} {sec:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+The built frontend (frontend/dist) served from memory.
+
+Every file is read once at startup, with its ETag and its compressed
+variants: pre-built `name.br` / `name.gz` files next to it when the build
+produced them, otherwise compressed once here at the best level. A request
+is then a dict lookup and a header check, with no disk access and no
+thread hop, so static traffic barely touches the forecast workers.
+
+Vite content-hashes everything under assets/, so those files are cached
+by browsers as immutable. index.html and other unhashed files are
+revalidated against their ETag and answered with 304 when unchanged. Each
+encoding of a file is its own representation with its own strong ETag
+("<hash>-br", "<hash>-gzip"), so a cache can't hand compressed bytes to a
+client that validated the identity body.
+Restart the API after rebuilding the frontend.
+"""
+import hashlib
+import mimetypes
+from pathlib import Path
+
+from starlette.responses import Response
+
+from src.compression import MINIMUM_SIZE, available_encodings, compress, compressible, negotiate
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class StaticFile:
+    def __init__(self, body: bytes, media_type: str, cache_control: str, variants: dict):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        # encoding -> bytes, most preferred first
+        self.variants = variants
+        self.encodings = tuple(variants)
+        self.etags = {encoding: f'"{digest}-{encoding}"' for encoding in variants}
+
+
+def not_modified(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+class StaticSite:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.files = {}
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file() and path.suffix not in (".br", ".gz"):
+                name = path.relative_to(self.root).as_posix()
+                self.files[name] = self._load(path, name)
+        self.index = self.files.get("index.html")
+
+    @staticmethod
+    def _load(path: Path, name: str) -> StaticFile:
+        body = path.read_bytes()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        variants = {}
+        for encoding, suffix in SUFFIXES.items():
+            prebuilt = path.with_name(path.name + suffix)
+            if prebuilt.is_file():
+                variants[encoding] = prebuilt.read_bytes()
+            elif encoding in available_encodings() and compressible(media_type) and len(body) >= MINIMUM_SIZE:
+                variants[encoding] = compress(body, encoding, best=True)
+        # A variant that doesn't save anything is not worth a Content-Encoding
+        variants = {e: v for e, v in variants.items() if len(v) < len(body)}
+
+        cache_control = IMMUTABLE if name.startswith("assets/") else REVALIDATE
+        return StaticFile(body, media_type, cache_control, variants)
+
+    def get(self, name: str):
+        return self.files.get(name)
+
+    def response(self, file: StaticFile, request_headers) -> Response:
+        encoding = negotiate(request_headers.get("accept-encoding", ""), file.encodings)
+        etag = file.etags[encoding] if encoding is not None else file.etag
+
+        headers = {"ETag": etag, "Cache-Control": file.cache_control}
+        if file.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if not_modified(request_headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return Response(file.body, media_type=file.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(file.variants[encoding], media_type=file.media_type, headers=headers)
@@ -0,0 +1,45 @@
+"""
+Streamed forecast responses.
+
+Messages are plain dicts with a "type" ("meta", "month", "forecast",
+"end", "error"). They go out as newline-delimited JSON (one object per
+line) or as server-sent events (event name = type), each one as soon as
+it is produced.
+"""
+import json
+from typing import Literal, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+StreamFormat = Literal["ndjson", "sse"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+# Countries forecast per step of a streamed batch
+STREAM_CHUNK = 16
+
+
+def stream_format(format: Optional[str], accept: Optional[str]) -> str:
+    """?format= wins; otherwise SSE if the client accepts it, else NDJSON."""
+    if format:
+        return format
+    if accept and "text/event-stream" in accept:
+        return "sse"
+    return "ndjson"
+
+
+def encode(message: dict, format: str) -> bytes:
+    body = json.dumps(message, separators=(",", ":"))
+    if format == "sse":
+        return f"event: {message['type']}\ndata: {body}\n\n".encode()
+    return (body + "\n").encode()
+
+
+def stream_response(messages, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        (encode(m, format) for m in messages),
+        media_type=MEDIA_TYPES[format],
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
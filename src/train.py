@@ -7,11 +7,14 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
 import matplotlib.pyplot as plt
 
+from src.columnar import read_frame
+from src.model_format import export_linear_model
+
 
-DATA_PATH = Path("data/total_features.csv")
 OUT_DIR = Path("outputs")
 FIG_DIR = OUT_DIR / "figures"
 MODEL_PATH = OUT_DIR / "model.pkl"
+COMPACT_MODEL_PATH = OUT_DIR / "model.json"
 META_PATH = OUT_DIR / "model_meta.json"
 METRICS_PATH = OUT_DIR / "metrics.json"
 PLOT_PATH = FIG_DIR / "actual_vs_predicted.png"
@@ -31,7 +34,7 @@ def main():
     OUT_DIR.mkdir(exist_ok=True)
     FIG_DIR.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(DATA_PATH)
+    df = read_frame("total_features")
     df["date"] = pd.to_datetime(df["date"])
 
     # Target column (adjust if your total target column name differs)
@@ -82,6 +85,7 @@ def main():
     lr_final.fit(X, y)
 
     joblib.dump(lr_final, MODEL_PATH)
+    export_linear_model(lr_final, feature_cols, COMPACT_MODEL_PATH, target_col, source=MODEL_PATH)
 
     meta = {
         "feature_cols": feature_cols,
@@ -90,6 +94,7 @@ def main():
     META_PATH.write_text(json.dumps(meta, indent=2))
 
     print("Model saved:", MODEL_PATH.resolve())
+    print("Compact model saved:", COMPACT_MODEL_PATH.resolve())
     print("Meta saved:", META_PATH.resolve())
     print("Metrics saved:", METRICS_PATH.resolve())
     print("Plot saved:", PLOT_PATH.resolve())
@@ -1,24 +1,153 @@
-import pandas as pd
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import joblib
+import numpy as np
 from sklearn.linear_model import LinearRegression
 from pathlib import Path
 
-DATA_PATH = Path("data/country_features.csv")
+from src.columnar import read_frame
+from src.model_format import LinearRegistry, export_linear_model, export_linear_registry
+
 MODEL_PATH = Path("outputs/model_country.pkl")
+COMPACT_MODEL_PATH = Path("outputs/model_country.json")
+REGISTRY_PATH = Path("outputs/model_country_registry.json")
 
-df = pd.read_csv(DATA_PATH)
+# Countries (or regions) with fewer training rows keep using the global model
+MIN_ROWS = 24
 
 feature_cols = [
     "year", "month", "month_sin", "month_cos",
     "lag_1", "lag_12", "rolling_mean_3"
 ]
 
-X = df[feature_cols]
-y = df["arrivals"]
 
-model = LinearRegression()
-model.fit(X, y)
+def fit_groups(groups):
+    """Fit one LinearRegression per (name, X, y); runs in a worker process."""
+    fitted = []
+    for name, X, y in groups:
+        model = LinearRegression()
+        model.fit(X, y)
+        fitted.append((name, model.coef_, model.intercept_))
+    return fitted
+
+
+def split_groups(df, group_col):
+    """(name, X, y) per group with at least MIN_ROWS rows, in sorted name order."""
+    df = df.sort_values([group_col, "date"], kind="stable")
+    names = df[group_col].astype(str).to_numpy()
+    X = df[feature_cols].to_numpy(dtype=np.float64)
+    y = df["arrivals"].to_numpy(dtype=np.float64)
+
+    boundaries = np.flatnonzero(names[1:] != names[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(names)]))
+
+    return [
+        (names[start], X[start:stop], y[start:stop])
+        for start, stop in zip(starts, stops)
+        if stop - start >= MIN_ROWS
+    ]
+
+
+def train_registry(df, workers=None, regions=None):
+    """
+    Fit per-country models (or per-region, if a country -> region mapping is
+    given) in a process pool and pack them into one registry.
+
+    Returns (coef, intercept, index, row_names, n_rows).
+    """
+    df = df.copy()
+    df["country"] = df["country"].astype(str)
+    if regions is not None:
+        df["group"] = df["country"].map(regions)
+        df = df.dropna(subset=["group"])
+    else:
+        df["group"] = df["country"]
+
+    groups = split_groups(df, "group")
+    workers = workers or os.cpu_count() or 1
+
+    # A few chunks per worker: each task is a handful of tiny fits
+    n_chunks = max(1, min(len(groups), workers * 4))
+    chunks = [groups[i::n_chunks] for i in range(n_chunks)]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fitted = [f for part in pool.map(fit_groups, chunks) for f in part]
+    else:
+        fitted = [f for part in map(fit_groups, chunks) for f in part]
+
+    fitted.sort(key=lambda f: f[0])
+    row_names = [name for name, _, _ in fitted]
+    coef = np.array([c for _, c, _ in fitted]).reshape(len(fitted), len(feature_cols))
+    intercept = np.array([i for _, _, i in fitted], dtype=np.float64)
+
+    row_of = {name: row for row, name in enumerate(row_names)}
+    group_of = df.drop_duplicates("country").set_index("country")["group"]
+    index = {country: row_of[group] for country, group in group_of.items() if group in row_of}
+
+    n_rows = {name: len(y) for name, _, y in groups}
+    return coef, intercept, index, row_names, [n_rows[name] for name in row_names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the country model(s)")
+    parser.add_argument("--per-country", action="store_true",
+                        help="also fit one model per country, packed into " + str(REGISTRY_PATH))
+    parser.add_argument("--regions", type=Path,
+                        help="CSV with country,region columns: fit one model per region instead")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for per-country fits (default: all cores)")
+    args = parser.parse_args()
+
+    df = read_frame("country_features")
+
+    X = df[feature_cols]
+    y = df["arrivals"]
+
+    # Global model: used for every country without a model of its own
+    model = LinearRegression()
+    model.fit(X, y)
+
+    joblib.dump(model, MODEL_PATH)
+    export_linear_model(model, feature_cols, COMPACT_MODEL_PATH, source=MODEL_PATH)
+
+    print("Country model saved")
+
+    if not (args.per_country or args.regions):
+        # A registry from an earlier run would keep serving its stale rows
+        # over the model just trained
+        if REGISTRY_PATH.exists():
+            REGISTRY_PATH.unlink()
+            print("Removed per-country registry:", REGISTRY_PATH.resolve())
+        registry_data = LinearRegistry.data_path(REGISTRY_PATH)
+        if registry_data.exists():
+            registry_data.unlink()
+        return
+
+    regions = None
+    if args.regions:
+        import pandas as pd
+        mapping = pd.read_csv(args.regions)
+        regions = dict(zip(mapping["country"].str.upper(), mapping["region"]))
+
+    start = time.perf_counter()
+    coef, intercept, index, row_names, n_rows = train_registry(df, args.workers, regions)
+    elapsed = time.perf_counter() - start
+
+    export_linear_registry(
+        coef, intercept, index, feature_cols, REGISTRY_PATH,
+        row_names=row_names,
+        info={"group_by": "region" if regions else "country", "min_rows": MIN_ROWS, "train_rows": n_rows}
+    )
+
+    print(f"Registry saved: {REGISTRY_PATH.resolve()}")
+    print(f"  {len(row_names)} models for {len(index)} countries in {elapsed:.2f}s "
+          f"(countries with < {MIN_ROWS} rows use the global model)")
 
-joblib.dump(model, MODEL_PATH)
 
-print("Country model saved")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
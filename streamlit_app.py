@@ -1,15 +1,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import json
 import plotly.express as px
 from pathlib import Path
 from datetime import datetime
 import sys
 sys.path.append('src')
-from features import build_features
-from utils_time import add_month
+from forecasting import FEATURE_COLS, HistoryIndex, linear_coefficients, recursive_forecast, forecast_records
+from model_format import LinearRegistry, load_model
+from columnar import read_frame
 
 # Page config
 st.set_page_config(
@@ -22,20 +22,23 @@ st.set_page_config(
 # Load models and data
 @st.cache_resource
 def load_models_and_data():
-    model = joblib.load("outputs/model.pkl")
-    model_country = joblib.load("outputs/model_country.pkl")
+    model, _ = load_model("outputs/model.json", "outputs/model.pkl")
+    model_country, _ = load_model("outputs/model_country.json", "outputs/model_country.pkl")
+    registry_path = Path("outputs/model_country_registry.json")
+    registry = LinearRegistry.load(registry_path) if registry_path.exists() else None
     
     with open("outputs/model_meta.json") as f:
         meta = json.load(f)
     
-    df = pd.read_csv("data/total_features.csv").sort_values("date")
-    df_country = pd.read_csv("data/country_features.csv").sort_values(["country", "date"])
+    df = read_frame("total_features").sort_values("date")
+    df_country = read_frame("country_features").sort_values(["country", "date"])
+    country_index = HistoryIndex(df_country["country"], df_country["arrivals"])
     
-    return model, model_country, meta, df, df_country
+    return model, model_country, registry, meta, df, country_index
 
 try:
-    model, model_country, meta, df, df_country = load_models_and_data()
-    countries = ['Total'] + sorted(df_country["country"].unique().tolist())
+    model, model_country, registry, meta, df, country_index = load_models_and_data()
+    countries = ['Total'] + list(country_index.countries)
 except Exception as e:
     st.error(f"Error loading models: {e}")
     st.stop()
@@ -76,66 +79,33 @@ if st.sidebar.button(" Generate Forecast", type="primary"):
         try:
             if selected_country == 'Total':
                 # Total forecast
-                history = df["arrivals"].tolist()
-                results = []
-                
-                y, m = start_year, start_month
-                for step in range(horizon):
-                    lag_1 = history[-1]
-                    lag_12 = history[-12] if len(history) >= 12 else lag_1
-                    rolling_mean_3 = sum(history[-3:]) / min(3, len(history))
-                    
-                    X_input = build_features(y, m, {
-                        "lag_1": lag_1,
-                        "lag_12": lag_12,
-                        "rolling_mean_3": rolling_mean_3
-                    })
-                    
-                    pred = float(model.predict(X_input[meta["feature_cols"]])[0])
-                    results.append({
-                        "year": y,
-                        "month": m,
-                        "predicted_arrivals": round(pred, 2)
-                    })
-                    
-                    history.append(pred)
-                    y, m = add_month(y, m)
+                coef, intercept = linear_coefficients(model, meta["feature_cols"])
+                years, months, preds = recursive_forecast(
+                    df["arrivals"].to_numpy(dtype=float), coef, intercept,
+                    start_year, start_month, horizon, meta["feature_cols"]
+                )
             
             else:
                 # Country-specific forecast
-                country_df = df_country[df_country["country"] == selected_country.upper()]
-                if country_df.empty:
+                history = country_index.get(selected_country.upper())
+                if history is None:
                     st.error(f"No data found for {selected_country}")
                     st.stop()
                 
-                history = country_df["arrivals"].tolist()
-                results = []
-                
-                y, m = start_year, start_month
-                for _ in range(horizon):
-                    lag_1 = history[-1]
-                    lag_12 = history[-12] if len(history) >= 12 else lag_1
-                    rolling_mean_3 = sum(history[-3:]) / min(3, len(history))
-                    
-                    month_sin = np.sin(2 * np.pi * m / 12)
-                    month_cos = np.cos(2 * np.pi * m / 12)
-                    
-                    X_input = pd.DataFrame([{
-                        "year": y, "month": m,
-                        "month_sin": month_sin, "month_cos": month_cos,
-                        "lag_1": lag_1, "lag_12": lag_12,
-                        "rolling_mean_3": rolling_mean_3
-                    }])
-                    
-                    pred = float(model_country.predict(X_input)[0])
-                    results.append({
-                        "year": y,
-                        "month": m,
-                        "predicted_arrivals": round(pred, 2)
-                    })
-                    
-                    history.append(pred)
-                    y, m = add_month(y, m)
+                # Per-country model when one was trained, else the global one
+                row = registry.row(selected_country.upper()) if registry is not None else None
+                if row is not None:
+                    coef, intercept = registry.coef[row], float(registry.intercept[row])
+                    feature_cols = registry.feature_cols
+                else:
+                    coef, intercept = linear_coefficients(model_country, FEATURE_COLS)
+                    feature_cols = FEATURE_COLS
+                years, months, preds = recursive_forecast(
+                    history, coef, intercept,
+                    start_year, start_month, horizon, feature_cols
+                )
+            
+            results = forecast_records(years, months, preds)
             
             # Store results in session state
             st.session_state.forecast_results = results
@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# The modules are imported as src.*, like uvicorn does
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def repo_root():
+    # Artifact and data paths are relative to the repository root
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    yield ROOT
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def api(repo_root):
+    """Test client of the API with artifacts loaded up front and no reload watcher."""
+    os.environ.setdefault("ARTIFACT_LOAD_MODE", "eager")
+    os.environ.setdefault("ARTIFACT_RELOAD_INTERVAL", "0")
+    from fastapi.testclient import TestClient
+    from src.app import app
+
+    with TestClient(app) as client:
+        yield client
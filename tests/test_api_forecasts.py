@@ -0,0 +1,62 @@
+"""API forecasts against the original loop, and batch against single-country requests."""
+import json
+
+import pytest
+
+from src.forecasting import FEATURE_COLS
+
+from test_forecasting import baseline_forecast
+
+
+def test_total_forecast_matches_baseline(api):
+    pytest.importorskip("sklearn")
+    import joblib
+    import pandas as pd
+
+    model = joblib.load("outputs/model.pkl")
+    feature_cols = json.loads(open("outputs/model_meta.json").read())["feature_cols"]
+    history = pd.read_csv("data/total_features.csv").sort_values("date")["arrivals"].tolist()
+
+    response = api.post("/api/forecast", json={"start_year": 2026, "start_month": 2, "horizon": 24}).json()
+
+    expected = baseline_forecast(history, model, feature_cols, 2026, 2, 24)
+    assert [row["predicted_arrivals"] for row in response["forecast"]] == [round(float(p), 2) for p in expected]
+
+
+@pytest.mark.parametrize("horizon", [1, 18])
+def test_batch_matches_single_country_requests(api, horizon):
+    body = {"start_year": 2026, "start_month": 1, "horizon": horizon}
+
+    batch = api.post("/api/forecast_batch", json={**body, "countries": "all"}).json()
+
+    countries = api.get("/api/countries").json()["countries"]
+    assert [f["country"] for f in batch["forecasts"]] == list(countries)
+    for item in batch["forecasts"]:
+        single = api.post("/api/forecast_country", json={**body, "country": item["country"]}).json()
+        assert item["forecast"] == single["forecast"]
+        assert item["model"] == single["model"]
+
+
+def test_batch_reports_unknown_countries(api):
+    body = {"start_year": 2026, "start_month": 1, "horizon": 3, "countries": ["india", "ATLANTIS"]}
+    response = api.post("/api/forecast_batch", json=body).json()
+    assert [f["country"] for f in response["forecasts"]] == ["INDIA"]
+    assert response["not_found"] == ["ATLANTIS"]
+
+
+def test_country_forecast_uses_the_country_model(api):
+    from src.app import artifacts
+    from src.forecasting import recursive_forecast
+
+    state = artifacts.current
+    coef, intercept, _ = state.country_model("INDIA")
+    expected = recursive_forecast(state.country_index.get("INDIA"), coef, intercept, 2026, 1, 12, FEATURE_COLS)[2]
+
+    response = api.post("/api/forecast_country", json={"country": "India", "start_year": 2026, "start_month": 1, "horizon": 12})
+    assert [r["predicted_arrivals"] for r in response.json()["forecast"]] == [round(p, 2) for p in expected.tolist()]
+
+
+def test_batch_rejects_an_empty_country_list(api):
+    body = {"start_year": 2026, "start_month": 1, "horizon": 3, "countries": []}
+    assert api.post("/api/forecast_batch", json=body).status_code == 422
+    assert api.post("/api/forecast_batch/stream", json=body).status_code == 422
@@ -0,0 +1,157 @@
+"""Artifact store: hot reload and generation swaps."""
+import json
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src import artifacts as artifacts_module
+from src.artifacts import ArtifactState, ArtifactStore
+
+
+class FakeLoader:
+    """States with the versions set on it; raises `error` if set."""
+
+    def __init__(self):
+        self.version, self.error, self.calls = "v1", None, 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(model_version=self.version, country_model_version="c1")
+
+
+@pytest.fixture
+def fingerprint(monkeypatch):
+    value = ["f1"]
+    monkeypatch.setattr(artifacts_module, "artifact_fingerprint", lambda: value[0])
+    return value
+
+
+def test_reload_swaps_only_on_new_content(fingerprint):
+    loader = FakeLoader()
+    store = ArtifactStore(loader)
+
+    assert store.reload() and store.generation == 1 and store.ready
+    first = store.current
+
+    # Same files: not even loaded
+    assert not store.reload()
+    assert loader.calls == 1
+
+    # Touched but same content: loaded, but the warm state is kept
+    fingerprint[0] = "f2"
+    assert not store.reload()
+    assert store.current is first and store.generation == 1
+
+    fingerprint[0] = "f3"
+    loader.version = "v2"
+    assert store.reload()
+    assert store.current.model_version == "v2" and store.generation == 2
+    # A request holding the old state keeps a complete one
+    assert first.model_version == "v1"
+
+    assert store.reload(force=True) and store.generation == 3
+
+
+def test_failed_reload_keeps_serving_the_previous_generation(fingerprint):
+    loader = FakeLoader()
+    store = ArtifactStore(loader)
+    store.reload()
+    previous = store.current
+
+    fingerprint[0] = "f2"
+    loader.error = ValueError("half-written model.json")
+    with pytest.raises(ValueError):
+        store.reload()
+
+    assert store.current is previous
+    assert store.last_error == "ValueError: half-written model.json"
+
+    loader.error, loader.version = None, "v2"
+    assert store.reload()
+    assert store.last_error is None
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch, repo_root):
+    for path in ["outputs/model.json", "outputs/model.pkl", "outputs/model_meta.json",
+                 "outputs/model_country.json", "outputs/model_country.pkl",
+                 "data/total_features.csv", "data/country_features.csv"]:
+        source = repo_root / path
+        if source.exists():
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, tmp_path / path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_retrained_model_on_disk_is_picked_up(workdir):
+    store = ArtifactStore()
+    store.reload()
+    before = store.current
+    _, _, old = before.forecast_total(2026, 1, 3)
+
+    model = json.loads((workdir / "outputs/model.json").read_text())
+    model["intercept"] += 1000.0
+    (workdir / "outputs/model.json").write_text(json.dumps(model))
+
+    assert store.reload()
+    after = store.current
+    assert after.model_version != before.model_version
+    assert after.country_model_version == before.country_model_version
+    _, _, new = after.forecast_total(2026, 1, 3)
+    np.testing.assert_allclose(new[0] - old[0], 1000.0)
+    assert isinstance(after, ArtifactState)
+
+
+def test_admin_reload_endpoint(api, monkeypatch):
+    from src import app as app_module
+
+    generation = app_module.artifacts.generation
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "secret")
+
+    assert api.post("/api/admin/reload").status_code == 403
+    response = api.post("/api/admin/reload?force=true", headers={"X-Admin-Token": "secret"}).json()
+    assert response["reloaded"] and response["generation"] == generation + 1
+
+
+def test_background_load_and_readiness(api, monkeypatch):
+    import threading
+    import time
+
+    from src import app as app_module
+
+    release = threading.Event()
+    loaded = app_module.artifacts.current
+    loader_calls = []
+
+    def slow_loader():
+        loader_calls.append(1)
+        release.wait(5)
+        return loaded
+
+    store = ArtifactStore(slow_loader)
+    monkeypatch.setattr(app_module, "artifacts", store)
+    monkeypatch.setattr(app_module, "ARTIFACT_WAIT_TIMEOUT", 0.05)
+    body = {"start_year": 2026, "start_month": 1, "horizon": 3}
+
+    # Live but not ready; a request waits briefly, then gets 503 and leaves the load running
+    health = api.get("/api/health")
+    assert health.status_code == 200 and health.json()["ready"] is False
+    assert api.get("/api/health/ready").status_code == 503
+    response = api.post("/api/forecast", json=body)
+    assert response.status_code == 503 and "loading" in response.json()["detail"]
+    # Later callers find the load running and time out too, rather than queueing behind it
+    started = time.perf_counter()
+    assert api.post("/api/forecast", json=body).status_code == 503
+    assert time.perf_counter() - started < 2
+
+    release.set()
+    assert store.wait(5) is loaded
+    assert loader_calls == [1]
+    ready = api.get("/api/health/ready")
+    assert ready.status_code == 200 and ready.json()["ready"] is True
+    assert api.post("/api/forecast", json=body).status_code == 200
@@ -0,0 +1,112 @@
+"""Backtest folds: expanding-window fits, chunking, registry groups and the gap rule."""
+import json
+
+import numpy as np
+import pytest
+
+from src.backtest import (
+    LAG_WINDOW, IncrementalLinear, backtest, live_histories, prepare, run_origins, served_total_model
+)
+from src.columnar import read_frame
+from src.forecasting import FEATURE_COLS, recursive_forecast_batch
+
+
+def least_squares(X, y):
+    A = np.column_stack([np.ones(len(X)), X])
+    beta = np.linalg.lstsq(A, y, rcond=None)[0]
+    return beta[1:], beta[0]
+
+
+def scored(data, origin, horizon):
+    """(abs error, count) per series and step for a single origin."""
+    abs_sum, _, count, _ = run_origins({"data": data, "origins": [origin], "horizon": horizon})
+    return abs_sum, count
+
+
+def test_incremental_fit_matches_least_squares():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 4)) * [1, 10, 100, 1000]
+    y = X @ [2.0, -1.0, 0.5, 0.01] + 3.0 + rng.normal(scale=0.1, size=60)
+
+    model = IncrementalLinear(X.mean(axis=0), X.std(axis=0))
+    for part in np.array_split(np.arange(60), 4):
+        model.add(X[part], y[part])
+    coef, intercept = model.coefficients()
+
+    expected_coef, expected_intercept = least_squares(X, y)
+    np.testing.assert_allclose(coef, expected_coef, rtol=1e-8)
+    assert intercept == pytest.approx(expected_intercept, rel=1e-8)
+
+
+def test_live_histories_skip_gaps_in_the_lag_window():
+    actual = np.arange(1.0, 61.0).reshape(3, 20)
+    actual[1, 15] = np.nan   # inside the 12 months before column 20
+    actual[2, 3] = np.nan    # earlier gap: history restarts after it
+
+    live, histories = live_histories(actual, 20)
+
+    assert live.tolist() == [0, 2]
+    np.testing.assert_array_equal(histories[0], actual[0, :20])
+    np.testing.assert_array_equal(histories[1], actual[2, 4:20])
+    assert live_histories(actual, LAG_WINDOW - 1)[0].size == 0
+
+
+def test_fold_fits_only_on_rows_before_its_origin():
+    data = prepare(read_frame("total_features"))
+    origin = data["first_month"] + 30
+    horizon = 6
+
+    past = data["train_month"] < origin
+    coef, intercept = least_squares(data["X"][past], data["y"][past])
+    col = origin - data["first_month"]
+    year, month = divmod(origin, 12)
+    _, _, preds = recursive_forecast_batch([data["actual"][0, :col]], coef, intercept, year, month + 1, horizon)
+    expected = np.abs(preds[0] - data["actual"][0, col:col + horizon])
+
+    abs_sum, count = scored(data, origin, horizon)
+    assert count[0].tolist() == [1] * horizon
+    np.testing.assert_allclose(abs_sum[0], expected, rtol=1e-6)
+
+
+def test_chunked_origins_match_a_single_run():
+    data = prepare(read_frame("total_features"))
+    serial = backtest(data, horizon=6, min_train=24, workers=1)
+    chunked = backtest(data, horizon=6, min_train=24, workers=3)
+
+    for a, b in zip(serial[:3], chunked[:3]):
+        np.testing.assert_allclose(a, b, rtol=1e-6)
+    np.testing.assert_array_equal(serial[3], chunked[3])
+
+
+def test_registry_group_gets_its_own_fit():
+    df = read_frame("country_features")
+    df = df[df["country"].isin(["GERMANY", "GHANA"])]
+    data = prepare(df, by="country", groups={"GERMANY": 0})
+    origin = data["first_month"] + 36
+    horizon = 3
+
+    col = origin - data["first_month"]
+    year, month = divmod(origin, 12)
+    past = df[(df["date"].dt.year * 12 + df["date"].dt.month - 1) < origin]
+    expected = []
+    for name, rows in (("GERMANY", past[past["country"] == "GERMANY"]), ("GHANA", past)):
+        coef, intercept = least_squares(rows[FEATURE_COLS].to_numpy(dtype=np.float64), rows["arrivals"].to_numpy())
+        i = data["series"].index(name)
+        _, _, preds = recursive_forecast_batch([data["actual"][i, :col]], coef, intercept, year, month + 1, horizon)
+        expected.append((i, np.abs(preds[0] - data["actual"][i, col:col + horizon])))
+
+    abs_sum, _ = scored(data, origin, horizon)
+    for i, errors in expected:
+        np.testing.assert_allclose(abs_sum[i], errors, rtol=1e-6)
+
+
+def test_served_total_model_follows_the_promoted_meta(tmp_path):
+    assert served_total_model(tmp_path / "missing.json") == (FEATURE_COLS, None)
+
+    meta = tmp_path / "model_meta.json"
+    meta.write_text(json.dumps({
+        "feature_cols": ["year", "month", "lag_1"], "model_type": "ridge", "model_params": {"alpha": 1.0}
+    }))
+    feature_cols, spec = served_total_model(meta)
+    assert feature_cols == ["year", "month", "lag_1"]
+    assert spec == {"name": "ridge", "type": "ridge", "params": {"alpha": 1.0}}
@@ -0,0 +1,80 @@
+"""Forecast cache: prefix reuse, LRU/TTL eviction, and cached API responses."""
+import numpy as np
+
+from src.cache import ForecastCache
+
+
+def path(horizon):
+    return (np.arange(horizon, dtype=np.float64), np.arange(horizon) * 2.0)
+
+
+def test_shorter_horizon_is_served_from_the_prefix():
+    cache = ForecastCache()
+    cache.put("k", 60, path(60))
+
+    value = cache.get("k", 12)
+
+    assert all(np.array_equal(v, full[:12]) for v, full in zip(value, path(60)))
+    assert cache.prefix_hits == 1
+    assert cache.get("k", 61) is None
+
+
+def test_get_or_compute_computes_the_longer_path_once():
+    cache = ForecastCache()
+    calls = []
+
+    def compute(n):
+        calls.append(n)
+        return path(n)
+
+    first = cache.get_or_compute("k", 5, compute, compute_horizon=60)
+    second = cache.get_or_compute("k", 30, compute, compute_horizon=60)
+
+    assert calls == [60]
+    assert len(first[0]) == 5 and len(second[0]) == 30
+
+
+def test_cached_values_are_read_only():
+    cache = ForecastCache()
+    cache.put("k", 3, path(3))
+    assert not cache.get("k", 3)[0].flags.writeable
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ForecastCache(max_entries=2)
+    cache.put("a", 1, path(1))
+    cache.put("b", 1, path(1))
+    cache.get("a", 1)
+    cache.put("c", 1, path(1))
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+    assert cache.evictions == 1
+
+
+def test_expired_entries_are_misses():
+    cache = ForecastCache(ttl=0)
+    cache.put("k", 1, path(1))
+    assert cache.get("k", 1) is None
+    assert cache.expirations == 1
+
+
+def test_shorter_put_does_not_replace_a_longer_path():
+    cache = ForecastCache()
+    cache.put("k", 60, path(60))
+    cache.put("k", 12, path(12))
+    assert cache.get("k", 60) is not None
+
+
+def test_api_prefix_hits_match_fresh_responses(api):
+    from src.app import forecast_cache
+
+    body = {"start_year": 2026, "start_month": 4, "country": "INDIA"}
+    forecast_cache.clear()
+    fresh = [api.post("/api/forecast_country", json={**body, "horizon": h}).json() for h in (7, 60)]
+    forecast_cache.clear()
+    api.post("/api/forecast_country", json={**body, "horizon": 60})
+    cached = api.post("/api/forecast_country", json={**body, "horizon": 7}).json()
+
+    assert cached == fresh[0]
+    assert fresh[1]["forecast"][:7] == fresh[0]["forecast"]
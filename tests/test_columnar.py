@@ -0,0 +1,57 @@
+"""Columnar store: freshness against the CSV export by content, not mtime."""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src import columnar
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    csv_path = tmp_path / "t.csv"
+    monkeypatch.setattr(columnar, "STORE_DIR", tmp_path / "store")
+    monkeypatch.setitem(columnar.TABLES, "t", (csv_path, ["date"]))
+    df = pd.DataFrame({"date": ["2025-01-01", "2025-02-01"], "arrivals": [1.5, 2.5]})
+    df.to_csv(csv_path, index=False)
+    columnar.write_table(df, "t")
+    return csv_path
+
+
+def test_table_written_from_the_csv_is_fresh(table):
+    assert columnar.has_table("t")
+    pd.testing.assert_frame_equal(
+        columnar.read_frame("t")[["arrivals"]].astype("float64"), pd.read_csv(table)[["arrivals"]]
+    )
+
+
+def test_mtime_order_does_not_matter(table):
+    # As after a checkout: the CSV ends up newer than the store
+    schema = columnar.schema_path("t")
+    os.utime(schema, ns=(1, 1))
+    assert columnar.has_table("t")
+
+
+def test_changed_csv_makes_the_table_stale_even_if_older(table):
+    schema = columnar.schema_path("t")
+    stat = schema.stat()
+    table.write_text("date,arrivals\n2025-01-01,9.0\n2025-02-01,2.5\n")
+    os.utime(table, ns=(stat.st_mtime_ns - 10**9, stat.st_mtime_ns - 10**9))
+
+    assert not columnar.has_table("t")
+    assert columnar.read_frame("t")["arrivals"].tolist() == [9.0, 2.5]
+
+
+def test_table_without_a_recorded_source_is_not_trusted(table):
+    schema = columnar.read_schema("t")
+    del schema["source"]
+    columnar.schema_path("t").write_text(json.dumps(schema))
+    assert not columnar.has_table("t")
+
+
+def test_csv_fallback_parses_dates(table):
+    columnar.schema_path("t").unlink()
+    df = columnar.read_frame("t")
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert df["date"].dt.month.tolist() == [1, 2]
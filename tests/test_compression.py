@@ -0,0 +1,69 @@
+"""Response compression and the columnar response layout."""
+import gzip
+
+import pytest
+
+from src.compression import available_encodings, compress, compressible, negotiate
+
+
+BATCH = {"countries": "all", "start_year": 2026, "start_month": 1, "horizon": 24}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, identity", "gzip"),
+    ("gzip;q=0", None),
+    ("deflate", None),
+    ("", None),
+    ("*", available_encodings()[0]),
+    ("br;q=0.9, gzip;q=0.1", available_encodings()[0]),
+    ("GZIP ; q=1.0", "gzip"),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_negotiate_among_a_files_encodings():
+    assert negotiate("br, gzip", ("gzip",)) == "gzip"
+    assert negotiate("br", ("gzip",)) is None
+
+
+def test_gzip_output_is_deterministic():
+    body = b'{"forecast": []}' * 100
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip", best=True)) == body
+
+
+def test_compressible_types():
+    assert compressible("application/json")
+    assert compressible("text/html; charset=utf-8")
+    assert not compressible("image/png")
+    assert not compressible("application/x-ndjson")
+
+
+def test_large_json_is_compressed_with_vary(api):
+    plain = api.post("/api/forecast_batch", json=BATCH, headers={"Accept-Encoding": "identity"})
+    zipped = api.post("/api/forecast_batch", json=BATCH, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["vary"]
+    assert int(zipped.headers["content-length"]) < len(plain.content)
+    # The test client decodes the body
+    assert zipped.json() == plain.json()
+
+
+def test_small_and_streamed_responses_are_not_compressed(api):
+    assert "content-encoding" not in api.get("/api", headers={"Accept-Encoding": "gzip"}).headers
+    stream = api.post("/api/forecast_batch/stream", json=BATCH, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+
+
+def test_columns_layout_holds_the_same_values(api):
+    rows = api.post("/api/forecast_batch", json=BATCH).json()
+    columns = api.post("/api/forecast_batch?layout=columns", json=BATCH).json()
+
+    assert [f["country"] for f in columns["forecasts"]] == [f["country"] for f in rows["forecasts"]]
+    for by_row, by_column in zip(rows["forecasts"], columns["forecasts"]):
+        fields = by_column["forecast"]
+        assert [dict(zip(fields, values)) for values in zip(*fields.values())] == by_row["forecast"]
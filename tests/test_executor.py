@@ -0,0 +1,110 @@
+"""Forecast executor: single-flight coalescing and load shedding."""
+import threading
+import time
+
+import pytest
+
+from src.executor import ForecastExecutor, Overloaded
+from src.metrics import RequestTimer, _current, stage
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def executor():
+    executor = ForecastExecutor(workers=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_concurrent_calls_with_one_key_share_one_run(executor):
+    release, calls, results = threading.Event(), [], []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "path"
+
+    threads = [threading.Thread(target=lambda: results.append(executor.run("k", compute, 5))) for _ in range(3)]
+    threads[0].start()
+    wait_for(lambda: executor.stats()["running"] == 1)
+    for t in threads[1:]:
+        t.start()
+    wait_for(lambda: executor.coalesced == 2)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == ["path"] * 3
+    assert executor.stats()["completed"] == 1
+
+
+def test_full_queue_is_rejected(executor):
+    release = threading.Event()
+    blocked = lambda: release.wait(5)
+
+    running = threading.Thread(target=executor.run, args=("a", blocked, 5))
+    running.start()
+    wait_for(lambda: executor.stats()["running"] == 1)
+    queued = threading.Thread(target=executor.run, args=("b", blocked, 5))
+    queued.start()
+    wait_for(lambda: executor.stats()["queued"] == 1)
+
+    with pytest.raises(Overloaded):
+        executor.run("c", blocked, 5)
+    # A key already in flight is joined, not rejected
+    joined = threading.Thread(target=executor.run, args=("b", blocked, 5))
+    joined.start()
+
+    release.set()
+    for t in (running, queued, joined):
+        t.join(5)
+    assert executor.rejected == 1
+    assert executor.coalesced == 1
+
+
+def test_errors_reach_every_caller_and_clear_the_key(executor):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        executor.run("k", fail, 5)
+    assert executor.run("k", lambda: 1, 5) == 1
+    assert executor.failed == 1
+
+
+def test_stages_inside_pooled_work_count_for_the_caller(executor):
+    def compute():
+        with stage("bands"):
+            return 1
+
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try:
+        executor.run("k", compute, 5)
+    finally:
+        _current.reset(token)
+
+    assert [name for name, _ in timer.stages] == ["bands"]
+
+
+def test_api_answers_503_when_overloaded(api, monkeypatch):
+    from src import app as app_module
+
+    def overloaded(*args, **kwargs):
+        raise Overloaded("64 forecasts already queued")
+
+    app_module.forecast_cache.clear()
+    monkeypatch.setattr(app_module.forecast_executor, "run", overloaded)
+
+    response = api.post("/api/forecast", json={"start_year": 2026, "start_month": 1, "horizon": 3})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,91 @@
+"""Forecast attributions: contributions plus the base value give the prediction."""
+import sys
+
+import numpy as np
+import pytest
+
+from src.explain import group_contributions, linear_contributions, tree_contributions
+from src.forecasting import FEATURE_COLS, recursive_forecast, recursive_forecast_batch
+from src.model_format import LinearModel
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LinearModel.load("outputs/model.json")
+
+
+@pytest.fixture(scope="module")
+def features_total():
+    from src.columnar import read_frame
+    return read_frame("total_features")[FEATURE_COLS].to_numpy(dtype=np.float64)
+
+
+def test_linear_contributions_add_up_to_the_prediction(model, features_total):
+    history = features_total[:, FEATURE_COLS.index("lag_1")]
+    _, _, preds, features = recursive_forecast(history, model.coef_, model.intercept_, 2026, 1, 36,
+                                               return_features=True)
+
+    contributions, base = linear_contributions(features, model.coef_, model.intercept_, features_total)
+
+    assert contributions.shape == features.shape
+    np.testing.assert_allclose(contributions.sum(axis=0) + base, preds, rtol=1e-9)
+    # Base value is the mean prediction over the training rows
+    np.testing.assert_allclose(base, model.predict(features_total).mean(), rtol=1e-9)
+
+
+def test_per_series_coefficients(model, features_total):
+    rng = np.random.default_rng(0)
+    coef = model.coef_ * rng.uniform(0.8, 1.2, size=(3, len(FEATURE_COLS)))
+    intercept = np.array([100.0, -50.0, 0.0])
+    histories = [features_total[:, 4], features_total[:20, 4] * 0.5, features_total[-13:, 4]]
+    _, _, preds, features = recursive_forecast_batch(histories, coef, intercept, 2026, 1, 12, return_features=True)
+
+    contributions, base = linear_contributions(features, coef, intercept, features_total)
+
+    np.testing.assert_allclose(contributions.sum(axis=-2) + base[:, None], preds, rtol=1e-9)
+
+
+def test_groups():
+    cols = ["year", "month", "month_sin", "month_cos", "lag_1", "holiday"]
+    contributions = np.arange(len(cols) * 2, dtype=np.float64).reshape(len(cols), 2)
+
+    groups = group_contributions(contributions, cols)
+
+    assert list(groups) == ["year", "seasonality", "lag_1", "holiday"]
+    np.testing.assert_array_equal(groups["seasonality"], contributions[1:4].sum(axis=0))
+    np.testing.assert_array_equal(sum(groups.values()), contributions.sum(axis=0))
+
+
+def test_tree_contributions_add_up_to_the_prediction(features_total):
+    pytest.importorskip("shap")
+    tree = pytest.importorskip("sklearn.tree")
+    y = features_total @ np.linspace(0.1, 1.0, len(FEATURE_COLS))
+    model = tree.DecisionTreeRegressor(max_depth=4, random_state=0).fit(features_total, y)
+    features = features_total[-12:].T
+
+    contributions, base = tree_contributions(model, features, features_total, "test-tree")
+
+    np.testing.assert_allclose(contributions.sum(axis=0) + base, model.predict(features.T), rtol=1e-6)
+
+
+def test_non_linear_model_without_shap_names_the_package(monkeypatch, features_total):
+    monkeypatch.setitem(sys.modules, "shap", None)
+    with pytest.raises(ImportError, match="shap"):
+        tree_contributions(object(), features_total[:3].T, features_total, "no-shap")
+
+
+@pytest.mark.parametrize("country", [None, "INDIA"])
+def test_api_explanations_match_the_forecast(api, country):
+    body = {"start_year": 2026, "start_month": 1, "horizon": 12}
+    if country:
+        body["country"] = country
+    explained = api.post("/api/explain", json=body).json()
+    forecast = api.post("/api/forecast_country" if country else "/api/forecast", json=body).json()
+
+    assert explained["method"] == "linear"
+    assert [r["predicted_arrivals"] for r in explained["explanations"]] == \
+        [r["predicted_arrivals"] for r in forecast["forecast"]]
+    for row in explained["explanations"]:
+        total = explained["base_value"] + sum(row["contributions"].values())
+        # Every term is rounded to cents
+        assert abs(total - row["predicted_arrivals"]) <= 0.01 * (len(row["contributions"]) + 2)
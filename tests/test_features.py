@@ -0,0 +1,77 @@
+"""Vectorized feature pipeline against the committed tables, and incremental against full."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import (
+    CLEANED_COLUMNS, COUNTRY_COLUMNS, TOTAL_COLUMNS, add_features, clean_processed, country_features,
+    extend_features, total_features, total_history
+)
+
+
+@pytest.fixture(scope="module")
+def cleaned():
+    processed = pd.read_csv("data/processed.csv", parse_dates=["date"])
+    return clean_processed(processed)
+
+
+def committed(path):
+    return pd.read_csv(path, parse_dates=["date"])
+
+
+def assert_table_equal(actual, expected):
+    actual, expected = actual.reset_index(drop=True), expected.reset_index(drop=True)
+    assert list(actual.columns) == list(expected.columns)
+    for col in expected.columns:
+        if expected[col].dtype.kind == "f":
+            # month_sin/cos and the rolling mean may differ from the committed CSV in the last bit
+            assert np.allclose(actual[col], expected[col], rtol=1e-12, atol=1e-9), col
+        else:
+            assert np.array_equal(actual[col].astype(str), expected[col].astype(str)), col
+
+
+def test_cleaned_matches_committed(cleaned):
+    expected = committed("data/cleaned.csv").sort_values(["country", "date"], kind="stable")
+    assert_table_equal(cleaned.sort_values(["country", "date"], kind="stable")[CLEANED_COLUMNS], expected)
+
+
+def test_total_features_match_committed(cleaned):
+    assert_table_equal(total_features(cleaned), committed("data/total_features.csv")[TOTAL_COLUMNS])
+
+
+def test_country_features_match_committed(cleaned):
+    expected = committed("data/country_features.csv")[COUNTRY_COLUMNS]
+    assert_table_equal(country_features(cleaned), expected.sort_values(["country", "date"], kind="stable"))
+
+
+@pytest.mark.parametrize("by", [None, "country"])
+def test_incremental_rows_equal_a_full_build(cleaned, by):
+    history = total_history(cleaned) if by is None else cleaned.sort_values(["country", "date"])
+    full = add_features(history, by=by)
+    cutoff = history["date"].sort_values().unique()[-3]
+    existing = full[full["date"] <= cutoff]
+
+    new_rows = extend_features(existing, history, by=by)
+
+    assert new_rows is not None
+    merged = pd.concat([existing, new_rows]).sort_values([by, "date"] if by else ["date"], kind="stable")
+    pd.testing.assert_frame_equal(merged.reset_index(drop=True), full.reset_index(drop=True))
+
+
+def test_revised_history_forces_a_rebuild(cleaned):
+    history = total_history(cleaned)
+    existing = add_features(history)
+    revised = history.copy()
+    revised.loc[revised.index[20], "arrivals"] += 1
+
+    assert extend_features(existing, revised) is None
+
+
+def test_store_keeps_integer_columns_as_int64(tmp_path, monkeypatch):
+    import src.columnar as columnar
+
+    monkeypatch.setattr(columnar, "STORE_DIR", tmp_path)
+    columnar.write_table(pd.DataFrame({"year": np.array([2024, 2025], dtype=np.int32), "x": [1.5, 2.0]}), "t")
+
+    dtypes = {c["name"]: c["dtype"] for c in columnar.read_schema("t")["columns"]}
+    assert dtypes == {"year": "int64", "x": "float32"}
@@ -0,0 +1,111 @@
+"""
+NumPy forecast engines against the original per-step DataFrame loop, run
+on the scikit-learn model as the API did before the NumPy engine.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import build_features
+from src.forecasting import (
+    FEATURE_COLS, recursive_forecast, recursive_forecast_batch, recursive_forecast_model
+)
+from src.model_format import LinearModel
+from src.utils_time import add_month
+
+
+def baseline_forecast(history, model, feature_cols, year, month, horizon):
+    """
+    The loop the API ran before the NumPy engine: build_features and the
+    fitted scikit-learn model's predict, one month at a time.
+    """
+    history = list(history)
+    preds = []
+    for _ in range(horizon):
+        lag_1 = history[-1]
+        lag_12 = history[-12] if len(history) >= 12 else lag_1
+        rolling_mean_3 = sum(history[-3:]) / min(3, len(history))
+        X = build_features(year, month, {"lag_1": lag_1, "lag_12": lag_12, "rolling_mean_3": rolling_mean_3})
+        pred = float(model.predict(X[feature_cols])[0])
+        preds.append(pred)
+        history.append(pred)
+        year, month = add_month(year, month)
+    return np.array(preds)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LinearModel.load("outputs/model.json")
+
+
+@pytest.fixture(scope="module")
+def sklearn_model():
+    """The pickled LinearRegression the compact model was exported from."""
+    pytest.importorskip("sklearn")
+    import joblib
+    return joblib.load("outputs/model.pkl")
+
+
+@pytest.fixture(scope="module")
+def history():
+    # As the original API read it: the CSV export, sorted by date
+    return pd.read_csv("data/total_features.csv").sort_values("date")["arrivals"].to_numpy(dtype=np.float64)
+
+
+@pytest.mark.parametrize("start", [(2026, 1), (2026, 7), (2025, 12)])
+@pytest.mark.parametrize("horizon", [1, 13, 60])
+def test_recursive_forecast_matches_baseline(model, sklearn_model, history, start, horizon):
+    expected = baseline_forecast(history, sklearn_model, FEATURE_COLS, *start, horizon)
+
+    years, months, preds = recursive_forecast(history, model.coef_, model.intercept_, *start, horizon)
+
+    assert np.array_equal(preds, expected)
+    assert (years[0], months[0]) == start
+    assert np.array_equal(recursive_forecast_model(history, model, *start, horizon)[2], expected)
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 11, 12, 40])
+def test_short_histories_match_baseline(model, sklearn_model, history, length):
+    expected = baseline_forecast(history[:length], sklearn_model, FEATURE_COLS, 2026, 3, 24)
+    assert np.array_equal(recursive_forecast(history[:length], model.coef_, model.intercept_, 2026, 3, 24)[2], expected)
+
+
+def test_batch_matches_single_series(model, sklearn_model, history):
+    histories = [history, history[:5], history[:12] * 0.5, history[-30:]]
+
+    _, _, batch = recursive_forecast_batch(histories, model.coef_, model.intercept_, 2026, 1, 60)
+
+    for h, row in zip(histories, batch):
+        assert np.array_equal(row, baseline_forecast(h, sklearn_model, FEATURE_COLS, 2026, 1, 60))
+
+
+def test_batch_with_one_model_per_series(model, history):
+    rng = np.random.default_rng(0)
+    coef = model.coef_ * rng.uniform(0.9, 1.1, size=(3, len(FEATURE_COLS)))
+    intercept = model.intercept_ * rng.uniform(0.9, 1.1, size=3)
+    histories = [history, history[:20], history[-15:]]
+
+    _, _, batch = recursive_forecast_batch(histories, coef, intercept, 2026, 1, 24)
+
+    for i, h in enumerate(histories):
+        expected = recursive_forecast(h, coef[i], intercept[i], 2026, 1, 24)[2]
+        assert np.array_equal(batch[i], expected)
+
+
+def test_feature_subset(history):
+    linear_model = pytest.importorskip("sklearn.linear_model")
+    cols = ["month_sin", "month_cos", "lag_1", "lag_12", "rolling_mean_3"]
+    df = pd.read_csv("data/total_features.csv")
+    fitted = linear_model.LinearRegression().fit(df[cols], df["arrivals"])
+    model = LinearModel(fitted.coef_, fitted.intercept_, cols)
+
+    expected = baseline_forecast(history, fitted, cols, 2026, 1, 24)
+
+    assert np.array_equal(recursive_forecast(history, model.coef_, model.intercept_, 2026, 1, 24, cols)[2], expected)
+    assert np.array_equal(recursive_forecast_batch([history], model.coef_, model.intercept_, 2026, 1, 24, cols)[2][0], expected)
+
+
+def test_shorter_horizon_is_a_prefix(model, history):
+    full = recursive_forecast(history, model.coef_, model.intercept_, 2026, 1, 60)[2]
+    for horizon in (1, 12, 59):
+        assert np.array_equal(recursive_forecast(history, model.coef_, model.intercept_, 2026, 1, horizon)[2], full[:horizon])
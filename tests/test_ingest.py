@@ -0,0 +1,80 @@
+"""Workbook ingestion against the committed processed.csv, and incremental against full builds."""
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.load_data import find_blocks, ingest, read_sheet
+
+RAW_PATH = "data/raw.xlsx"
+
+
+def build(raw_path, tmp_path, name, incremental=False):
+    output = tmp_path / f"{name}.csv"
+    manifest = tmp_path / f"{name}_manifest.json"
+    return ingest(str(raw_path), str(output), incremental=incremental, manifest_path=str(manifest)), output
+
+
+def test_full_build_matches_committed_processed_csv(tmp_path):
+    (_, stats), output = build(RAW_PATH, tmp_path, "processed")
+
+    assert stats["mode"] == "full"
+    pd.testing.assert_frame_equal(pd.read_csv(output), pd.read_csv("data/processed.csv"))
+
+
+def test_scratch_output_leaves_the_store_alone(tmp_path):
+    from src.columnar import schema_path
+
+    def stamp():
+        path = schema_path("processed")
+        return path.stat().st_mtime_ns if path.exists() else None
+
+    before = stamp()
+    build(RAW_PATH, tmp_path, "scratch")
+    assert stamp() == before
+
+
+def edit_one_month(raw_path, factor=2.0):
+    """Scale one month value of the last year block in place; returns that block's year."""
+    openpyxl = pytest.importorskip("openpyxl")
+
+    sheet = read_sheet(str(raw_path))
+    header, end, year = [b for b in find_blocks(sheet) if b[2] is not None][-1]
+    for row in range(header + 1, end):
+        for col, value in sheet.iloc[row].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0 and col > 0:
+                wb = openpyxl.load_workbook(raw_path)
+                cell = wb.worksheets[0].cell(row=row + 1, column=col + 1)
+                cell.value = cell.value * factor
+                wb.save(raw_path)
+                return year
+    raise AssertionError("no month value found to edit")
+
+
+def test_incremental_build_equals_full_build(tmp_path):
+    raw = tmp_path / "raw.xlsx"
+    shutil.copy(RAW_PATH, raw)
+    (_, first), output = build(raw, tmp_path, "incremental", incremental=True)
+    assert first["mode"] == "full"
+
+    (_, unchanged), _ = build(raw, tmp_path, "incremental", incremental=True)
+    assert unchanged["mode"] == "unchanged"
+
+    year = edit_one_month(raw)
+    (_, stats), output = build(raw, tmp_path, "incremental", incremental=True)
+    (_, _), full_output = build(raw, tmp_path, "full")
+
+    assert stats["mode"] == "incremental"
+    assert str(year) in stats["changed_years"]
+    incremental, full = pd.read_csv(output), pd.read_csv(full_output)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert not np.array_equal(full["arrivals"], pd.read_csv("data/processed.csv")["arrivals"])
+
+
+def test_externally_edited_output_forces_a_full_build(tmp_path):
+    (_, _), output = build(RAW_PATH, tmp_path, "processed", incremental=True)
+    output.write_text(output.read_text() + "\n")
+
+    (_, stats), _ = build(RAW_PATH, tmp_path, "processed", incremental=True)
+    assert stats["mode"] == "full"
@@ -0,0 +1,102 @@
+"""Residual-bootstrap prediction intervals."""
+import numpy as np
+import pytest
+
+from src.forecasting import recursive_forecast
+from src.intervals import forecast_bands, quantile_label, series_rng, simulate_paths
+from src.model_format import LinearModel
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LinearModel.load("outputs/model.json")
+
+
+@pytest.fixture(scope="module")
+def history():
+    from src.columnar import read_frame
+    return read_frame("total_features").sort_values("date")["arrivals"].to_numpy(dtype=np.float64)
+
+
+def test_without_residuals_every_path_is_the_point_forecast(model, history):
+    point = recursive_forecast(history, model.coef_, model.intercept_, 2026, 1, 24)[2]
+    paths = simulate_paths([history], model.coef_, model.intercept_, [np.zeros(5)], 2026, 1, 24, n_paths=50)
+
+    np.testing.assert_allclose(paths[:, 0, :], np.repeat(point[:, None], 50, axis=1), rtol=1e-12)
+
+
+def test_paths_match_a_loop_that_adds_the_same_draws(model, history):
+    residuals = np.array([-3000.0, -500.0, 0.0, 800.0, 4000.0])
+    paths = simulate_paths([history], model.coef_, model.intercept_, [residuals], 2026, 1, 12, n_paths=4,
+                           rngs=[series_rng(7, "TOTAL")])
+
+    # Same draws as _residual_noise: step-major uniforms indexing the pool
+    u = series_rng(7, "TOTAL").random((12, 4))
+    noise = residuals[(u * len(residuals)).astype(np.int64)]
+    for p in range(4):
+        h = list(history)
+        year, month = 2026, 1
+        for step in range(12):
+            pred = recursive_forecast(np.array(h), model.coef_, model.intercept_, year, month, 1)[2][0]
+            h.append(pred + noise[step, p])
+            month = month % 12 + 1
+            year += month == 1
+        np.testing.assert_allclose(paths[:, 0, p], h[len(history):], rtol=1e-10)
+
+
+def test_linear_and_predict_paths_agree(model, history):
+    residuals = [np.linspace(-2000, 2000, 9)]
+    args = ([history], model.coef_, model.intercept_, residuals, 2026, 1, 18, 30)
+    linear = simulate_paths(*args, rngs=[series_rng(1, 0)])
+    generic = simulate_paths(*args, rngs=[series_rng(1, 0)], predict=model.predict)
+    np.testing.assert_allclose(linear, generic, rtol=1e-10)
+
+
+def test_bands_are_ordered_reproducible_and_prefix_stable(model, history):
+    residuals = [np.random.default_rng(0).normal(0, 5000, 60)]
+    quantiles = (0.1, 0.5, 0.9)
+    bands = forecast_bands([history], model.coef_, model.intercept_, residuals, 2026, 1, 24, quantiles, 500, seed=3)[0]
+
+    assert (bands[0] <= bands[1]).all() and (bands[1] <= bands[2]).all()
+    # Uncertainty compounds through the lags
+    assert bands[2, -1] - bands[0, -1] > bands[2, 0] - bands[0, 0]
+
+    again = forecast_bands([history], model.coef_, model.intercept_, residuals, 2026, 1, 24, quantiles, 500, seed=3)[0]
+    shorter = forecast_bands([history], model.coef_, model.intercept_, residuals, 2026, 1, 6, quantiles, 500, seed=3)[0]
+    other = forecast_bands([history], model.coef_, model.intercept_, residuals, 2026, 1, 24, quantiles, 500, seed=4)[0]
+    assert np.array_equal(again, bands)
+    assert np.array_equal(shorter, bands[:, :6])
+    assert not np.array_equal(other, bands)
+
+
+def test_series_get_the_same_bands_alone_or_in_a_batch(model, history):
+    histories = [history, history[:30] * 0.3, history[-20:] * 2]
+    residuals = [np.linspace(-1000, 1000, 11), np.linspace(-50, 80, 7), np.linspace(-4000, 3000, 5)]
+    keys = ["TOTAL", "INDIA", "UK"]
+
+    batch = forecast_bands(histories, model.coef_, model.intercept_, residuals, 2026, 1, 12, seed=5, keys=keys)
+    for i in range(3):
+        alone = forecast_bands(histories[i:i + 1], model.coef_, model.intercept_, residuals[i:i + 1], 2026, 1, 12,
+                               seed=5, keys=keys[i:i + 1])
+        assert np.array_equal(alone[0], batch[i])
+
+
+def test_quantile_labels():
+    assert [quantile_label(q) for q in (0.1, 0.5, 0.975, 0.025)] == ["p10", "p50", "p97.5", "p2.5"]
+
+
+def test_api_intervals(api):
+    body = {"start_year": 2026, "start_month": 1, "horizon": 12, "intervals": True, "quantiles": [0.05, 0.95],
+            "n_paths": 200, "seed": 9}
+    total = api.post("/api/forecast", json=body).json()
+    assert total["intervals"]["quantiles"] == [0.05, 0.95]
+    for row in total["forecast"]:
+        assert row["p5"] <= row["p95"]
+
+    single = api.post("/api/forecast_country", json={**body, "country": "INDIA"}).json()
+    batch = api.post("/api/forecast_batch", json={**body, "countries": ["CHINA", "INDIA"]}).json()
+    assert batch["forecasts"][1]["forecast"] == single["forecast"]
+
+    plain = api.post("/api/forecast", json={**body, "intervals": False}).json()
+    assert [r["predicted_arrivals"] for r in plain["forecast"]] == [r["predicted_arrivals"] for r in total["forecast"]]
+    assert "p5" not in plain["forecast"][0]
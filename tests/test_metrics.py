@@ -0,0 +1,67 @@
+"""Prometheus text output and per-stage request timings."""
+import re
+
+from src.metrics import Registry
+
+
+def samples(text):
+    """{'name{labels}': value} for every sample line."""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/api/forecast")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert samples(text) == {
+        'latency_seconds_bucket{endpoint="/api/forecast",le="0.1"}': 2,
+        'latency_seconds_bucket{endpoint="/api/forecast",le="1.0"}': 3,
+        'latency_seconds_bucket{endpoint="/api/forecast",le="+Inf"}': 4,
+        'latency_seconds_sum{endpoint="/api/forecast"}': 3.65,
+        'latency_seconds_count{endpoint="/api/forecast"}': 4,
+    }
+
+
+def test_counter_labels_are_escaped_and_collectors_skip_missing_values():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("country",))
+    requests.inc('CÔTE "D\'IVOIRE"')
+    requests.inc('CÔTE "D\'IVOIRE"', amount=2)
+    registry.collector(lambda: [("ready", "gauge", "Ready.", [({}, 1), ({"step": "load"}, None)])])
+
+    text = registry.render()
+    assert 'requests_total{country="CÔTE \\"D\'IVOIRE\\""} 3' in text
+    assert "# TYPE ready gauge" in text
+    assert samples(text)["ready"] == 1
+    assert "step" not in text
+
+
+def test_api_records_request_and_stage_timings(api):
+    from src.app import forecast_cache
+
+    def scrape():
+        return samples(api.get("/api/metrics").text)
+
+    before = scrape()
+    forecast_cache.clear()
+    assert api.post("/api/forecast", json={"start_year": 2026, "start_month": 1, "horizon": 6}).status_code == 200
+    after = scrape()
+
+    key = 'api_request_duration_seconds_count{method="POST",endpoint="/api/forecast",status="200"}'
+    assert after[key] == before.get(key, 0) + 1
+    for stage in ("forecast", "records", "serialize", "framework"):
+        key = f'api_stage_duration_seconds_count{{endpoint="/api/forecast",stage="{stage}"}}'
+        assert after[key] == before.get(key, 0) + 1, stage
+
+    horizon = 'forecast_horizon_months_bucket{endpoint="/api/forecast",le="6"}'
+    assert after[horizon] == before.get(horizon, 0) + 1
+    assert after["artifact_ready"] == 1
+    assert after['forecast_cache_lookups_total{result="miss"}'] >= 1
+    assert re.search(r'^forecast_executor_tasks_total\{outcome="completed"\} \d+', api.get("/api/metrics").text, re.M)
@@ -0,0 +1,86 @@
+"""Compact model format: exact round trip and pickle/compact selection."""
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+from src.model_format import LinearModel, LinearRegistry, export_linear_model, export_linear_registry, load_model
+
+sklearn = pytest.importorskip("sklearn.linear_model")
+
+
+@pytest.fixture
+def fitted():
+    import pandas as pd
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(50, 3)) * [1, 100, 1e4], columns=["b", "a", "c"])
+    y = X @ [2.0, -0.5, 1e-3] + rng.normal(size=50)
+    return sklearn.LinearRegression().fit(X, y), X
+
+
+def test_round_trip_predicts_identically(tmp_path, fitted):
+    model, X = fitted
+    export_linear_model(model, list(X.columns), tmp_path / "model.json")
+
+    compact = LinearModel.load(tmp_path / "model.json")
+
+    assert np.array_equal(compact.predict(X), model.predict(X))
+
+
+def test_export_reorders_coefficients(tmp_path, fitted):
+    model, X = fitted
+    export_linear_model(model, ["a", "b", "c"], tmp_path / "model.json")
+
+    compact = LinearModel.load(tmp_path / "model.json")
+
+    assert compact.feature_cols == ["a", "b", "c"]
+    # Same products summed in another order: equal up to rounding
+    assert np.allclose(compact.predict(X), model.predict(X), rtol=1e-12, atol=0)
+
+
+def test_compact_file_is_used_when_it_matches_the_pickle(tmp_path, fitted):
+    model, _ = fitted
+    joblib.dump(model, tmp_path / "model.pkl")
+    export_linear_model(model, list(model.feature_names_in_), tmp_path / "model.json", source=tmp_path / "model.pkl")
+
+    loaded, source = load_model(tmp_path / "model.json", tmp_path / "model.pkl")
+
+    assert source == tmp_path / "model.json"
+    assert isinstance(loaded, LinearModel)
+
+
+def test_changed_pickle_wins_over_a_stale_compact_file(tmp_path, fitted, monkeypatch):
+    model, X = fitted
+    joblib.dump(model, tmp_path / "model.pkl")
+    export_linear_model(model, list(model.feature_names_in_), tmp_path / "model.json", source=tmp_path / "model.pkl")
+    # Retrained pickle; the compact file still records the old one's hash
+    joblib.dump(sklearn.LinearRegression().fit(X, X["a"]), tmp_path / "model.pkl")
+
+    assert load_model(tmp_path / "model.json", tmp_path / "model.pkl")[1] == tmp_path / "model.pkl"
+
+    # Without joblib the stale compact file is refused rather than served
+    monkeypatch.setitem(sys.modules, "joblib", None)
+    with pytest.raises(ImportError, match="different"):
+        load_model(tmp_path / "model.json", tmp_path / "model.pkl")
+
+
+def test_compact_file_without_pickle(tmp_path, fitted):
+    model, _ = fitted
+    export_linear_model(model, list(model.feature_names_in_), tmp_path / "model.json")
+    assert load_model(tmp_path / "model.json", tmp_path / "missing.pkl")[1] == tmp_path / "model.json"
+
+
+def test_registry_round_trip(tmp_path):
+    coef = np.arange(12, dtype=np.float64).reshape(3, 4) / 7
+    intercept = np.array([0.5, -1.0, 2.25])
+    index = {"A": 0, "B": 1, "C": 2, "D": 1}
+    export_linear_registry(coef, intercept, index, ["w", "x", "y", "z"], tmp_path / "registry.json", row_names=["A", "B", "C"])
+
+    registry = LinearRegistry.load(tmp_path / "registry.json")
+
+    assert np.array_equal(registry.coef, coef)
+    assert np.array_equal(registry.intercept, intercept)
+    assert registry.row("D") == 1 and registry.row("E") is None
+    assert len(registry) == 4
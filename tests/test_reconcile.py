@@ -0,0 +1,79 @@
+"""Reconciliation matrices and the /api/forecast_reconciled endpoint."""
+import numpy as np
+import pytest
+
+from src.reconcile import METHODS, combination_matrix, reconcile, summing_matrix
+
+
+@pytest.fixture
+def base():
+    rng = np.random.default_rng(0)
+    countries = rng.uniform(100, 1000, size=(5, 6))
+    total = countries.sum(axis=0) * 1.1
+    return np.vstack([total, countries])
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_reconciled_forecasts_are_coherent(base, method):
+    variances = np.arange(1.0, 7.0)
+    reconciled = reconcile(base, method, variances)
+
+    assert reconciled.shape == base.shape
+    np.testing.assert_allclose(reconciled[0], reconciled[1:].sum(axis=0))
+
+
+def test_mint_closed_form_matches_generalized_least_squares():
+    variances = np.array([4.0, 1.0, 2.0, 3.0])
+    S = summing_matrix(3)
+    W_inv = np.diag(1 / variances)
+    G = np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv)
+
+    np.testing.assert_allclose(combination_matrix(variances), G, atol=1e-12)
+
+
+def test_ols_is_mint_with_equal_variances(base):
+    np.testing.assert_array_equal(
+        reconcile(base, "ols"), reconcile(base, "mint", np.full(len(base), 7.0))
+    )
+
+
+def test_single_level_methods_keep_their_level(base):
+    np.testing.assert_array_equal(reconcile(base, "bottom_up")[1:], base[1:])
+    np.testing.assert_allclose(reconcile(base, "top_down")[0], base[0])
+
+
+def test_mint_moves_noisy_series_most(base):
+    variances = np.array([1.0, 100.0, 1.0, 1.0, 1.0, 1.0])
+    moved = np.abs(reconcile(base, "mint", variances) - base)
+
+    assert (moved[1] > moved[[0, 2, 3, 4, 5]]).all()
+
+
+def test_bad_arguments(base):
+    with pytest.raises(ValueError):
+        reconcile(base, "middle_out")
+    with pytest.raises(ValueError):
+        reconcile(base, "mint")
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_api_totals_are_the_sum_of_countries(api, method):
+    request = {"start_year": 2026, "start_month": 1, "horizon": 6, "method": method}
+    body = api.post("/api/forecast_reconciled", json=request).json()
+    columns = api.post("/api/forecast_reconciled?layout=columns", json=request).json()
+
+    total = np.array([r["predicted_arrivals"] for r in body["total"]])
+    countries = np.array([[r["predicted_arrivals"] for r in f["forecast"]] for f in body["forecasts"]])
+    # Rows are rounded to cents
+    np.testing.assert_allclose(total, countries.sum(axis=0), atol=0.01 * (len(countries) + 1))
+
+    assert columns["total"]["predicted_arrivals"] == [r["predicted_arrivals"] for r in body["total"]]
+    assert [f["country"] for f in columns["forecasts"]] == [f["country"] for f in body["forecasts"]]
+
+
+def test_api_base_total_is_the_total_forecast(api):
+    request = {"start_year": 2026, "start_month": 1, "horizon": 6}
+    reconciled = api.post("/api/forecast_reconciled", json={**request, "method": "bottom_up"}).json()
+    forecast = api.post("/api/forecast", json=request).json()
+
+    assert [r["base_arrivals"] for r in reconciled["total"]] == [r["predicted_arrivals"] for r in forecast["forecast"]]
@@ -0,0 +1,62 @@
+"""What-if scenarios: shock shapes, baselines against plain forecasts, and the size cap."""
+import numpy as np
+
+from src.scenarios import count_series, shock_effect
+from src.schemas import MAX_SCENARIO_SERIES, Scenario, Shock
+
+
+REQUEST = {"start_year": 2026, "start_month": 1, "horizon": 6}
+
+
+def test_shock_fades_over_recovery_months():
+    shock = Shock(countries=["INDIA"], start_year=2026, start_month=2, months=2, multiplier=0.5, add=10,
+                  recovery_months=3)
+    multiplier, offset = shock_effect(shock, 2026, 1, 8)
+
+    np.testing.assert_allclose(multiplier, [1, 0.5, 0.5, 0.625, 0.75, 0.875, 1, 1])
+    np.testing.assert_allclose(offset, [0, 10, 10, 7.5, 5, 2.5, 0, 0])
+
+
+def test_shock_outside_the_horizon_has_no_effect():
+    shock = Shock(countries=["INDIA"], start_year=2025, start_month=1, months=3)
+    multiplier, offset = shock_effect(shock, 2026, 1, 6)
+    assert (multiplier == 1).all() and (offset == 0).all()
+
+
+def test_count_series():
+    countries = ["INDIA", "CHINA", "UK"]
+    scenarios = [
+        Scenario(shocks=[Shock(countries="all", start_year=2026, start_month=1)]),
+        Scenario(shocks=[Shock(countries=["india", "ATLANTIS"], start_year=2026, start_month=1),
+                         Shock(countries=["INDIA", "UK"], start_year=2026, start_month=2)])
+    ]
+    assert count_series(scenarios, countries) == 5
+
+
+def test_baselines_match_batch_and_shocks_apply_in_the_recursion(api):
+    shock = {"countries": ["INDIA", "CHINA"], "start_year": 2026, "start_month": 1, "multiplier": 0.5}
+    body = {**REQUEST, "scenarios": [{"name": "halved", "shocks": [shock]}]}
+    result = api.post("/api/scenarios", json=body).json()["scenarios"][0]
+
+    batch = api.post("/api/forecast_batch", json={**REQUEST, "countries": ["INDIA", "CHINA"]}).json()
+    expected = {f["country"]: [r["predicted_arrivals"] for r in f["forecast"]] for f in batch["forecasts"]}
+
+    assert result["name"] == "halved"
+    assert sorted(item["country"] for item in result["countries"]) == ["CHINA", "INDIA"]
+    for item in result["countries"]:
+        rows = item["forecast"]
+        assert [r["baseline_arrivals"] for r in rows] == expected[item["country"]]
+        # The shocked month is halved; later months follow from the lower lags
+        assert abs(rows[0]["predicted_arrivals"] - rows[0]["baseline_arrivals"] / 2) <= 0.01
+        assert rows[1]["delta"] != 0
+
+
+def test_request_over_the_series_cap_is_rejected(api):
+    n_countries = len(api.get("/api/countries").json()["countries"])
+    shock = {"countries": "all", "start_year": 2026, "start_month": 1, "multiplier": 0.9}
+    too_many = MAX_SCENARIO_SERIES // n_countries + 1
+
+    response = api.post("/api/scenarios", json={**REQUEST, "scenarios": [{"shocks": [shock]}] * too_many})
+
+    assert response.status_code == 422
+    assert str(MAX_SCENARIO_SERIES) in response.json()["detail"]
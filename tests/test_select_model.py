@@ -0,0 +1,65 @@
+"""Promotion of the selected total model: only servable types, exported with a matching compact file."""
+import json
+
+import joblib
+import numpy as np
+import pytest
+
+from src import select_model
+from src.model_format import LinearModel, load_model
+
+pytest.importorskip("sklearn.linear_model")
+pytest.importorskip("threadpoolctl")
+
+
+def candidate(name, kind, mae, params=None, feature_set="all"):
+    return {
+        "name": f"{name}__{feature_set}", "model": {"name": name, "type": kind, "params": params or {}},
+        "feature_set": feature_set, "feature_cols": select_model.DEFAULT_GRID["feature_sets"][feature_set],
+        "status": "ok", "MAE": mae, "RMSE": mae, "fold_MAE": [mae], "horizon_MAE": [mae],
+        "fit_seconds": 0.0, "forecast_ms": 0.0
+    }
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr(select_model, "MODEL_PATH", tmp_path / "model.pkl")
+    monkeypatch.setattr(select_model, "COMPACT_MODEL_PATH", tmp_path / "model.json")
+    monkeypatch.setattr(select_model, "META_PATH", tmp_path / "model_meta.json")
+    cache_dir = select_model.build_cache(select_model.DEFAULT_GRID, tmp_path / "cache")
+    return tmp_path, cache_dir
+
+
+def test_non_linear_best_is_not_promoted():
+    scored = [candidate("catboost", "catboost", 10.0), candidate("ridge_1", "ridge", 20.0, {"alpha": 1.0}),
+              candidate("linear", "linear", 30.0)]
+    assert select_model.promotable(scored)["name"] == "ridge_1__all"
+    assert select_model.promotable(scored[:1]) is None
+
+
+def test_promoted_ridge_is_served_from_its_compact_export(outputs):
+    out, cache_dir = outputs
+    winner = candidate("ridge_10", "ridge", 1.0, {"alpha": 10.0}, feature_set="no_year")
+    select_model.promote(winner, cache_dir, jobs=1)
+
+    model, path = load_model(out / "model.json", out / "model.pkl")
+    assert path == out / "model.json" and isinstance(model, LinearModel)
+
+    pipeline = joblib.load(out / "model.pkl")
+    X = np.load(cache_dir / "X_no_year.npy")
+    np.testing.assert_allclose(model.predict(X), pipeline.predict(X), rtol=1e-9)
+
+    meta = json.loads((out / "model_meta.json").read_text())
+    assert meta["model_type"] == "ridge" and meta["model_params"] == {"alpha": 10.0}
+    assert meta["feature_cols"] == winner["feature_cols"]
+
+
+def test_model_without_linear_form_is_refused(outputs, monkeypatch):
+    from sklearn.tree import DecisionTreeRegressor
+
+    out, cache_dir = outputs
+    monkeypatch.setattr(select_model, "make_model", lambda spec, threads=1: DecisionTreeRegressor())
+
+    with pytest.raises(ValueError, match="can't be served"):
+        select_model.promote(candidate("tree", "tree", 1.0), cache_dir, jobs=1)
+    assert not (out / "model.pkl").exists() and not (out / "model_meta.json").exists()
@@ -0,0 +1,64 @@
+"""Shared artifact snapshots: publish, attach and the publisher / follower stores."""
+import numpy as np
+import pytest
+
+from src.artifacts import ArtifactState
+from src.shared_state import ARRAYS, POINTER, SharedArtifactStore, attach, current_snapshot, publish
+
+
+@pytest.fixture(scope="module")
+def eager():
+    return ArtifactState()
+
+
+@pytest.fixture
+def attached(eager, tmp_path):
+    return attach(tmp_path / publish(eager, tmp_path))
+
+
+def test_attached_arrays_are_read_only_maps_of_the_eager_state(eager, attached):
+    for name in ARRAYS + ("coef",):
+        mapped = getattr(attached, name)
+        assert isinstance(mapped, np.memmap) and not mapped.flags.writeable
+        if np.asarray(getattr(eager, name)).dtype == object:
+            assert mapped.tolist() == np.asarray(getattr(eager, name)).astype(str).tolist()
+        else:
+            np.testing.assert_array_equal(mapped, getattr(eager, name))
+
+    assert attached.model_version == eager.model_version
+    assert attached.feature_cols == eager.feature_cols
+    assert attached.country_index.countries == eager.country_index.countries
+    for c in eager.country_index.countries:
+        np.testing.assert_array_equal(attached.country_index.get(c), eager.country_index.get(c))
+        assert attached.country_model(c)[2] == eager.country_model(c)[2]
+
+
+def test_attached_state_forecasts_like_the_eager_state(eager, attached):
+    for a, b in zip(attached.forecast_total(2026, 1, 24), eager.forecast_total(2026, 1, 24)):
+        np.testing.assert_array_equal(a, b)
+    for a, b in zip(attached.hierarchy_forecast(2026, 1, 12), eager.hierarchy_forecast(2026, 1, 12)):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(attached.hierarchy_variances(), eager.hierarchy_variances())
+
+
+def test_same_versions_reuse_the_snapshot(eager, tmp_path):
+    first = publish(eager, tmp_path)
+    manifest = (tmp_path / first / "manifest.json").stat().st_mtime_ns
+
+    assert publish(eager, tmp_path) == first
+    assert (tmp_path / first / "manifest.json").stat().st_mtime_ns == manifest
+    assert current_snapshot(tmp_path) == first
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_one_publisher_and_followers_attach_to_current(eager, tmp_path):
+    publisher = SharedArtifactStore(tmp_path, loader=lambda: eager)
+    follower = SharedArtifactStore(tmp_path, loader=lambda: pytest.fail("followers never load"))
+
+    assert publisher.reload()
+    assert follower.reload()
+    assert publisher.publisher and not follower.publisher
+    assert follower.snapshot == publisher.snapshot == (tmp_path / POINTER).read_text()
+    assert follower.status()["shared"]["role"] == "follower"
+    # Nothing changed: no new generation
+    assert not follower.reload()
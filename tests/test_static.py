@@ -0,0 +1,61 @@
+"""Static frontend serving: per-encoding ETags, revalidation and cache headers."""
+import gzip
+
+import pytest
+
+from src.static import IMMUTABLE, REVALIDATE, StaticSite
+
+
+INDEX = b"<!doctype html><html><body>" + b"<div>tourism forecast</div>" * 200 + b"</body></html>"
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(INDEX)
+    (tmp_path / "assets" / "app-1a2b.js").write_bytes(b"console.log('forecast');" * 100)
+    (tmp_path / "assets" / "app-1a2b.js.gz").write_bytes(gzip.compress(b"console.log('forecast');" * 100))
+    (tmp_path / "favicon.svg").write_bytes(b"<svg/>")
+    return StaticSite(tmp_path)
+
+
+def get(site, name, **headers):
+    return site.response(site.get(name), {k.replace("_", "-"): v for k, v in headers.items()})
+
+
+def test_each_encoding_has_its_own_etag(site):
+    identity = get(site, "index.html")
+    zipped = get(site, "index.html", accept_encoding="gzip")
+
+    assert identity.body == INDEX
+    assert gzip.decompress(zipped.body) == INDEX
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != zipped.headers["etag"]
+    assert identity.headers["vary"] == zipped.headers["vary"] == "Accept-Encoding"
+
+
+def test_revalidation_only_matches_the_negotiated_representation(site):
+    identity_etag = get(site, "index.html").headers["etag"]
+    gzip_etag = get(site, "index.html", accept_encoding="gzip").headers["etag"]
+
+    assert get(site, "index.html", if_none_match=identity_etag).status_code == 304
+    assert get(site, "index.html", accept_encoding="gzip", if_none_match=gzip_etag).status_code == 304
+    # A cache holding the identity body must not get a 304 for the gzip one, or the other way round
+    stale = get(site, "index.html", accept_encoding="gzip", if_none_match=identity_etag)
+    assert stale.status_code == 200 and gzip.decompress(stale.body) == INDEX
+    assert get(site, "index.html", if_none_match=gzip_etag).status_code == 200
+    assert get(site, "index.html", if_none_match=f"W/{identity_etag}").status_code == 304
+
+
+def test_prebuilt_variant_and_cache_control(site):
+    asset = get(site, "assets/app-1a2b.js", accept_encoding="gzip")
+    assert asset.headers["cache-control"] == IMMUTABLE
+    assert asset.body == (site.root / "assets" / "app-1a2b.js.gz").read_bytes()
+    assert get(site, "index.html").headers["cache-control"] == REVALIDATE
+    assert "assets/app-1a2b.js.gz" not in site.files
+
+
+def test_small_files_are_not_compressed(site):
+    response = get(site, "favicon.svg", accept_encoding="gzip, br")
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,92 @@
+"""Streamed forecasts: framing, and content equal to the non-streaming endpoints."""
+import json
+
+import pytest
+
+from src.streaming import encode, stream_format
+
+
+REQUEST = {"start_year": 2026, "start_month": 1, "horizon": 6}
+
+
+def parse_ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def parse_sse(text):
+    messages = []
+    for event in text.split("\n\n")[:-1]:
+        name, data = event.split("\n")
+        message = json.loads(data[len("data: "):])
+        assert name == f"event: {message['type']}"
+        messages.append(message)
+    return messages
+
+
+def test_encode_frames_one_message_per_line_or_event():
+    message = {"type": "month", "year": 2026, "month": 1}
+    assert encode(message, "ndjson") == b'{"type":"month","year":2026,"month":1}\n'
+    assert encode(message, "sse") == b'event: month\ndata: {"type":"month","year":2026,"month":1}\n\n'
+
+
+def test_format_negotiation():
+    assert stream_format(None, None) == "ndjson"
+    assert stream_format(None, "text/event-stream") == "sse"
+    assert stream_format("ndjson", "text/event-stream") == "ndjson"
+
+
+@pytest.mark.parametrize("fmt, parse, media_type", [
+    ("ndjson", parse_ndjson, "application/x-ndjson"),
+    ("sse", parse_sse, "text/event-stream")
+])
+def test_total_stream_matches_forecast(api, fmt, parse, media_type):
+    response = api.post(f"/api/forecast/stream?format={fmt}", json=REQUEST)
+    assert response.headers["content-type"].startswith(media_type)
+    messages = parse(response.text)
+
+    expected = api.post("/api/forecast", json=REQUEST).json()["forecast"]
+    assert messages[0]["type"] == "meta" and messages[0]["horizon"] == 6
+    assert [{k: v for k, v in m.items() if k != "type"} for m in messages[1:-1]] == expected
+    assert messages[-1] == {"type": "end", "months": 6}
+
+
+def test_sse_is_chosen_from_accept(api):
+    response = api.post("/api/forecast/stream", json=REQUEST, headers={"Accept": "text/event-stream"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse(response.text)[-1]["type"] == "end"
+
+
+def test_country_stream_matches_forecast_country(api):
+    body = {**REQUEST, "country": "INDIA"}
+    messages = parse_ndjson(api.post("/api/forecast_country/stream", json=body).text)
+    expected = api.post("/api/forecast_country", json=body).json()
+
+    assert messages[0]["model"] == expected["model"]
+    assert [{k: v for k, v in m.items() if k != "type"} for m in messages[1:-1]] == expected["forecast"]
+
+    unknown = parse_ndjson(api.post("/api/forecast_country/stream", json={**body, "country": "ATLANTIS"}).text)
+    assert unknown == [{"type": "error", "error": "Country not found"}]
+
+
+def test_batch_stream_matches_batch_in_chunks(api, monkeypatch):
+    from src import app as app_module
+
+    chunks = []
+    batch_records = app_module.batch_records
+
+    def recording(state, req, countries, **kwargs):
+        chunks.append(len(countries))
+        return batch_records(state, req, countries, **kwargs)
+
+    monkeypatch.setattr(app_module, "batch_records", recording)
+    body = {**REQUEST, "countries": "all"}
+    messages = parse_ndjson(api.post("/api/forecast_batch/stream", json=body).text)
+    monkeypatch.undo()
+    expected = api.post("/api/forecast_batch", json=body).json()
+
+    n = len(expected["forecasts"])
+    assert messages[0]["type"] == "meta" and messages[0]["countries"] == n
+    assert [{k: v for k, v in m.items() if k != "type"} for m in messages[1:-1]] == expected["forecasts"]
+    assert messages[-1] == {"type": "end", "countries": n}
+    # Forecast chunk by chunk, not all at once
+    assert sum(chunks) == n and max(chunks) == app_module.STREAM_CHUNK and len(chunks) > 1